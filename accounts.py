@@ -0,0 +1,78 @@
+import os
+import re
+import logging
+from typing import List, Optional
+
+from notebooklm_client import USER_DATA_DIR, STORAGE_STATE_FILE
+from result_store import DEFAULT_ACCOUNT
+from session_cache import SESSION_CACHE_FILE
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+# One sub-directory per extra Google account, created by `python setup_auth.py --profile <name>`
+PROFILES_DIR = os.environ.get(
+    "NOTEBOOKLM_PROFILES_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"),
+)
+# Comma-separated account names to use (default: "default" plus every profile found)
+ACCOUNTS_ENV = "NOTEBOOKLM_ACCOUNTS"
+PROFILE_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+class Account:
+    """
+    Where one Google account keeps its login state.
+
+    The "default" account is the original single-account layout (`user_data`,
+    `storage_state.json` and `session_cache.json` next to the code); named
+    accounts keep the same three files under PROFILES_DIR/<name>/.
+    """
+
+    def __init__(self, name: str = DEFAULT_ACCOUNT):
+        if not PROFILE_NAME_PATTERN.match(name):
+            raise ValueError(f"Invalid profile name: {name!r}")
+        self.name = name
+        if name == DEFAULT_ACCOUNT:
+            self.user_data_dir = USER_DATA_DIR
+            self.storage_state = STORAGE_STATE_FILE
+            self.session_file = SESSION_CACHE_FILE
+        else:
+            root = os.path.join(PROFILES_DIR, name)
+            self.user_data_dir = os.path.join(root, "user_data")
+            self.storage_state = os.path.join(root, "storage_state.json")
+            self.session_file = os.path.join(root, "session_cache.json")
+
+    @property
+    def configured(self) -> bool:
+        """Whether setup_auth.py has been run for this account."""
+        return os.path.isdir(self.user_data_dir) or os.path.exists(self.storage_state)
+
+    def __repr__(self):
+        return f"Account({self.name!r})"
+
+
+def configured_accounts(names: Optional[str] = None) -> List[Account]:
+    """
+    The accounts to serve from: NOTEBOOKLM_ACCOUNTS (or `names`) if set,
+    otherwise every profile under PROFILES_DIR that has been set up, plus
+    "default" if it has been set up too. Always at least one account.
+    """
+    names = names if names is not None else os.environ.get(ACCOUNTS_ENV, "")
+    if names.strip():
+        return [Account(name.strip()) for name in names.split(",") if name.strip()]
+
+    accounts = []
+    if os.path.isdir(PROFILES_DIR):
+        for name in sorted(os.listdir(PROFILES_DIR)):
+            if name == DEFAULT_ACCOUNT or not PROFILE_NAME_PATTERN.match(name):
+                continue
+            account = Account(name)
+            if account.configured:
+                accounts.append(account)
+            else:
+                logger.warning("[Accounts] Skipping profile %s: run setup_auth.py --profile %s first", name, name)
+    default = Account(DEFAULT_ACCOUNT)
+    if default.configured or not accounts:
+        accounts.insert(0, default)
+    return accounts
@@ -0,0 +1,151 @@
+import glob
+import hashlib
+import os
+import shutil
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+FULL = "full"          # the original download, byte for byte
+PREVIEW = "preview"    # the downscaled inline rendition
+
+EXTENSIONS = {"PNG": "png", "JPEG": "jpg", "WEBP": "webp", "GIF": "gif"}
+MIME_TYPES = {"png": "image/png", "jpg": "image/jpeg", "webp": "image/webp", "gif": "image/gif"}
+# Disk cap for all renditions (0 = unlimited); past it, the least recently used artifacts are deleted
+DEFAULT_MAX_BYTES = int(os.environ.get("NOTEBOOKLM_ARTIFACT_MAX_MB", 1024)) * 1024 * 1024
+
+
+class ArtifactStore:
+    """
+    Infographic renditions on disk, one directory per artifact URL:
+    `<key>/full.<ext>` (original resolution) and `<key>/preview.<ext>`.
+
+    Tools hand out file URIs or MCP resource links to these files instead of
+    pushing the image bytes through the JSON-RPC pipe. The store is capped at
+    `max_bytes`: evict() deletes whole artifacts, least recently used (by
+    directory mtime, see touch()) first, skipping those being written.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._writing: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(image_url: str) -> str:
+        return hashlib.sha256(image_url.encode("utf-8")).hexdigest()[:24]
+
+    def _dir(self, key: str) -> str:
+        if not key.isalnum():
+            raise ValueError(f"Invalid artifact key: {key!r}")
+        return os.path.join(self.directory, key)
+
+    def find(self, key: str, rendition: str) -> Optional[str]:
+        matches = [p for p in glob.glob(os.path.join(self._dir(key), f"{rendition}.*")) if not p.endswith(".tmp")]
+        return matches[0] if matches else None
+
+    def write(self, key: str, rendition: str, ext: str, data: bytes) -> str:
+        path = os.path.join(self._dir(key), f"{rendition}.{ext}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return path
+
+    def adopt(self, key: str, rendition: str, ext: str, src_path: str) -> str:
+        """Moves an already written file (e.g. a finished download) into the store."""
+        path = os.path.join(self._dir(key), f"{rendition}.{ext}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.move(src_path, path)
+        return path
+
+    def staging_path(self, key: str) -> str:
+        os.makedirs(self._dir(key), exist_ok=True)
+        return os.path.join(self._dir(key), f"download.{os.getpid()}.tmp")
+
+    def renditions(self, key: str) -> Dict[str, str]:
+        found = {}
+        for rendition in (FULL, PREVIEW):
+            path = self.find(key, rendition)
+            if path:
+                found[rendition] = path
+        return found
+
+    @contextmanager
+    def writing(self, key: str):
+        """Keeps evict() away from an artifact while its renditions are exported."""
+        with self._lock:
+            self._writing[key] = self._writing.get(key, 0) + 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._writing[key] -= 1
+                if not self._writing[key]:
+                    del self._writing[key]
+
+    def touch(self, key: str):
+        """Marks an artifact as used, for evict()."""
+        try:
+            os.utime(self._dir(key), None)
+        except OSError:
+            pass
+
+    def _artifacts(self) -> Iterator[Tuple[str, int, float]]:
+        """Yields (key, bytes, last use) for every stored artifact not being written right now."""
+        if not os.path.isdir(self.directory):
+            return
+        with self._lock:
+            writing = set(self._writing)
+        for key in os.listdir(self.directory):
+            if not key.isalnum() or key in writing:
+                continue
+            path = self._dir(key)
+            try:
+                names = os.listdir(path)
+                # A download or rendition in progress in another process
+                if any(name.endswith(".tmp") for name in names):
+                    continue
+                size = sum(os.path.getsize(os.path.join(path, name)) for name in names)
+                yield key, size, os.stat(path).st_mtime
+            except OSError:
+                continue
+
+    def evict(self) -> List[str]:
+        """Deletes the least recently used artifacts until the store is back under 90% of its cap; returns their keys."""
+        if self.max_bytes <= 0:
+            return []
+        artifacts = sorted(self._artifacts(), key=lambda a: a[2])
+        total = sum(size for _, size, _ in artifacts)
+        if total <= self.max_bytes:
+            return []
+        target = int(self.max_bytes * 0.9)
+        removed = []
+        for key, size, _ in artifacts:
+            if total <= target:
+                break
+            shutil.rmtree(self._dir(key), ignore_errors=True)
+            total -= size
+            removed.append(key)
+        logger.info("[Artifacts] Evicted %s artifacts from disk (%.1f MB left)", len(removed), total / 1e6)
+        return removed
+
+    def entries(self) -> Iterator[Tuple[str, str, str]]:
+        """Yields (key, rendition, path) for every stored file."""
+        if not os.path.isdir(self.directory):
+            return
+        for key in sorted(os.listdir(self.directory)):
+            if not key.isalnum():
+                continue
+            for rendition, path in self.renditions(key).items():
+                yield key, rendition, path
+
+
+def mime_type(path: str) -> str:
+    return MIME_TYPES.get(path.rsplit(".", 1)[-1].lower(), "application/octet-stream")
@@ -0,0 +1,176 @@
+import codecs
+import json
+import logging
+from typing import Any, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+XSSI_PREFIX = ")]}'"
+
+_json_decoder = json.JSONDecoder()
+
+
+class BatchExecuteError(Exception):
+    """The response stream could not be decoded."""
+
+
+class Frame:
+    """
+    One entry of a batchexecute response chunk.
+
+    `kind` is the frame tag ("wrb.fr" for RPC results, "er" for errors, "di"
+    and "af.httprm" for timing/metadata, "e" for the end marker). For wrb.fr
+    frames `data` holds the inner payload, already JSON-decoded.
+    """
+
+    __slots__ = ("kind", "rpc_id", "data", "index", "error", "raw")
+
+    def __init__(self, raw: list):
+        self.raw = raw
+        self.kind = raw[0] if raw and isinstance(raw[0], str) else None
+        self.rpc_id = None
+        self.data = None
+        self.index = None
+        self.error = None
+
+        if self.kind == "wrb.fr":
+            self.rpc_id = _get(raw, 1)
+            inner = _get(raw, 2)
+            if isinstance(inner, str):
+                try:
+                    self.data = json.loads(inner)
+                except ValueError:
+                    self.data = inner
+            self.index = _get(raw, 6)
+            if inner is None:
+                # Rejected calls carry a status block instead of a payload
+                self.error = _get(raw, 5)
+        elif self.kind == "er":
+            self.rpc_id = _get(raw, 1) if isinstance(_get(raw, 1), str) else None
+            self.error = raw[1:]
+
+    @property
+    def ok(self) -> bool:
+        return self.kind == "wrb.fr" and self.error is None
+
+    def __repr__(self):
+        return f"Frame({self.kind!r}, rpc_id={self.rpc_id!r}, index={self.index!r}, error={self.error!r})"
+
+
+def _get(seq: list, i: int) -> Any:
+    return seq[i] if len(seq) > i else None
+
+
+class FrameDecoder:
+    """
+    Incremental decoder for batchexecute `rt=c` responses.
+
+    The body is `)]}'` followed by chunks of the form `<length>\\n<json>`, where
+    each JSON chunk is a list of frames. Feed bytes or text as they arrive;
+    every call returns the frames completed so far. Plain (non length-prefixed)
+    JSON bodies are accepted too.
+    """
+
+    def __init__(self):
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        # Text received while a known-length chunk is still incomplete (joined once it is)
+        self._pending: List[str] = []
+        self._pending_len = 0
+        self._prefix_done = False
+        self._chunk_length: Optional[int] = None
+        self.frames: List[Frame] = []
+
+    def feed(self, data: Union[bytes, str]) -> List[Frame]:
+        if isinstance(data, bytes):
+            data = self._text_decoder.decode(data)
+        self._pending.append(data)
+        self._pending_len += len(data)
+        if self._chunk_length is not None:
+            available = len(self._buf) - self._pos + self._pending_len
+            if available < self._chunk_length - 2:
+                return []
+        self._compact()
+        return self._drain(final=False)
+
+    def _compact(self):
+        # Drop consumed text and append what's pending, so the buffer only holds unparsed input
+        self._buf = self._buf[self._pos:] + "".join(self._pending)
+        self._pos = 0
+        self._pending = []
+        self._pending_len = 0
+
+    def close(self) -> List[Frame]:
+        """Flushes the decoder; raises if the stream ended mid-chunk."""
+        self._pending.append(self._text_decoder.decode(b"", final=True))
+        self._compact()
+        frames = self._drain(final=True)
+        if self._buf[self._pos:].strip():
+            raise BatchExecuteError(f"Truncated batchexecute response: {self._buf[self._pos:self._pos + 80]!r}")
+        return frames
+
+    def _skip_whitespace(self):
+        buf, pos = self._buf, self._pos
+        while pos < len(buf) and buf[pos] in " \t\r\n":
+            pos += 1
+        self._pos = pos
+
+    def _drain(self, final: bool) -> List[Frame]:
+        new_frames = []
+        buf = self._buf
+
+        if not self._prefix_done:
+            self._skip_whitespace()
+            if len(buf) - self._pos < len(XSSI_PREFIX) and not final:
+                return new_frames
+            if buf.startswith(XSSI_PREFIX, self._pos):
+                self._pos += len(XSSI_PREFIX)
+            self._prefix_done = True
+
+        while True:
+            self._skip_whitespace()
+            if self._pos >= len(buf):
+                break
+
+            if self._chunk_length is None and buf[self._pos].isdigit():
+                newline = buf.find("\n", self._pos)
+                if newline == -1:
+                    break
+                try:
+                    self._chunk_length = int(buf[self._pos:newline])
+                except ValueError:
+                    raise BatchExecuteError(f"Bad chunk header: {buf[self._pos:newline]!r}")
+                self._pos = newline + 1
+                continue
+
+            if not final and self._chunk_length is not None and len(buf) - self._pos < self._chunk_length - 2:
+                # Header says the chunk is not complete yet; don't re-parse partial JSON.
+                # (The length may include the surrounding newlines, hence the slack. It counts
+                # UTF-16 units, so a chunk with astral characters waits for the next feed.)
+                break
+
+            try:
+                chunk, end = _json_decoder.raw_decode(buf, self._pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise BatchExecuteError(f"Malformed batchexecute chunk at offset {self._pos}")
+                break
+
+            self._pos = end
+            self._chunk_length = None
+            if isinstance(chunk, list):
+                for raw in chunk:
+                    if isinstance(raw, list) and raw:
+                        new_frames.append(Frame(raw))
+
+        self.frames.extend(new_frames)
+        return new_frames
+
+
+def decode(text: Union[bytes, str]) -> List[Frame]:
+    """Decodes a complete batchexecute response body."""
+    decoder = FrameDecoder()
+    decoder.feed(text)
+    decoder.close()
+    return decoder.frames
@@ -0,0 +1,128 @@
+"""
+Browser launch benchmark: persistent profile vs. light mode, with and without
+resource blocking during token acquisition.
+
+Runs against the local stand-in's app page, which (like the real one) pulls
+in images, a web font, a video and analytics besides the inlined tokens.
+For each mode it reports:
+
+- time to tokens: Playwright start, browser/context launch and token scrape
+  (NotebookLMClient.start());
+- how many page subresources were fetched while scraping;
+- memory: PSS of the Chromium processes with one context, and per extra
+  context (another account): a new persistent browser per profile, or a new
+  storage-state context in the same browser for light mode.
+
+Linux only (reads /proc) and needs Chromium (`playwright install chromium`):
+
+    python -m benchmarks.bench_browser --runs 3 --contexts 4
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+
+import notebooklm_client
+from benchmarks.fake_notebooklm import FakeNotebookLM
+from notebooklm_client import NotebookLMClient, block_heavy_resources, launch_persistent_context, new_light_context
+from session_cache import SessionCache
+
+MODES = (("persistent", False), ("persistent", True), ("light", False), ("light", True))
+
+
+def _children(pid: int) -> list:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(c) for c in f.read().split()]
+    except OSError:
+        return []
+
+
+def browser_pss() -> int:
+    """Proportional set size (bytes) of every Chromium process under this one (not the Playwright driver)."""
+    total, stack = 0, _children(os.getpid())
+    while stack:
+        pid = stack.pop()
+        stack.extend(_children(pid))
+        try:
+            with open(f"/proc/{pid}/comm") as f:
+                if f.read().strip() == "node":
+                    continue
+            with open(f"/proc/{pid}/smaps_rollup") as f:
+                for line in f:
+                    if line.startswith("Pss:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except OSError:
+            pass
+    return total
+
+
+async def open_extra_context(client: NotebookLMClient, mode: str, block: bool, workdir: str, n: int):
+    """Another account's context: a second persistent browser, or a light context in the same browser."""
+    if mode == "light":
+        context = await new_light_context(client.browser, client.storage_state)
+    else:
+        notebooklm_client.USER_DATA_DIR = os.path.join(workdir, f"profile-{n}")
+        context = await launch_persistent_context(client.playwright, headless=True)
+    page = context.pages[0] if context.pages else await context.new_page()
+    if block:
+        await page.route("**/*", block_heavy_resources)
+    await page.goto(client.base_url, wait_until="domcontentloaded")
+    return context
+
+
+async def run_mode(fake: FakeNotebookLM, mode: str, block: bool, contexts: int) -> dict:
+    notebooklm_client.BLOCK_RESOURCES = block
+    with tempfile.TemporaryDirectory(prefix="notebooklm-browser-") as workdir:
+        notebooklm_client.USER_DATA_DIR = os.path.join(workdir, "profile-0")
+        storage_state = os.path.join(workdir, "storage_state.json")
+        with open(storage_state, "w") as f:
+            json.dump({"cookies": [], "origins": []}, f)
+
+        client = NotebookLMClient(session=SessionCache(path=None), transport="http", base_url=fake.base_url,
+                                  browser_mode=mode, storage_state=storage_state)
+        assets_before = fake.asset_requests
+        t0 = time.perf_counter()
+        await client.start()
+        to_tokens = time.perf_counter() - t0
+        assets = fake.asset_requests - assets_before
+        await asyncio.sleep(0.5)   # let late subresources settle before measuring memory
+        first = browser_pss()
+
+        extra = []
+        try:
+            for n in range(1, contexts):
+                extra.append(await open_extra_context(client, mode, block, workdir, n))
+            await asyncio.sleep(0.5)
+            per_context = (browser_pss() - first) / (contexts - 1) if contexts > 1 else None
+        finally:
+            for context in extra:
+                await context.close()
+            await client.stop()
+    return {"to_tokens": to_tokens, "assets": assets, "first": first, "per_context": per_context}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--contexts", type=int, default=4, help="contexts (accounts) open at once for the memory figure")
+    parser.add_argument("--asset-kb", type=int, default=512, help="size of each page subresource served by the fake")
+    args = parser.parse_args()
+
+    with FakeNotebookLM(asset_size=args.asset_kb * 1024) as fake:
+        for mode, block in MODES:
+            results = [await run_mode(fake, mode, block, args.contexts) for _ in range(args.runs)]
+            label = f"{mode}{' + blocking' if block else ''}"
+            per_context = [r["per_context"] for r in results if r["per_context"] is not None]
+            print(f"{label:>22}: tokens in {statistics.median(r['to_tokens'] for r in results) * 1000:7.1f} ms | "
+                  f"{results[-1]['assets']} subresources | "
+                  f"first context {statistics.median(r['first'] for r in results) / 2**20:6.1f} MB"
+                  + (f" | +{statistics.median(per_context) / 2**20:6.1f} MB per extra context" if per_context else ""))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
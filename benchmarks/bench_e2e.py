@@ -0,0 +1,244 @@
+"""
+End-to-end benchmark of the MCP tools against the local NotebookLM stand-in.
+
+Starts benchmarks/fake_notebooklm.py (token page, stateful notebooks with
+transcript/generation delays, large hosted PNGs), points the server at it
+through NOTEBOOKLM_BASE_URL and a throwaway NOTEBOOKLM_STATE_DIR, and calls
+the tool functions from server.py directly:
+
+- cold and warm latency of generate_infographic (new video, then the same
+  video again) and fetch_infographic (finished notebook whose image is not
+  cached yet, then again);
+- throughput with --concurrency distinct videos in flight (wall time,
+  jobs/s, p50/p95 per video), spread over --accounts accounts by the
+  AccountScheduler (each with its own RPC budget, so throughput should grow
+  with the account count); --quota caps the first account's generations
+  to exercise taking an exhausted account out of rotation;
+- with --collection, generate_collection_infographic over another
+  --concurrency new videos in one notebook (--per-video adds an
+  infographic per video), next to the RPCs the throughput run needed for
+  the same number of videos one notebook each;
+- peak RSS, and with --tracemalloc the peak Python heap.
+
+By default no browser is launched: clients use the HTTP transport with tokens
+scraped from the fake's page (or handed out by the fake for extra
+accounts). --browser leases from the real ClientPool instead (needs Chromium and a user_data profile; the profile's tokens are not
+valid for the fake, so it is mostly useful with the browser transport).
+
+    python -m benchmarks.bench_e2e --concurrency 8 --source-delay 0.5 --generation-delay 2
+    python -m benchmarks.bench_e2e --concurrency 32 --accounts 4
+    python -m benchmarks.bench_e2e --concurrency 20 --collection --per-video
+"""
+import argparse
+import asyncio
+import logging
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import asynccontextmanager
+
+import httpx
+
+from benchmarks.fake_notebooklm import FakeNotebookLM
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+def video_url(n: int) -> str:
+    return f"https://www.youtube.com/watch?v=bench{n:06d}"
+
+
+def check(result):
+    """Raises if a tool call reported an error instead of an infographic."""
+    if isinstance(result, str):
+        raise Exception(result)
+    for item in result:
+        text = getattr(item, "text", "")
+        if text.startswith("Error") or "*Failed to render" in text:
+            raise Exception(text.strip())
+    return result
+
+
+class BrowserlessPool:
+    """Stands in for a ClientPool: leases HTTP-only clients that share one session, transport and rate limiter."""
+
+    def __init__(self, fake: FakeNotebookLM, size: int, notebooks, account: str = "default"):
+        from notebooklm_client import NotebookLMClient, parse_session_tokens
+        from ratelimit import RpcRateLimiter
+        from resilience import CircuitBreaker
+        from session_cache import SessionCache
+        from transports import HttpTransport
+
+        self._client_cls = NotebookLMClient
+        self._parse = parse_session_tokens
+        self.base_url = fake.base_url
+        self.session = SessionCache(path=None)
+        self.http_transport = HttpTransport(self.session, fake.base_url)
+        self.rate_limiter = RpcRateLimiter()
+        self.breaker = CircuitBreaker()
+        self.notebooks = notebooks
+        self.account = account
+        self.size = size
+        self.ready = False
+        self._fake = fake
+        self._slots = asyncio.Semaphore(size)
+
+    async def start(self):
+        if self.account == "default":
+            async with httpx.AsyncClient() as http:
+                response = await http.get(f"{self.base_url}/")
+            at, bl, fsid = self._parse(response.text)
+            self.session.store({"at": at, "bl": bl, "fsid": fsid}, [])
+        else:
+            self.session.store(self._fake.add_account(self.account), [])
+        self.ready = True
+
+    @asynccontextmanager
+    async def lease(self):
+        async with self._slots:
+            yield self._client_cls(session=self.session, transport="http", http_transport=self.http_transport,
+                                   base_url=self.base_url, rate_limiter=self.rate_limiter,
+                                   notebooks=self.notebooks, account=self.account, breaker=self.breaker)
+
+    async def close(self):
+        await self.http_transport.close()
+
+
+def rpc_delta(fake: FakeNotebookLM, before: dict) -> str:
+    from notebooklm_client import RPC_CREATE_NOTEBOOK, RPC_ADD_SOURCE, RPC_GENERATE_INFOGRAPHIC
+
+    names = {RPC_CREATE_NOTEBOOK: "create", RPC_ADD_SOURCE: "add-source", RPC_GENERATE_INFOGRAPHIC: "trigger"}
+    return ", ".join(f"{fake.rpc_counts.get(rpc_id, 0) - before.get(rpc_id, 0)} {name}"
+                     for rpc_id, name in names.items())
+
+
+async def timed(coro):
+    t0 = time.perf_counter()
+    check(await coro)
+    return time.perf_counter() - t0
+
+
+async def run(args, fake: FakeNotebookLM):
+    import server
+    from notebook_lifecycle import NotebookLifecycle
+    from scheduler import AccountScheduler
+
+    if args.browser:
+        pool = server.pool
+    else:
+        results = server.default_result_store()
+        names = ["default"] + [f"bench{n}" for n in range(1, args.accounts)]
+        notebooks = {name: NotebookLifecycle(results, account=name) for name in names}
+        pool = AccountScheduler([BrowserlessPool(fake, args.pool_size or args.concurrency, notebooks[name], name)
+                                 for name in names], results, notebooks)
+        server.pool = server.jobs.pool = pool
+    await pool.start()
+    if args.quota is not None:
+        fake.quota[pool.accounts[0]] = args.quota
+
+    try:
+        # --- generate_infographic: new video, then the same one (result store + image cache) ---
+        cold = await timed(server.generate_infographic(video_url(0), output=args.output))
+        warm = await timed(server.generate_infographic(video_url(0), output=args.output))
+        print(f"generate_infographic  cold {cold * 1000:8.1f} ms | warm {warm * 1000:8.1f} ms")
+
+        # --- fetch_infographic: a finished notebook whose image hasn't been downloaded yet ---
+        async with pool.lease() as client:
+            await client.generate_infographic(video_url(1))
+            notebook_id = client.results.get(f"bench{1:06d}")["notebook_id"]
+        cold = await timed(server.fetch_infographic(notebook_id=notebook_id, output=args.output))
+        warm = await timed(server.fetch_infographic(notebook_id=notebook_id, output=args.output))
+        print(f"fetch_infographic     cold {cold * 1000:8.1f} ms | warm {warm * 1000:8.1f} ms")
+
+        # --- throughput: distinct videos, all in flight at once ---
+        if args.tracemalloc:
+            tracemalloc.start()
+        first = 100
+        rpcs_before = dict(fake.rpc_counts)
+        t0 = time.perf_counter()
+        latencies = await asyncio.gather(*[
+            timed(server.generate_infographic(video_url(n), output=args.output))
+            for n in range(first, first + args.concurrency)
+        ])
+        elapsed = time.perf_counter() - t0
+        print(f"throughput            {args.concurrency} videos in {elapsed:.2f}s = "
+              f"{args.concurrency / elapsed:.2f} videos/s | p50 {statistics.median(latencies) * 1000:.1f} ms | "
+              f"p95 {percentile(latencies, 0.95) * 1000:.1f} ms | {rpc_delta(fake, rpcs_before)}")
+        accounts = pool.status()
+        print("accounts              " + " | ".join(
+            f"{name}: {state['completed']} leases{'' if state['healthy'] else ' (out of rotation)'}"
+            for name, state in accounts.items()))
+
+        # --- collection: as many new videos again, in one notebook ---
+        if args.collection:
+            urls = [video_url(n) for n in range(first + args.concurrency, first + 2 * args.concurrency)]
+            rpcs_before = dict(fake.rpc_counts)
+            elapsed = await timed(server.generate_collection_infographic(urls, per_video=args.per_video,
+                                                                         output=args.output))
+            infographics = 1 + (len(urls) if args.per_video else 0)
+            print(f"collection            {len(urls)} videos, {infographics} infographics in {elapsed:.2f}s | "
+                  f"{rpc_delta(fake, rpcs_before)}")
+        if args.tracemalloc:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(f"peak Python heap      {peak / 1024 / 1024:.1f} MB (tracemalloc, throughput phase)")
+    finally:
+        await pool.close()
+        server.image_pipeline.shutdown()
+
+    # ru_maxrss is KB on Linux, bytes on macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    maxrss_mb = maxrss / 1024 / 1024 if sys.platform == "darwin" else maxrss / 1024
+    print(f"peak RSS              {maxrss_mb:.1f} MB")
+    print(f"server handled {fake.request_count} RPC requests ({fake.rpc_counts}), {fake.image_requests} image downloads")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=8, help="distinct videos in flight for the throughput run")
+    parser.add_argument("--pool-size", type=int, default=None, help="clients leased at once (default: --concurrency)")
+    parser.add_argument("--output", default="inline", choices=("inline", "file", "resource"))
+    parser.add_argument("--rpc-delay", type=float, default=0.0, help="server-side delay per request (s)")
+    parser.add_argument("--source-delay", type=float, default=0.0, help="transcript processing time (s)")
+    parser.add_argument("--generation-delay", type=float, default=0.0, help="infographic generation time (s)")
+    parser.add_argument("--rpc-rate", type=float, default=None,
+                        help="client-side RPC budget per second (default NOTEBOOKLM_RPC_RATE, 5/s, which bounds throughput)")
+    parser.add_argument("--size", default="2752x4096", help="infographic size served by the fake")
+    parser.add_argument("--tracemalloc", action="store_true", help="also report the peak Python heap (slow)")
+    parser.add_argument("--trace-file", default="", help="keep the span log here (default: off)")
+    parser.add_argument("--accounts", type=int, default=1, help="accounts served by the fake and the scheduler")
+    parser.add_argument("--quota", type=int, default=None,
+                        help="infographics the first account may generate before RESOURCE_EXHAUSTED")
+    parser.add_argument("--collection", action="store_true",
+                        help="also put --concurrency new videos into one notebook (generate_collection_infographic)")
+    parser.add_argument("--per-video", action="store_true", help="with --collection, one infographic per video too")
+    parser.add_argument("--browser", action="store_true", help="lease from the real AccountScheduler (needs Chromium)")
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.split("x"))
+    fake = FakeNotebookLM(rpc_delay=args.rpc_delay, source_delay=args.source_delay,
+                          generation_delay=args.generation_delay, image_size=(width, height))
+    with fake, tempfile.TemporaryDirectory(prefix="notebooklm-bench-") as state_dir:
+        fake.image   # render the PNG before timing anything
+        # Must be set before server (and everything it imports) is loaded
+        os.environ["NOTEBOOKLM_BASE_URL"] = fake.base_url
+        os.environ["NOTEBOOKLM_STATE_DIR"] = state_dir
+        os.environ["NOTEBOOKLM_TRACE_FILE"] = args.trace_file
+        os.environ.setdefault("NOTEBOOKLM_SPARE_NOTEBOOKS", "0")
+        if args.rpc_rate is not None:
+            os.environ["NOTEBOOKLM_RPC_RATE"] = str(args.rpc_rate)
+            os.environ["NOTEBOOKLM_RPC_BURST"] = str(max(10, int(args.rpc_rate)))
+        # Logs to stderr: setup_logging() leaves a root logger that already has handlers alone
+        logging.basicConfig(level=logging.WARNING, format="%(name)s - %(levelname)s - %(message)s")
+        asyncio.run(run(args, fake))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+generate_infographic under injected faults, against the local NotebookLM
+stand-in (browserless, as in bench_e2e), with and without the resilience
+layer around execute_rpcs.
+
+Each mode runs in a fresh interpreter:
+
+- baseline: NOTEBOOKLM_RPC_RETRIES=0, NOTEBOOKLM_BREAKER_FAILURES=0 and
+  NOTEBOOKLM_RPC_THROTTLE_FACTOR=1, i.e. no retries, no circuit breaker and
+  a fixed rate, as before;
+- resilient: the defaults (retries with jittered backoff within the retry
+  budget, circuit breaker, adaptive rate limits).
+
+Scenarios, each with --videos new videos in flight at once:
+
+- errors: --error-rate of all batchexecute requests fail with 503;
+- throttle: the server allows --server-rate requests/s and answers 429
+  beyond that, while the client's own budget is set well above it;
+- outage: every request fails with 503 for --outage seconds, while the
+  videos arrive evenly over twice that (the circuit breaker's cooldown is
+  cut to a second, so it recovers within the run).
+
+For each it reports the videos that got their infographic, wall time, the
+requests the server saw and how many of them it rejected:
+
+    python -m benchmarks.bench_faults --videos 20
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict
+
+from benchmarks.fake_notebooklm import FakeNotebookLM
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = {
+    "baseline": {"NOTEBOOKLM_RPC_RETRIES": "0", "NOTEBOOKLM_BREAKER_FAILURES": "0",
+                 "NOTEBOOKLM_RPC_THROTTLE_FACTOR": "1"},
+    "resilient": {},
+}
+SCENARIOS = ("errors", "throttle", "outage")
+
+
+async def scenario(server, fake: FakeNotebookLM, name: str, first: int, args) -> dict:
+    from benchmarks.bench_e2e import BrowserlessPool, video_url
+    from notebook_lifecycle import NotebookLifecycle
+    from scheduler import AccountScheduler
+    from resilience import retry_budget
+
+    # A fresh account (breaker, rate limits, ejection) and retry budget, so scenarios don't leak into each other
+    retry_budget.__init__()
+    notebooks = NotebookLifecycle(server.pool.results)
+    server.pool = AccountScheduler([BrowserlessPool(fake, args.videos, notebooks)], server.pool.results,
+                                   {"default": notebooks})
+    await server.pool.start()
+
+    fake.faults, fake.fault_rate, fake.rate_limit, fake.outage_until = [], 0.0, None, 0.0
+    if name == "errors":
+        fake.fault_rate = args.error_rate
+    elif name == "throttle":
+        fake.rate_limit = args.server_rate
+    else:
+        fake.outage(args.outage)
+    requests, faults, throttled = fake.request_count, fake.fault_count, fake.throttled_count
+
+    errors: Dict[str, int] = {}
+    arrival = 2 * args.outage / args.videos if name == "outage" else 0.0
+
+    async def one(n: int) -> bool:
+        await asyncio.sleep((n - first) * arrival)
+        result = await server.generate_infographic(video_url(n), output="file")
+        if isinstance(result, str):
+            errors[result] = errors.get(result, 0) + 1
+        return not isinstance(result, str)
+
+    t0 = time.perf_counter()
+    try:
+        outcomes = await asyncio.gather(*[one(n) for n in range(first, first + args.videos)])
+        return {
+            "ok": sum(outcomes),
+            "seconds": time.perf_counter() - t0,
+            "requests": fake.request_count - requests,
+            "rejected": (fake.fault_count - faults) + (fake.throttled_count - throttled),
+            "account": server.pool.status()["default"],
+            "retry_budget": retry_budget.status(),
+            "errors": errors,
+        }
+    finally:
+        await server.pool.close()
+
+
+async def child_run(args, fake: FakeNotebookLM) -> dict:
+    import server
+
+    try:
+        return {name: await scenario(server, fake, name, 1000 * (i + 1), args) for i, name in enumerate(SCENARIOS)}
+    finally:
+        server.image_pipeline.shutdown()
+
+
+def child(args):
+    fake = FakeNotebookLM(image_size=(400, 600))
+    with fake, tempfile.TemporaryDirectory(prefix="notebooklm-faultbench-") as state_dir:
+        fake.image
+        os.environ["NOTEBOOKLM_BASE_URL"] = fake.base_url
+        os.environ["NOTEBOOKLM_STATE_DIR"] = state_dir
+        os.environ["NOTEBOOKLM_TRACE_FILE"] = ""
+        os.environ["NOTEBOOKLM_SPARE_NOTEBOOKS"] = "0"
+        # The client's own budget is well above what the throttle scenario's server allows
+        os.environ["NOTEBOOKLM_RPC_RATE"] = os.environ["NOTEBOOKLM_RPC_BURST"] = str(int(args.server_rate * 5))
+        # A short artifact budget, so videos whose polls keep failing give up within the run
+        os.environ["NOTEBOOKLM_ARTIFACT_TIMEOUT"] = "20"
+        os.environ["NOTEBOOKLM_BREAKER_COOLDOWN"] = "1"
+        os.environ.update(MODES[args.mode])
+        logging.basicConfig(level=logging.CRITICAL)
+        print(json.dumps(asyncio.run(child_run(args, fake)), default=str))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--videos", type=int, default=20, help="videos in flight per scenario")
+    parser.add_argument("--error-rate", type=float, default=0.1, help="fraction of requests failing with 503")
+    parser.add_argument("--server-rate", type=float, default=4, help="requests/s the server allows per account")
+    parser.add_argument("--outage", type=float, default=5, help="seconds every request fails with 503")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.mode:
+        return child(args)
+
+    for mode in MODES:
+        cmd = [sys.executable, "-m", "benchmarks.bench_faults", "--mode", mode, "--videos", str(args.videos),
+               "--error-rate", str(args.error_rate), "--server-rate", str(args.server_rate),
+               "--outage", str(args.outage)]
+        out = subprocess.run(cmd, cwd=ROOT, stdout=subprocess.PIPE, text=True, check=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        for name in SCENARIOS:
+            r = result[name]
+            account = r["account"]
+            print(f"{mode:>9} {name:>8}: {r['ok']:3d}/{args.videos} ok in {r['seconds']:6.2f}s | "
+                  f"{r['requests']:4d} requests, {r['rejected']:4d} rejected | "
+                  f"circuit opened {account['circuit']['times_opened']}x, "
+                  f"rate now {account['rate_limit']['rate']}/s | "
+                  f"{r['retry_budget']['retries']} retries, {r['retry_budget']['denied']} denied")
+
+
+if __name__ == "__main__":
+    main()
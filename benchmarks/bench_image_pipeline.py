@@ -0,0 +1,100 @@
+"""
+Benchmark for the infographic image pipeline.
+
+Generates large synthetic PNGs (flat panels, gradients and noisy "text"
+regions, similar in size to real NotebookLM infographics) and compares the
+old inline PIL block from server.py against image_pipeline.render(), then
+measures how long the event loop stalls while several images are processed
+concurrently:
+
+    python -m benchmarks.bench_image_pipeline --images 4 --size 2752x4096
+"""
+import argparse
+import asyncio
+import io
+import time
+
+from PIL import Image
+
+import image_pipeline
+from benchmarks.fake_notebooklm import sample_png
+from image_pipeline import RenderSpec, render, render_async
+
+
+def legacy_render(image_bytes: bytes) -> bytes:
+    """The pre-image_pipeline block from server.py."""
+    image = Image.open(io.BytesIO(image_bytes))
+    max_width = 1024
+    if image.width > max_width:
+        ratio = max_width / image.width
+        image = image.resize((max_width, int(image.height * ratio)), Image.Resampling.LANCZOS)
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    buffered = io.BytesIO()
+    image.save(buffered, format="JPEG", quality=85)
+    return buffered.getvalue()
+
+
+def bench(label: str, fn, images, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        sizes = [len(fn(img)) for img in images]
+        best = min(best, time.perf_counter() - t0)
+    print(f"{label:>32}: {best / len(images) * 1000:8.1f} ms/image, output {sum(sizes) / len(sizes) / 1e3:.0f} KB avg")
+
+
+async def loop_stall(label: str, process, images):
+    """Runs `process` over all images concurrently while a 5 ms ticker records event-loop lag."""
+    max_lag = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal max_lag
+        while not done.is_set():
+            t0 = time.perf_counter()
+            await asyncio.sleep(0.005)
+            max_lag = max(max_lag, time.perf_counter() - t0 - 0.005)
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    t0 = time.perf_counter()
+    await asyncio.gather(*(process(img) for img in images))
+    elapsed = time.perf_counter() - t0
+    done.set()
+    await tick
+    print(f"{label:>32}: {elapsed * 1000:8.1f} ms total, max event-loop stall {max_lag * 1000:7.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--images", type=int, default=4)
+    parser.add_argument("--size", default="2752x4096", help="WIDTHxHEIGHT of the sample PNGs")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    width, height = (int(v) for v in args.size.split("x"))
+    images = [sample_png(width, height, seed) for seed in range(args.images)]
+    print(f"{args.images} sample PNGs, {width}x{height}, {sum(map(len, images)) / len(images) / 1e6:.1f} MB avg")
+
+    fixed = RenderSpec(byte_budget=None)
+    budget = RenderSpec()
+    webp = RenderSpec(format="WEBP", quality=80)
+    bench("legacy inline block", legacy_render, images, args.repeat)
+    bench("render (JPEG q85)", lambda b: render(b, fixed).data, images, args.repeat)
+    bench(f"render (budget {budget.byte_budget // 1000} KB)", lambda b: render(b, budget).data, images, args.repeat)
+    bench("render (WebP q80)", lambda b: render(b, webp).data, images, args.repeat)
+
+    async def legacy_async(b):
+        legacy_render(b)
+
+    async def pipeline_async(b):
+        await render_async(b, budget)
+
+    asyncio.run(loop_stall("legacy, on the event loop", legacy_async, images))
+    asyncio.run(loop_stall("render_async, worker pool", pipeline_async, images))
+    image_pipeline.shutdown()
+
+
+if __name__ == "__main__":
+    main()
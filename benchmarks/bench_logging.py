@@ -0,0 +1,127 @@
+"""
+Logging overhead of a full generate_infographic run, against the local
+NotebookLM stand-in (browserless, as in bench_e2e).
+
+Each mode runs in a fresh interpreter:
+
+- off: root logger at WARNING, so the INFO lines are never emitted;
+- sync: logging.basicConfig(filename=...), the synchronous file handler
+  server.py used before, writing on the event loop;
+- queue: logging_setup.setup_logging(), the QueueHandler/QueueListener
+  setup (rotating file written from a background thread).
+
+For each it reports the time per run (new video each time, no transcript or
+generation delay, RPC budget lifted, so the pipeline itself is as cheap as
+it gets), the log lines written per run, and the time the event loop spent
+inside logging calls:
+
+    python -m benchmarks.bench_logging --runs 200
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.fake_notebooklm import FakeNotebookLM
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = ("off", "sync", "queue")
+
+
+def configure(mode: str, log_path: str):
+    if mode == "off":
+        logging.basicConfig(level=logging.WARNING)
+    elif mode == "sync":
+        logging.basicConfig(filename=log_path, level=logging.INFO,
+                            format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    else:
+        from logging_setup import setup_logging
+        setup_logging(log_path)
+
+
+def instrument() -> dict:
+    """Accumulates the caller-side time of every emitted record (Logger._log runs after the level check)."""
+    stats = {"seconds": 0.0, "records": 0}
+    original = logging.Logger._log
+
+    def timed_log(self, *args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return original(self, *args, **kwargs)
+        finally:
+            stats["seconds"] += time.perf_counter() - t0
+            stats["records"] += 1
+
+    logging.Logger._log = timed_log
+    return stats
+
+
+async def child_run(args, fake: FakeNotebookLM) -> dict:
+    from benchmarks.bench_e2e import BrowserlessPool, check, video_url
+    import server
+    from notebook_lifecycle import NotebookLifecycle
+    from scheduler import AccountScheduler
+
+    results = server.default_result_store()
+    notebooks = NotebookLifecycle(results)
+    pool = AccountScheduler([BrowserlessPool(fake, 4, notebooks)], results, {"default": notebooks})
+    server.pool = pool
+    await pool.start()
+    try:
+        # Warm caches and code paths before measuring
+        check(await server.generate_infographic(video_url(0)))
+        stats = instrument()
+        times = []
+        for n in range(1, args.runs + 1):
+            t0 = time.perf_counter()
+            check(await server.generate_infographic(video_url(n)))
+            times.append(time.perf_counter() - t0)
+        return {"times": times, "log_seconds": stats["seconds"], "records": stats["records"]}
+    finally:
+        await pool.close()
+        server.image_pipeline.shutdown()
+
+
+def child(args):
+    fake = FakeNotebookLM(image_size=(800, 1200))
+    with fake, tempfile.TemporaryDirectory(prefix="notebooklm-logbench-") as state_dir:
+        fake.image
+        os.environ["NOTEBOOKLM_BASE_URL"] = fake.base_url
+        os.environ["NOTEBOOKLM_STATE_DIR"] = state_dir
+        os.environ["NOTEBOOKLM_TRACE_FILE"] = ""
+        os.environ["NOTEBOOKLM_SPARE_NOTEBOOKS"] = "0"
+        os.environ["NOTEBOOKLM_RPC_RATE"] = os.environ["NOTEBOOKLM_RPC_BURST"] = "100000"
+        configure(args.mode, os.path.join(state_dir, "server.log"))
+        result = asyncio.run(child_run(args, fake))
+        logging.shutdown()
+        print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=200, help="generate_infographic runs per mode")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.mode:
+        return child(args)
+
+    baseline = None
+    for mode in MODES:
+        out = subprocess.run([sys.executable, "-m", "benchmarks.bench_logging", "--mode", mode, "--runs", str(args.runs)],
+                             cwd=ROOT, capture_output=True, text=True, check=True)
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        per_run = statistics.mean(result["times"])
+        baseline = baseline if baseline is not None else per_run
+        print(f"{mode:>5}: {per_run * 1000:7.3f} ms/run (p50 {statistics.median(result['times']) * 1000:7.3f} ms, "
+              f"{(per_run - baseline) * 1000:+.3f} ms vs off) | {result['records'] / args.runs:4.1f} lines/run | "
+              f"{result['log_seconds'] / args.runs * 1e6:7.1f} us/run in logging calls on the event loop")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Micro-benchmark for batchexecute response decoding.
+
+Builds a large LIST_ARTIFACTS response in the recorded `rt=c` shape
+(double-encoded inner payload, length-prefixed chunks) and compares the old
+line-splitting parser against batchexecute.FrameDecoder, both on the whole
+body and fed in network-sized pieces:
+
+    python -m benchmarks.bench_rpc_parser --artifacts 2000
+"""
+import argparse
+import json
+import time
+
+from batchexecute import FrameDecoder, decode
+from benchmarks.fake_notebooklm import encode_response
+
+
+def artifact_list_response(artifacts: int) -> str:
+    entries = []
+    for i in range(artifacts):
+        entries.append([
+            f"{i:08x}-0000-4000-8000-{i:012x}",
+            f"Infographic {i}: a fairly long generated title about the video contents",
+            7,
+            [[[f"{i:08x}-1111-4000-8000-{i:012x}"]]],
+            3,
+            None,
+            [f"https://lh3.googleusercontent.com/notebooklm/{'A' * 180}{i}=w2752-d-h1536-mp2", 2752, 1536],
+            [1770033135, 644771000],
+            ["Summary text " * 20],
+        ])
+    inner = json.dumps([entries])
+    frames = [
+        ["wrb.fr", "gArtLc", inner, None, None, None, "generic"],
+        ["di", 231],
+        ["af.httprm", 230, "-1234567890", 12],
+    ]
+    return encode_response(frames) + '25\n[["e",4,null,null,' + str(len(inner)) + ']]\n'
+
+
+def legacy_parse(text: str):
+    """The pre-FrameDecoder parser: split lines, json.loads each, then decode the inner string again."""
+    for line in text.split("\n"):
+        trimmed = line.strip()
+        if trimmed.startswith("[["):
+            try:
+                data = json.loads(trimmed)
+                if data and data[0] and data[0][0] == "wrb.fr":
+                    return json.loads(data[0][2])
+            except Exception:
+                pass
+    return None
+
+
+def bench(label: str, fn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    print(f"{label:>28}: {best * 1000:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--artifacts", type=int, default=2000)
+    parser.add_argument("--chunk-size", type=int, default=16 * 1024)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    text = artifact_list_response(args.artifacts)
+    body = text.encode("utf-8")
+    pieces = [body[i:i + args.chunk_size] for i in range(0, len(body), args.chunk_size)]
+    print(f"response: {len(body) / 1e6:.2f} MB, {args.artifacts} artifacts, {len(pieces)} pieces")
+
+    def streamed():
+        decoder = FrameDecoder()
+        for piece in pieces:
+            decoder.feed(piece)
+        decoder.close()
+        return decoder.frames
+
+    assert legacy_parse(text) == decode(text)[0].data == streamed()[0].data
+
+    bench("legacy line parser", lambda: legacy_parse(text), args.repeat)
+    bench("FrameDecoder (whole body)", lambda: decode(text), args.repeat)
+    bench("FrameDecoder (streamed)", streamed, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
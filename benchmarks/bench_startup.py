@@ -0,0 +1,131 @@
+"""
+Startup benchmark for the MCP server.
+
+Measures, over several fresh interpreter runs:
+
+- how long `import server` takes;
+- how long after spawning `python server.py` the MCP `initialize` handshake
+  is answered over stdio (what an MCP client waits for);
+- with --ready, how long until get_health reports the background warm-up
+  (Playwright, persistent context, session tokens) as finished.
+
+Each run uses a throwaway NOTEBOOKLM_STATE_DIR:
+
+    python -m benchmarks.bench_startup --runs 5 --ready
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = "import time; t0 = time.perf_counter(); import server; print(time.perf_counter() - t0)"
+
+
+def bench_env(state_dir: str) -> dict:
+    env = dict(os.environ)
+    env["NOTEBOOKLM_STATE_DIR"] = state_dir
+    env["NOTEBOOKLM_TRACE_FILE"] = ""
+    env["NOTEBOOKLM_SPARE_NOTEBOOKS"] = "0"
+    return env
+
+
+def time_import(env: dict) -> float:
+    out = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True)
+    return float(out.stdout.strip().splitlines()[-1])
+
+
+class StdioClient:
+    """Just enough of an MCP client to time the handshake and call a tool."""
+
+    def __init__(self, env: dict):
+        self.t0 = time.perf_counter()
+        self.proc = subprocess.Popen([sys.executable, "server.py"], cwd=ROOT, env=env, text=True,
+                                     stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        self._next_id = 0
+
+    def send(self, message: dict):
+        self.proc.stdin.write(json.dumps(message) + "\n")
+        self.proc.stdin.flush()
+
+    def request(self, method: str, params: dict) -> dict:
+        self._next_id += 1
+        self.send({"jsonrpc": "2.0", "id": self._next_id, "method": method, "params": params})
+        while True:
+            line = self.proc.stdout.readline()
+            if not line:
+                raise Exception(f"Server exited during {method}")
+            message = json.loads(line)
+            if message.get("id") == self._next_id:
+                return message
+
+    def initialize(self) -> float:
+        self.request("initialize", {"protocolVersion": "2025-06-18", "capabilities": {},
+                                    "clientInfo": {"name": "bench_startup", "version": "0"}})
+        elapsed = time.perf_counter() - self.t0
+        self.send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+        return elapsed
+
+    def health(self) -> dict:
+        response = self.request("tools/call", {"name": "get_health", "arguments": {}})
+        return json.loads(response["result"]["content"][0]["text"])
+
+    def close(self):
+        self.proc.stdin.close()
+        try:
+            self.proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+
+def wait_ready(client: StdioClient, timeout: float) -> tuple:
+    """Polls get_health until the warm-up is over; returns (seconds since spawn, final warm-up state)."""
+    deadline = time.perf_counter() + timeout
+    while True:
+        warm_up = client.health()["warm_up"]
+        if warm_up["state"] in ("ready", "failed") or time.perf_counter() > deadline:
+            return time.perf_counter() - client.t0, warm_up
+        time.sleep(0.05)
+
+
+def summary(samples) -> str:
+    return f"median {statistics.median(samples) * 1000:7.1f} ms | min {min(samples) * 1000:7.1f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--ready", action="store_true", help="also time the background warm-up via get_health")
+    parser.add_argument("--ready-timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    imports, handshakes, ready = [], [], []
+    warm_up = None
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory(prefix="notebooklm-startup-") as state_dir:
+            env = bench_env(state_dir)
+            imports.append(time_import(env))
+            client = StdioClient(env)
+            try:
+                handshakes.append(client.initialize())
+                if args.ready:
+                    elapsed, warm_up = wait_ready(client, args.ready_timeout)
+                    ready.append(elapsed)
+            finally:
+                client.close()
+
+    print(f"import server        {summary(imports)}")
+    print(f"initialize handshake {summary(handshakes)}")
+    if ready:
+        print(f"warm-up finished     {summary(ready)} (last run: {warm_up['state']}"
+              f"{', ' + warm_up['error'] if warm_up.get('error') else ''})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+RPC latency/concurrency benchmark for the batchexecute transports.
+
+Runs NotebookLMClient._execute_rpc against the local stand-in server, so the
+numbers isolate transport overhead (no Google, no network, no rate limits,
+no trace file):
+
+    python -m benchmarks.bench_transport --requests 200 --concurrency 16
+    python -m benchmarks.bench_transport --browser   # also time page.evaluate (needs Chromium)
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import TYPE_CHECKING
+
+from benchmarks.fake_notebooklm import FakeNotebookLM
+
+if TYPE_CHECKING:
+    from notebooklm_client import NotebookLMClient
+    from ratelimit import RpcRateLimiter
+
+FAKE_TOKENS = {"at": "fake-at", "bl": "boq_labs-tailwind-frontend_bench", "fsid": "0"}
+
+
+def unlimited() -> "RpcRateLimiter":
+    """A limiter that never waits, so the request budget doesn't cap the measured throughput."""
+    from ratelimit import RpcRateLimiter
+
+    return RpcRateLimiter(rate=0, limits={})
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+
+async def run(client: "NotebookLMClient", label: str, requests: int, concurrency: int):
+    from notebooklm_client import RPC_LIST_ARTIFACTS
+
+    payload = [[2], "bench-notebook", 'NOT artifact.status = "ARTIFACT_STATUS_SUGGESTED"']
+
+    # Sequential: per-RPC latency
+    latencies = []
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        await client._execute_rpc(RPC_LIST_ARTIFACTS, payload)
+        latencies.append(time.perf_counter() - t0)
+
+    # Concurrent: throughput with `concurrency` RPCs in flight
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with sem:
+            await client._execute_rpc(RPC_LIST_ARTIFACTS, payload)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*[one() for _ in range(requests)])
+    elapsed = time.perf_counter() - t0
+
+    print(f"{label:>8}: p50 {statistics.median(latencies) * 1000:7.2f} ms | "
+          f"p95 {percentile(latencies, 0.95) * 1000:7.2f} ms | "
+          f"{requests / elapsed:8.1f} rpc/s @ concurrency {concurrency}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rpc-delay", type=float, default=0.0, help="server-side delay per request (s)")
+    parser.add_argument("--browser", action="store_true", help="also benchmark the page.evaluate transport")
+    args = parser.parse_args()
+
+    # Read when tracing is first imported: keep span writes out of the timings
+    os.environ["NOTEBOOKLM_TRACE_FILE"] = ""
+    from notebooklm_client import NotebookLMClient
+    from session_cache import SessionCache
+
+    with FakeNotebookLM(rpc_delay=args.rpc_delay) as fake:
+        session = SessionCache(path=None)
+        session.store(FAKE_TOKENS, [])
+
+        client = NotebookLMClient(session=session, transport="http", base_url=fake.base_url,
+                                  rate_limiter=unlimited())
+        try:
+            await run(client, "http", args.requests, args.concurrency)
+        finally:
+            await client.stop()
+
+        if args.browser:
+            from playwright.async_api import async_playwright
+
+            async with async_playwright() as p:
+                browser = await p.chromium.launch(args=["--no-sandbox"])
+                page = await browser.new_page()
+                await page.goto(fake.base_url)
+                client = NotebookLMClient.from_context(
+                    page.context, page, session, transport="browser", base_url=fake.base_url,
+                    rate_limiter=unlimited(),
+                )
+                await run(client, "browser", args.requests, args.concurrency)
+                await browser.close()
+
+        print(f"server handled {fake.request_count} requests")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
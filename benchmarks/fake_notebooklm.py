@@ -0,0 +1,415 @@
+"""
+Local stand-in for notebooklm.google.com.
+
+Runs a threaded stdlib HTTP server (keep-alive HTTP/1.1) in the background so
+NotebookLMClient can be pointed at it with `base_url=fake.base_url` (or
+NOTEBOOKLM_BASE_URL). It serves:
+
+- `/`: a page carrying the session tokens in WIZ_global_data (SNlM0e,
+  cfb2h = boq_labs-tailwind-..., FdrFJe), like the real app shell;
+- the batchexecute endpoint, implementing create notebook, add source, get
+  notebook (source status), generate infographic, list artifacts and delete
+  notebook, with configurable transcript-processing and generation delays;
+- `/artifacts/<artifact_id>.png`: a large generated PNG per infographic
+  (with Range support); a notebook holds one infographic per trigger, over
+  the sources the trigger names;
+- `/static/...`: filler subresources of the page (`asset_size` bytes each,
+  counted in asset_requests).
+
+Handlers can be overridden per RPC ID with handle() (raise RpcError to reject
+a call); unknown IDs get an echo. Several accounts can share one instance:
+add_account() hands out another set of tokens, and `quota` caps how many
+infographics each account may trigger.
+
+Faults can be injected into batchexecute: `faults` lists HTTP statuses to
+answer the next requests with, `fault_rate` fails that fraction of requests
+at random with `fault_status`, outage() fails everything for a while (503),
+and `rate_limit` answers 429 to an account's requests beyond that many per
+second. Failed requests are rejected before any RPC in them runs.
+"""
+import io
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+RPC_PATH = "/_/LabsTailwindUi/data/batchexecute"
+
+RPC_CREATE_NOTEBOOK = "CCqFvf"
+RPC_ADD_SOURCE = "izAoDd"
+RPC_GENERATE_INFOGRAPHIC = "R7cb6c"
+RPC_LIST_ARTIFACTS = "gArtLc"
+RPC_DELETE_NOTEBOOK = "f61S6e"
+RPC_GET_NOTEBOOK = "rLM1Ne"
+
+SOURCE_STATUS_PROCESSING = 1
+SOURCE_STATUS_READY = 2
+ARTIFACT_STATUS_GENERATING = 1
+ARTIFACT_STATUS_READY = 3
+ARTIFACT_TYPE_INFOGRAPHIC = 7
+
+FAKE_AT = "fake-at"
+FAKE_BL = "boq_labs-tailwind-frontend_20260101.00_p0"
+FAKE_FSID = "1234567890"
+
+# Like the real app shell, the page pulls in images, a web font, a video and analytics besides the tokens
+TOKEN_PAGE = """<!doctype html><html><head><title>NotebookLM</title>
+<script>window.WIZ_global_data = {{"SNlM0e":"{at}","cfb2h":"{bl}","FdrFJe":"{fsid}","qwAQke":"LabsTailwindUi"}};</script>
+<style>@font-face {{ font-family: "Sans"; src: url("/static/font.woff2"); }} body {{ font-family: "Sans"; }}</style>
+<script async src="/static/gen_204.js"></script>
+</head><body><div id="app">NotebookLM</div>
+<img src="/static/hero-1.png"><img src="/static/hero-2.png"><img src="/static/hero-3.png">
+<video src="/static/intro.mp4" preload="auto" muted></video>
+</body></html>"""
+
+# handler(payload) -> inner result (JSON-serializable), run once per RPC entry
+RpcHandler = Callable[[Any], Any]
+
+
+def encode_response(frames: List[list]) -> str:
+    """Encodes frames in batchexecute's `rt=c` chunked format."""
+    out = [")]}'\n"]
+    for frame in frames:
+        chunk = json.dumps([frame])
+        out.append(f"\n{len(chunk)}\n{chunk}")
+    return "".join(out) + "\n"
+
+
+def sample_png(width: int, height: int, seed: int = 0) -> bytes:
+    """A large PNG that compresses like a real infographic: flat panels, gradients and noisy 'text'."""
+    from PIL import Image, ImageDraw
+
+    image = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    draw = ImageDraw.Draw(image)
+    panel_h = height // 6
+    for i in range(6):
+        color = ((seed * 40 + i * 35) % 256, (i * 60) % 256, (200 - i * 25) % 256)
+        draw.rectangle([40, i * panel_h + 20, width - 40, i * panel_h + panel_h // 3], fill=color)
+        # Noise compresses badly, like dense text and icons do
+        noise = Image.effect_noise((width // 2, panel_h // 2), 64 + seed).convert("RGB")
+        image.paste(noise, (width // 4, i * panel_h + panel_h // 3))
+    buf = io.BytesIO()
+    image.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+class _Artifact:
+    def __init__(self, source_ids: List[str]):
+        self.artifact_id = str(uuid.uuid4())
+        self.source_ids = source_ids
+        self.triggered_at = time.monotonic()
+
+
+class _Notebook:
+    def __init__(self, notebook_id: str):
+        self.notebook_id = notebook_id
+        self.sources: Dict[str, float] = {}   # source ID -> added at
+        self.artifacts: List[_Artifact] = []
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 resets connections when a benchmark opens many at once
+    request_queue_size = 128
+
+
+class RpcError(Exception):
+    """Raised by a handler to reject its call with a wrb.fr status block (e.g. 8 = RESOURCE_EXHAUSTED)."""
+
+    def __init__(self, code: int):
+        super().__init__(f"RPC status {code}")
+        self.code = code
+
+
+class FakeNotebookLM:
+    def __init__(self, rpc_delay: float = 0.0, source_delay: float = 0.0, generation_delay: float = 0.0,
+                 image_size=(2752, 4096), asset_size: int = 256 * 1024, host: str = "127.0.0.1", port: int = 0):
+        self.rpc_delay = rpc_delay
+        self.source_delay = source_delay              # transcript processing time per source
+        self.generation_delay = generation_delay      # infographic generation time after the trigger
+        self.image_size = image_size
+        self.asset_size = asset_size
+        self.at = FAKE_AT
+        # Session token -> account, for serving several accounts; add more with add_account()
+        self.accounts: Dict[str, str] = {FAKE_AT: "default"}
+        # Infographic generations each account may trigger before RESOURCE_EXHAUSTED (absent = unlimited)
+        self.quota: Dict[str, int] = {}
+        self.generations: Dict[str, int] = {}
+        self.handlers: Dict[str, RpcHandler] = {
+            RPC_CREATE_NOTEBOOK: self._create_notebook,
+            RPC_ADD_SOURCE: self._add_source,
+            RPC_GET_NOTEBOOK: self._get_notebook,
+            RPC_GENERATE_INFOGRAPHIC: self._generate_infographic,
+            RPC_LIST_ARTIFACTS: self._list_artifacts,
+            RPC_DELETE_NOTEBOOK: self._delete_notebook,
+        }
+        self.notebooks: Dict[str, _Notebook] = {}
+        # Injected faults (see the module docstring)
+        self.faults: List[int] = []
+        self.fault_rate = 0.0
+        self.fault_status = 503
+        self.rate_limit: Optional[float] = None
+        self.outage_until = 0.0
+        self.fault_count = 0
+        self.throttled_count = 0
+        self._random = random.Random(0)
+        self._buckets: Dict[str, List[float]] = {}   # account -> [tokens, updated at]
+        self.request_count = 0
+        self.rpc_counts: Dict[str, int] = {}
+        self.image_requests = 0
+        self.asset_requests = 0
+        self._image: Optional[bytes] = None
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), self._make_handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def tokens(self) -> Dict[str, str]:
+        return {"at": self.at, "bl": FAKE_BL, "fsid": FAKE_FSID}
+
+    def handle(self, rpc_id: str, handler: RpcHandler):
+        self.handlers[rpc_id] = handler
+
+    def add_account(self, name: str) -> Dict[str, str]:
+        """Registers another account and returns its session tokens."""
+        at = f"{FAKE_AT}-{name}"
+        self.accounts[at] = name
+        return {"at": at, "bl": FAKE_BL, "fsid": FAKE_FSID}
+
+    def outage(self, seconds: float):
+        """Answers every batchexecute request with 503 for the next `seconds`."""
+        self.outage_until = time.monotonic() + seconds
+
+    def _fault(self, account: str) -> Optional[int]:
+        """The HTTP status an injected fault answers this request with, if any."""
+        with self._lock:
+            now = time.monotonic()
+            if self.faults:
+                status = self.faults.pop(0)
+            elif now < self.outage_until:
+                status = 503
+            elif self.fault_rate and self._random.random() < self.fault_rate:
+                status = self.fault_status
+            else:
+                status = None
+            if status is None and self.rate_limit:
+                tokens, updated_at = self._buckets.get(account, [self.rate_limit, now])
+                tokens = min(self.rate_limit, tokens + (now - updated_at) * self.rate_limit)
+                if tokens < 1:
+                    status = 429
+                else:
+                    tokens -= 1
+                self._buckets[account] = [tokens, now]
+            if status == 429:
+                self.throttled_count += 1
+            elif status is not None:
+                self.fault_count += 1
+            return status
+
+    def start(self) -> "FakeNotebookLM":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    @property
+    def image(self) -> bytes:
+        with self._lock:
+            if self._image is None:
+                self._image = sample_png(*self.image_size)
+            return self._image
+
+    # --- RPC handlers ---
+    def _notebook(self, notebook_id: Any) -> Optional[_Notebook]:
+        return self.notebooks.get(notebook_id) if isinstance(notebook_id, str) else None
+
+    def _create_notebook(self, payload):
+        notebook = _Notebook(str(uuid.uuid4()))
+        with self._lock:
+            self.notebooks[notebook.notebook_id] = notebook
+        return ["", None, notebook.notebook_id, None, None, [1, False, True]]
+
+    def _add_source(self, payload):
+        notebook = self._notebook(payload[1])
+        if notebook is None:
+            return None
+        entries = []
+        for source in payload[0]:
+            source_id = str(uuid.uuid4())
+            notebook.sources[source_id] = time.monotonic()
+            url = source[7][0] if len(source) > 7 and source[7] else None
+            entries.append([[source_id], url, [None, None, None, None, 9], [None, SOURCE_STATUS_PROCESSING]])
+        return [entries]
+
+    def _source_status(self, added_at: float) -> int:
+        if time.monotonic() - added_at >= self.source_delay:
+            return SOURCE_STATUS_READY
+        return SOURCE_STATUS_PROCESSING
+
+    def _get_notebook(self, payload):
+        notebook = self._notebook(payload[0])
+        if notebook is None:
+            return None
+        sources = [
+            [[source_id], "Video", [None, None, None, None, 9], [None, self._source_status(added_at)]]
+            for source_id, added_at in notebook.sources.items()
+        ]
+        return [["Notebook", sources, notebook.notebook_id, "📓"]]
+
+    def _generate_infographic(self, payload):
+        notebook = self._notebook(payload[1])
+        if notebook is None:
+            return None
+        # Sources are listed as [[[source_id]], [[source_id]], ...]; reject any other shape, as NotebookLM would
+        try:
+            source_ids = [source[0][0] for source in payload[2][3]]
+        except (IndexError, TypeError):
+            raise RpcError(3)
+        if not source_ids or not all(isinstance(source_id, str) for source_id in source_ids):
+            raise RpcError(3)
+        artifact = _Artifact(source_ids)
+        with self._lock:
+            notebook.artifacts.append(artifact)
+        return [[artifact.artifact_id, "Infographic", ARTIFACT_TYPE_INFOGRAPHIC, None, ARTIFACT_STATUS_GENERATING]]
+
+    def _list_artifacts(self, payload):
+        notebook = self._notebook(payload[1])
+        if notebook is None:
+            return [[]]
+        width, height = self.image_size
+        entries = []
+        for artifact in list(notebook.artifacts):
+            sources = [[[source_id]] for source_id in artifact.source_ids]
+            entry = [artifact.artifact_id, "Infographic", ARTIFACT_TYPE_INFOGRAPHIC, sources]
+            if time.monotonic() - artifact.triggered_at < self.generation_delay:
+                entry.append(ARTIFACT_STATUS_GENERATING)
+            else:
+                image_url = f"{self.base_url}/artifacts/{artifact.artifact_id}.png"
+                entry += [ARTIFACT_STATUS_READY, None, [image_url, width, height]]
+            entries.append(entry)
+        return [entries]
+
+    def _delete_notebook(self, payload):
+        with self._lock:
+            self.notebooks.pop(payload[0][0], None)
+        return []
+
+    def _charge_generation(self, account: str):
+        with self._lock:
+            used = self.generations.get(account, 0)
+            if account in self.quota and used >= self.quota[account]:
+                raise RpcError(8)
+            self.generations[account] = used + 1
+
+    # --- batchexecute ---
+    def batchexecute(self, query: Dict[str, List[str]], form: Dict[str, List[str]]):
+        """Returns (status, body) for one batchexecute POST."""
+        with self._lock:
+            self.request_count += 1
+        account = self.accounts.get(form.get("at", [None])[0])
+        if account is None:
+            return 401, "Unauthorized"
+        fault = self._fault(account)
+        if fault is not None:
+            return fault, "Injected fault"
+        try:
+            envelope = json.loads(form["f.req"][0])
+            entries = envelope[0]
+        except Exception:
+            return 400, "Bad Request"
+
+        if self.rpc_delay:
+            time.sleep(self.rpc_delay)
+
+        frames = []
+        for rpc_id, inner_payload, _, index in entries:
+            with self._lock:
+                self.rpc_counts[rpc_id] = self.rpc_counts.get(rpc_id, 0) + 1
+            handler = self.handlers.get(rpc_id, lambda payload, rpc_id=rpc_id: ["echo", rpc_id, payload])
+            try:
+                if rpc_id == RPC_GENERATE_INFOGRAPHIC:
+                    self._charge_generation(account)
+                result = handler(json.loads(inner_payload) if inner_payload else None)
+            except RpcError as e:
+                frames.append(["wrb.fr", rpc_id, None, None, None, [e.code], index])
+                continue
+            frames.append(["wrb.fr", rpc_id, json.dumps(result) if result is not None else None,
+                           None, None, None, index])
+        frames.append(["di", 42])
+        return 200, encode_response(frames)
+
+    def _make_handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status: int, body: bytes, content_type: str, headers: Optional[Dict[str, str]] = None):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                length = int(self.headers.get("Content-Length", 0))
+                body = self.rfile.read(length).decode("utf-8")
+                if url.path != RPC_PATH:
+                    self._send(404, b"Not Found", "text/plain")
+                    return
+                status, text = fake.batchexecute(parse_qs(url.query), parse_qs(body))
+                self._send(status, text.encode("utf-8"), "application/json; charset=utf-8")
+
+            def do_GET(self):
+                path = urlparse(self.path).path
+                if path.startswith("/artifacts/"):
+                    self._send_image()
+                    return
+                if path.startswith("/static/"):
+                    with fake._lock:
+                        fake.asset_requests += 1
+                    self._send(200, bytes(fake.asset_size), "application/octet-stream")
+                    return
+                # App shell with the session tokens (also a same-origin page for the browser transport)
+                page = TOKEN_PAGE.format(at=fake.at, bl=FAKE_BL, fsid=FAKE_FSID)
+                self._send(200, page.encode("utf-8"), "text/html; charset=utf-8")
+
+            def _send_image(self):
+                with fake._lock:
+                    fake.image_requests += 1
+                data = fake.image
+                match = re.match(r"bytes=(\d+)-", self.headers.get("Range", ""))
+                if match and int(match.group(1)) < len(data):
+                    start = int(match.group(1))
+                    self._send(206, data[start:], "image/png",
+                               {"Content-Range": f"bytes {start}-{len(data) - 1}/{len(data)}"})
+                else:
+                    self._send(200, data, "image/png", {"Accept-Ranges": "bytes"})
+
+        return Handler
@@ -1,42 +1,223 @@
-import os
-import zipfile
+import argparse
+import glob
+import hashlib
 import json
-from PIL import Image, ImageDraw
-
-def create_icons():
-    if not os.path.exists('icons'):
-        os.makedirs('icons')
-    
-    sizes = [16, 48, 128]
-    for size in sizes:
+import os
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+# --- CONFIGURATION ---
+ROOT = os.path.dirname(os.path.abspath(__file__))
+MANIFEST = "manifest.json"
+ZIP_FILENAME = "notebooklm_extension.zip"
+# Content hashes of the last build's inputs, and their compressed forms keyed by hash
+BUILD_DIR = os.path.join(ROOT, ".build")
+STATE_FILE = os.path.join(BUILD_DIR, "state.json")
+BLOB_DIR = os.path.join(BUILD_DIR, "blobs")
+COMPRESSION_LEVEL = 9
+# Fixed entry timestamp (1980-01-01 00:00, the zip epoch) so identical inputs give an identical zip
+ZIP_DATE, ZIP_TIME = (0 << 9) | (1 << 5) | 1, 0
+
+
+def manifest_files(manifest: dict) -> list:
+    """Every file the manifest makes Chrome load: scripts, styles, icons, pages and web resources."""
+    paths = [MANIFEST]
+
+    def add(value):
+        if isinstance(value, str):
+            paths.append(value)
+        elif isinstance(value, dict):
+            for v in value.values():
+                add(v)
+        elif isinstance(value, list):
+            for v in value:
+                add(v)
+
+    background = manifest.get("background", {})
+    add(background.get("service_worker"))
+    add(background.get("scripts"))
+    add(background.get("page"))
+    for script in manifest.get("content_scripts", []):
+        add(script.get("js"))
+        add(script.get("css"))
+    add(manifest.get("icons"))
+    for key in ("action", "browser_action", "page_action"):
+        action = manifest.get(key, {})
+        add(action.get("default_icon"))
+        add(action.get("default_popup"))
+    add(manifest.get("options_page"))
+    add(manifest.get("options_ui", {}).get("page"))
+    add(manifest.get("devtools_page"))
+    add(manifest.get("side_panel", {}).get("default_path"))
+    for entry in manifest.get("web_accessible_resources", []):
+        add(entry.get("resources") if isinstance(entry, dict) else entry)
+    if manifest.get("default_locale"):
+        paths.append("_locales/*/messages.json")
+
+    files = []
+    for path in dict.fromkeys(p.lstrip("/") for p in paths if p):
+        matches = sorted(glob.glob(os.path.join(ROOT, path))) if glob.has_magic(path) else [os.path.join(ROOT, path)]
+        files.extend(os.path.relpath(m, ROOT).replace(os.sep, "/") for m in matches)
+    return list(dict.fromkeys(files))
+
+
+def create_icons(manifest: dict) -> int:
+    """Draws the placeholder icons the manifest lists, only those that don't exist yet."""
+    missing = [(int(size), path) for size, path in manifest.get("icons", {}).items()
+               if not os.path.exists(os.path.join(ROOT, path))]
+    if not missing:
+        return 0
+    # Only needed when an icon has to be drawn
+    from PIL import Image, ImageDraw
+
+    for size, path in missing:
+        os.makedirs(os.path.dirname(os.path.join(ROOT, path)), exist_ok=True)
         img = Image.new('RGB', (size, size), color = (26, 115, 232))
         d = ImageDraw.Draw(img)
         d.text((size//4, size//4), "N", fill=(255,255,255))
-        img.save(f'icons/icon{size}.png')
-    print("Generated placeholder icons.")
-
-def zip_extension():
-    zip_filename = 'notebooklm_extension.zip'
-    with zipfile.ZipFile(zip_filename, 'w', zipfile.ZIP_DEFLATED) as zipf:
-        # Walk the directory
-        for root, dirs, files in os.walk('.'):
-            for file in files:
-                if file in ['build.py', 'requirements.txt', zip_filename, '.DS_Store']:
-                    continue
-                if 'venv' in root or '.git' in root or '__pycache__' in root:
-                    continue
-                
-                path = os.path.join(root, file)
-                zipf.write(path, path)
-    print(f"Extension packed into {zip_filename}")
+        img.save(os.path.join(ROOT, path))
+    print(f"Generated {len(missing)} placeholder icons.")
+    return len(missing)
+
+
+def load_state() -> dict:
+    try:
+        with open(STATE_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {"files": {}, "zip": None}
+
+
+def save_state(state: dict):
+    os.makedirs(BUILD_DIR, exist_ok=True)
+    tmp_path = f"{STATE_FILE}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, STATE_FILE)
+
+
+def fingerprint(path: str, previous: dict) -> dict:
+    """Size, mtime and SHA-256 of a file; the hash is reused while size and mtime are unchanged."""
+    st = os.stat(os.path.join(ROOT, path))
+    if previous and previous["size"] == st.st_size and previous["mtime_ns"] == st.st_mtime_ns:
+        return previous
+    with open(os.path.join(ROOT, path), "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": digest}
+
+
+def compress(path: str, digest: str) -> str:
+    """Raw-deflates a file into BLOB_DIR (once per content hash); returns the blob path."""
+    blob = os.path.join(BLOB_DIR, digest)
+    if not os.path.exists(blob):
+        with open(os.path.join(ROOT, path), "rb") as f:
+            data = f.read()
+        # zlib releases the GIL, so files compress in parallel on the thread pool
+        compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, -15)
+        tmp_path = f"{blob}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(compressor.compress(data) + compressor.flush())
+        os.replace(tmp_path, blob)
+    return blob
+
+
+def write_zip(zip_path: str, entries: list):
+    """
+    Writes (name, data, deflated) entries as a zip, atomically: to a temp
+    file that replaces `zip_path` once complete. Entries that don't shrink
+    when deflated are stored as they are (e.g. PNG icons).
+    """
+    tmp_path = f"{zip_path}.tmp"
+    central = []
+    with open(tmp_path, "wb") as f:
+        for name, data, deflated in entries:
+            name_bytes = name.encode("utf-8")
+            method, payload = (8, deflated) if len(deflated) < len(data) else (0, data)
+            crc = zlib.crc32(data)
+            offset = f.tell()
+            f.write(struct.pack("<IHHHHHIIIHH", 0x04034B50, 20, 0x800, method, ZIP_TIME, ZIP_DATE,
+                                crc, len(payload), len(data), len(name_bytes), 0))
+            f.write(name_bytes)
+            f.write(payload)
+            central.append(struct.pack("<IHHHHHHIIIHHHHHII", 0x02014B50, 20, 20, 0x800, method, ZIP_TIME,
+                                       ZIP_DATE, crc, len(payload), len(data), len(name_bytes), 0, 0, 0, 0,
+                                       0o100644 << 16, offset) + name_bytes)
+        directory_offset = f.tell()
+        for record in central:
+            f.write(record)
+        directory_size = f.tell() - directory_offset
+        f.write(struct.pack("<IHHHHIIH", 0x06054B50, 0, 0, len(entries), len(entries),
+                            directory_size, directory_offset, 0))
+    os.replace(tmp_path, zip_path)
+
+
+def zip_extension(zip_filename: str = ZIP_FILENAME, force: bool = False) -> bool:
+    """
+    Packs the files manifest.json references into `zip_filename`.
+
+    Returns False (and leaves the zip alone) when the inputs' content hashes
+    match the last build and the zip is still the one it wrote. Only inputs
+    whose content changed are compressed again.
+    """
+    with open(os.path.join(ROOT, MANIFEST)) as f:
+        manifest = json.load(f)
+    create_icons(manifest)
+
+    files = manifest_files(manifest)
+    missing = [path for path in files if not os.path.isfile(os.path.join(ROOT, path))]
+    if missing:
+        raise Exception(f"manifest.json references missing files: {', '.join(missing)}")
+
+    state = load_state()
+    inputs = {path: fingerprint(path, state["files"].get(path)) for path in files}
+    zip_path = os.path.join(ROOT, zip_filename)
+    unchanged = {p: i["sha256"] for p, i in inputs.items()} == {p: i["sha256"] for p, i in state["files"].items()}
+    if not force and unchanged and state.get("zip") and os.path.exists(zip_path):
+        zip_stat = os.stat(zip_path)
+        if [zip_stat.st_size, zip_stat.st_mtime_ns] == state["zip"]:
+            print(f"{zip_filename} is up to date ({len(files)} files).")
+            save_state({"files": inputs, "zip": state["zip"]})
+            return False
+
+    os.makedirs(BLOB_DIR, exist_ok=True)
+    stale = [p for p in files if not os.path.exists(os.path.join(BLOB_DIR, inputs[p]["sha256"]))]
+    with ThreadPoolExecutor() as executor:
+        blobs = list(executor.map(lambda p: compress(p, inputs[p]["sha256"]), files))
+
+    entries = []
+    for path, blob in zip(files, blobs):
+        with open(os.path.join(ROOT, path), "rb") as f:
+            data = f.read()
+        with open(blob, "rb") as f:
+            entries.append((path, data, f.read()))
+    write_zip(zip_path, entries)
+
+    # Drop blobs no current input refers to
+    live = {i["sha256"] for i in inputs.values()}
+    for name in os.listdir(BLOB_DIR):
+        if name not in live:
+            os.remove(os.path.join(BLOB_DIR, name))
+
+    zip_stat = os.stat(zip_path)
+    save_state({"files": inputs, "zip": [zip_stat.st_size, zip_stat.st_mtime_ns]})
+    print(f"Extension packed into {zip_filename}: {len(files)} files ({len(stale)} recompressed), "
+          f"{zip_stat.st_size / 1024:.1f} KB")
+    return True
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Packs the Chrome extension described by manifest.json.")
+    parser.add_argument("--force", action="store_true", help="rebuild even if no input changed")
+    parser.add_argument("--output", default=ZIP_FILENAME, help=f"zip to write (default: {ZIP_FILENAME})")
+    args = parser.parse_args()
+
     print("Building NotebookLM Extension...")
     try:
-        create_icons()
-        zip_extension()
+        zip_extension(args.output, force=args.force)
         print("Build Complete.")
-    except Exception as e:
+    except ImportError as e:
         print(f"Build failed: {e}")
-        # If PIL is missing, warn user
+        # PIL is only needed to draw missing icons
         print("Note: Install 'pillow' to generate icons: pip install pillow")
+    except Exception as e:
+        print(f"Build failed: {e}")
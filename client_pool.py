@@ -0,0 +1,278 @@
+import asyncio
+import time
+import logging
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Optional, AsyncIterator
+
+from notebooklm_client import (
+    NotebookLMClient, start_playwright, launch_persistent_context, launch_browser, new_light_context,
+    resolve_browser_mode, BASE_URL, BROWSER_MODE, STORAGE_STATE_FILE,
+)
+from session_cache import SessionCache
+from result_store import DEFAULT_ACCOUNT
+from transports import HttpTransport
+from ratelimit import RpcRateLimiter
+from resilience import CircuitBreaker
+from notebook_lifecycle import NotebookLifecycle
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, Page
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+DEFAULT_POOL_SIZE = 2
+DEFAULT_MAX_PAGE_USES = 50          # recycle a page after this many leases
+DEFAULT_MAX_PAGE_AGE = 30 * 60      # ...or after this many seconds
+HEALTH_CHECK_TIMEOUT = 5
+
+
+class _PageSlot:
+    """A pooled page plus the bookkeeping needed to decide when to recycle it."""
+
+    def __init__(self, page: "Page", generation: int):
+        self.page = page
+        self.generation = generation  # which browser launch the page belongs to
+        self.created_at = time.monotonic()
+        self.uses = 0
+        self.broken = False
+
+
+class SharedBrowser:
+    """
+    One Chromium process for light-mode contexts.
+
+    Each pool (e.g. one per account) opens its own non-persistent context in
+    it, seeded from that account's exported storage state, instead of
+    launching a browser per profile. Relaunched if the process dies.
+    """
+
+    def __init__(self, headless: bool = True):
+        self.headless = headless
+        self.playwright = None
+        self.browser = None
+        self._lock = asyncio.Lock()
+
+    async def new_context(self, storage_state: str) -> "BrowserContext":
+        async with self._lock:
+            if self.browser is None or not self.browser.is_connected():
+                if self.playwright is None:
+                    self.playwright = await start_playwright()
+                logger.info("[Pool] 🚀 Launching shared browser...")
+                self.browser = await launch_browser(self.playwright, self.headless)
+        return await new_light_context(self.browser, storage_state)
+
+    async def close(self):
+        try:
+            if self.browser is not None:
+                await self.browser.close()
+        except Exception as e:
+            logger.warning("[Pool] Error closing shared browser: %s", e)
+        try:
+            if self.playwright is not None:
+                await self.playwright.stop()
+        except Exception as e:
+            logger.warning("[Pool] Error stopping Playwright: %s", e)
+        self.browser = None
+        self.playwright = None
+
+
+class ClientPool:
+    """
+    Pool of NotebookLM clients for one Google account, sharing one browser.
+
+    The Playwright driver and the browser context are launched once: the
+    account's persistent profile (`user_data` by default), or in "light"
+    mode a context seeded from the account's exported storage state inside
+    a (possibly shared) SharedBrowser. Each request leases one of `size`
+    pages, already sitting on the NotebookLM origin, wrapped in a
+    NotebookLMClient. Pages are health-checked on lease and recycled when
+    they crash, get too old or have been used too often. If the whole
+    context dies it is relaunched. Several accounts get one pool each behind
+    an AccountScheduler.
+    """
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, headless: bool = True,
+                 max_page_uses: int = DEFAULT_MAX_PAGE_USES,
+                 max_page_age: float = DEFAULT_MAX_PAGE_AGE,
+                 session: Optional[SessionCache] = None, notebooks: Optional[NotebookLifecycle] = None,
+                 browser_mode: str = BROWSER_MODE, storage_state: str = STORAGE_STATE_FILE,
+                 shared_browser: Optional[SharedBrowser] = None, user_data_dir: Optional[str] = None,
+                 account: str = DEFAULT_ACCOUNT):
+        self.size = max(1, size)
+        self.account = account
+        self.user_data_dir = user_data_dir
+        self.headless = headless
+        self.max_page_uses = max_page_uses
+        self.max_page_age = max_page_age
+        self.browser_mode = browser_mode
+        self.storage_state = storage_state
+
+        self.playwright = None
+        self.context = None
+        # Light mode opens its context here; a browser passed in is shared with other pools
+        self.shared_browser = shared_browser
+        self._owns_browser = shared_browser is None
+        # Shared by every leased client, so a token refresh happens once for the whole pool
+        self.session = session if session is not None else SessionCache()
+        # One keep-alive connection pool for direct HTTP RPCs, shared like the session
+        self.http_transport = HttpTransport(self.session, BASE_URL) if HttpTransport.available() else None
+        # All pages act for the same Google account, so they share its request budget and circuit breaker
+        self.rate_limiter = RpcRateLimiter()
+        self.breaker = CircuitBreaker()
+        # Spare notebooks and the reaper, shared by every leased client
+        self.notebooks = notebooks
+
+        self._slots: Optional[asyncio.Queue] = None
+        self._start_lock = asyncio.Lock()
+        self._started = False
+        self._context_dead = False
+        self._closed = False
+        self._generation = 0
+
+    @property
+    def ready(self) -> bool:
+        return self._started and not self._context_dead
+
+    async def start(self):
+        """Launches the browser and warms the page pool. Safe to call repeatedly."""
+        if self.ready:
+            return
+        async with self._start_lock:
+            if self.ready:
+                return
+            if self._closed:
+                raise Exception("Client pool is closed")
+            await self._launch()
+
+    async def _launch(self):
+        t0 = time.monotonic()
+        if self.context is not None:
+            # The previous context crashed or was closed under us
+            await self._teardown()
+
+        mode = resolve_browser_mode(self.browser_mode, self.storage_state)
+        logger.info("[Pool] 🚀 Launching %s browser context for %s (pool size %s)...", mode, self.account, self.size)
+        if mode == "light":
+            if self.shared_browser is None:
+                self.shared_browser = SharedBrowser(self.headless)
+            self.context = await self.shared_browser.new_context(self.storage_state)
+        else:
+            self.playwright = await start_playwright()
+            self.context = await launch_persistent_context(self.playwright, self.headless, self.user_data_dir)
+        self._context_dead = False
+        self._generation += 1
+        self.context.on("close", self._on_context_close)
+
+        # The first page loads cached tokens (or scrapes them) for the whole pool
+        first_page = self.context.pages[0] if self.context.pages else await self.context.new_page()
+        await self._client_for(first_page).ensure_session()
+
+        stale, self._slots = self._slots, asyncio.Queue()
+        if stale is not None:
+            # Wake leases still waiting on the old queue; they move on to this one
+            stale.put_nowait(None)
+        self._slots.put_nowait(_PageSlot(first_page, self._generation))
+        for _ in range(self.size - 1):
+            self._slots.put_nowait(_PageSlot(await self._new_page(), self._generation))
+
+        self._started = True
+        logger.info("[Pool] ✅ Pool for %s ready in %.2fs", self.account, time.monotonic() - t0)
+
+    def _on_context_close(self, *_):
+        if not self._closed:
+            logger.warning("[Pool] ⚠️ Browser context closed unexpectedly; it will be relaunched.")
+        self._context_dead = True
+
+    def _client_for(self, page: "Page") -> NotebookLMClient:
+        return NotebookLMClient.from_context(
+            self.context, page, self.session, headless=self.headless,
+            http_transport=self.http_transport, rate_limiter=self.rate_limiter, notebooks=self.notebooks,
+            browser_mode=self.browser_mode, storage_state=self.storage_state,
+            user_data_dir=self.user_data_dir, account=self.account, breaker=self.breaker
+        )
+
+    async def _new_page(self) -> "Page":
+        """Opens a page on the NotebookLM origin (needed for same-origin RPC fetches)."""
+        page = await self.context.new_page()
+        await self._client_for(page).ensure_session()
+        return page
+
+    async def _is_healthy(self, slot: _PageSlot) -> bool:
+        if slot.broken or slot.page.is_closed():
+            return False
+        if slot.uses >= self.max_page_uses:
+            return False
+        if time.monotonic() - slot.created_at > self.max_page_age:
+            return False
+        try:
+            await asyncio.wait_for(slot.page.evaluate("1"), timeout=HEALTH_CHECK_TIMEOUT)
+            return True
+        except Exception as e:
+            logger.warning("[Pool] Page health check failed: %s", e)
+            return False
+
+    async def _recycle(self, slot: _PageSlot) -> _PageSlot:
+        logger.info("[Pool] ♻️ Recycling page (uses=%s)", slot.uses)
+        try:
+            if not slot.page.is_closed():
+                await slot.page.close()
+        except Exception as e:
+            logger.warning("[Pool] Failed to close stale page: %s", e)
+        return _PageSlot(await self._new_page(), self._generation)
+
+    async def _take_slot(self) -> _PageSlot:
+        """Waits for a free page, following the queue across relaunches."""
+        while True:
+            await self.start()
+            slots = self._slots
+            slot = await slots.get()
+            if slot is not None:
+                return slot
+            # The context was relaunched while we waited: pass the wake-up on to the next waiter
+            slots.put_nowait(None)
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[NotebookLMClient]:
+        """Leases a ready-to-use client for the duration of one request."""
+        slot = await self._take_slot()
+        try:
+            if self._context_dead:
+                # Relaunch replaces the queue; drop this stale slot
+                slot = None
+                slot = await self._take_slot()
+            if not await self._is_healthy(slot):
+                slot = await self._recycle(slot)
+
+            yield self._client_for(slot.page)
+        except BaseException:
+            if slot is not None and slot.page.is_closed():
+                slot.broken = True
+            raise
+        finally:
+            if slot is not None and slot.generation == self._generation:
+                slot.uses += 1
+                self._slots.put_nowait(slot)
+
+    async def _teardown(self):
+        try:
+            if self.context is not None:
+                await self.context.close()
+        except Exception as e:
+            logger.warning("[Pool] Error closing context: %s", e)
+        try:
+            if self.playwright is not None:
+                await self.playwright.stop()
+        except Exception as e:
+            logger.warning("[Pool] Error stopping Playwright: %s", e)
+        self.context = None
+        self.playwright = None
+        self._started = False
+
+    async def close(self):
+        self._closed = True
+        await self._teardown()
+        if self.shared_browser is not None and self._owns_browser:
+            await self.shared_browser.close()
+        if self.http_transport is not None:
+            await self.http_transport.close()
@@ -0,0 +1,248 @@
+import asyncio
+import contextvars
+import io
+import os
+import shutil
+import tempfile
+import threading
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Dict, Optional, Union
+
+from tracing import span
+
+if TYPE_CHECKING:
+    # PIL is imported on first use, so importing this module (e.g. at server startup) stays cheap
+    from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+DEFAULT_MAX_WIDTH = 1024
+DEFAULT_FORMAT = "JPEG"
+DEFAULT_QUALITY = 85
+MIN_QUALITY = 35
+# Encoded bytes allowed per inline image; base64 adds a third on top (MCP payload limits)
+DEFAULT_BYTE_BUDGET = int(os.environ.get("NOTEBOOKLM_IMAGE_BYTE_BUDGET", 750_000))
+# "thread" (Pillow releases the GIL while decoding/resampling/encoding) or "process"
+EXECUTOR_KIND = os.environ.get("NOTEBOOKLM_IMAGE_EXECUTOR", "thread")
+MAX_WORKERS = int(os.environ.get("NOTEBOOKLM_IMAGE_WORKERS", min(4, os.cpu_count() or 1)))
+# Integer box-reduce while the image is at least this factor larger than the target, then LANCZOS.
+# 1.0 halves the resample cost of a 2752px infographic; larger values trade speed for sharpness.
+REDUCING_GAP = 1.0
+# Downloaded bytes kept in RAM before the spool file rolls over to disk
+SPOOL_MAX_MEMORY = 1024 * 1024
+
+MIME_TYPES = {"JPEG": "image/jpeg", "WEBP": "image/webp", "PNG": "image/png"}
+
+
+class RenderSpec:
+    """
+    How to render an infographic: maximum width, output format and quality.
+
+    With a `byte_budget`, the quality is lowered (never below MIN_QUALITY)
+    until the encoded image fits, instead of always using `quality`.
+    """
+
+    def __init__(self, max_width: int = DEFAULT_MAX_WIDTH, format: str = DEFAULT_FORMAT,
+                 quality: int = DEFAULT_QUALITY, byte_budget: Optional[int] = DEFAULT_BYTE_BUDGET):
+        self.max_width = max_width
+        self.format = format.upper()
+        self.quality = quality
+        self.byte_budget = byte_budget or None
+
+    @property
+    def mime_type(self) -> str:
+        return MIME_TYPES[self.format]
+
+    def params(self) -> Dict[str, Any]:
+        """Everything that affects the output; used as the rendition cache key."""
+        return {"width": self.max_width, "format": self.format, "quality": self.quality,
+                "byte_budget": self.byte_budget}
+
+
+class Rendition:
+    """An encoded image produced by render()."""
+
+    __slots__ = ("data", "mime_type", "width", "height", "quality")
+
+    def __init__(self, data: bytes, mime_type: str, width: int, height: int, quality: int):
+        self.data = data
+        self.mime_type = mime_type
+        self.width = width
+        self.height = height
+        self.quality = quality
+
+
+# One scratch buffer per worker thread, reused across encodes
+_buffers = threading.local()
+
+
+def _scratch_buffer() -> io.BytesIO:
+    buf = getattr(_buffers, "buf", None)
+    if buf is None:
+        buf = _buffers.buf = io.BytesIO()
+    buf.seek(0)
+    buf.truncate()
+    return buf
+
+
+def _encode(image: "Image.Image", spec: RenderSpec, quality: int) -> bytes:
+    buf = _scratch_buffer()
+    options = {"quality": quality}
+    if spec.format == "JPEG":
+        options["optimize"] = True
+    elif spec.format == "WEBP":
+        options["method"] = 4
+    image.save(buf, format=spec.format, **options)
+    return buf.getvalue()
+
+
+class ImageSink:
+    """
+    Destination of a streamed image download.
+
+    Raw bytes are spooled to a temp file (in RAM up to SPOOL_MAX_MEMORY, then
+    on disk) and fed to an incremental PIL parser as they arrive, so decoding
+    overlaps the transfer and only the decoded image stays resident.
+    """
+
+    def __init__(self):
+        self.file = None
+        self.reset()
+
+    def reset(self):
+        if self.file is not None:
+            self.file.close()
+        from PIL import ImageFile
+
+        self.file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+        self.parser = ImageFile.Parser()
+        self.bytes_received = 0
+        self._parse_failed = False
+
+    async def write(self, chunk: bytes):
+        self.file.write(chunk)
+        self.bytes_received += len(chunk)
+        if not self._parse_failed:
+            try:
+                await asyncio.to_thread(self.parser.feed, chunk)
+            except Exception as e:
+                # Decoded from the spool file instead once the download completes
+                logger.warning("[ImagePipeline] Incremental decode failed: %s", e)
+                self._parse_failed = True
+
+    def image(self) -> "Image.Image":
+        """The decoded image; call once the download has finished."""
+        from PIL import Image
+
+        if not self._parse_failed:
+            try:
+                return self.parser.close()
+            except Exception as e:
+                logger.warning("[ImagePipeline] Incremental decode failed at close: %s", e)
+        self.file.seek(0)
+        image = Image.open(self.file)
+        image.load()
+        return image
+
+    def save(self, path: str):
+        """Copies the raw downloaded bytes to `path`."""
+        self.file.seek(0)
+        with open(path, "wb") as f:
+            shutil.copyfileobj(self.file, f)
+
+    def close(self):
+        self.file.close()
+
+
+def render(source: Union[bytes, "Image.Image"], spec: RenderSpec) -> Rendition:
+    """
+    Downscales and encodes an image, given either its encoded bytes or an
+    already decoded image. CPU-bound; call through render_async() from the
+    event loop.
+    """
+    from PIL import Image
+
+    if isinstance(source, Image.Image):
+        image = source
+    else:
+        image = Image.open(io.BytesIO(source))
+    src_size = image.size
+
+    target = None
+    with span("resize", size=list(src_size)):
+        if image.width > spec.max_width:
+            target = (spec.max_width, int(image.height * spec.max_width / image.width))
+            if not isinstance(source, Image.Image):
+                # JPEG sources can be DCT-scaled while decoding (no-op for PNG)
+                image.draft("RGB", target)
+
+        if image.mode not in ("RGB", "RGBA", "L"):
+            has_alpha = "A" in image.mode or "transparency" in image.info
+            image = image.convert("RGBA" if has_alpha else "RGB")
+
+        if target:
+            # Cheap integer reduce first, high-quality LANCZOS only for the last step
+            image = image.resize(target, Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP)
+
+        # JPEG doesn't support Alpha
+        if spec.format == "JPEG" and image.mode != "RGB":
+            image = image.convert("RGB")
+
+    with span("encode", format=spec.format) as encode_span:
+        quality = spec.quality
+        data = _encode(image, spec, quality)
+        if spec.byte_budget and len(data) > spec.byte_budget:
+            # Binary search for the highest quality that fits the budget
+            lo, hi, best = MIN_QUALITY, quality - 1, None
+            while lo <= hi:
+                mid = (lo + hi) // 2
+                candidate = _encode(image, spec, mid)
+                if len(candidate) <= spec.byte_budget:
+                    best, quality, lo = candidate, mid, mid + 1
+                else:
+                    hi = mid - 1
+            if best is None:
+                quality = MIN_QUALITY
+                best = _encode(image, spec, quality)
+                logger.warning("[ImagePipeline] %s bytes at minimum quality exceeds budget %s",
+                               len(best), spec.byte_budget)
+            data = best
+        encode_span.set(quality=quality, bytes=len(data))
+
+    logger.info("[ImagePipeline] %s -> %s %s q%s: %s bytes", src_size, image.size, spec.format, quality, len(data))
+    return Rendition(data, spec.mime_type, image.width, image.height, quality)
+
+
+_executor: Optional[Executor] = None
+_executor_lock = threading.Lock()
+
+
+def executor() -> Executor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            if EXECUTOR_KIND == "process":
+                _executor = ProcessPoolExecutor(max_workers=MAX_WORKERS)
+            else:
+                _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="image-pipeline")
+        return _executor
+
+
+async def render_async(source: Union[bytes, "Image.Image"], spec: RenderSpec) -> Rendition:
+    """Runs render() in the image worker pool so the event loop stays responsive."""
+    loop = asyncio.get_running_loop()
+    pool = executor()
+    if isinstance(pool, ThreadPoolExecutor):
+        # Carry the current span over so resize/encode nest under it
+        return await loop.run_in_executor(pool, contextvars.copy_context().run, render, source, spec)
+    return await loop.run_in_executor(pool, render, source, spec)
+
+
+def shutdown():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
@@ -0,0 +1,309 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import logging
+from typing import Optional, Dict, Any, List
+
+from youtube import extract_video_id
+from tracing import span
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+DEFAULT_JOB_WORKERS = int(os.environ.get("NOTEBOOKLM_JOB_WORKERS", 4))
+MAX_JOB_ATTEMPTS = 3   # runs interrupted by a restart count as attempts too
+# Each process stamps the jobs it runs this often; a running job whose stamp is older than
+# JOB_STALE_AFTER belongs to a process that died, and is requeued by whichever one notices
+JOB_HEARTBEAT_INTERVAL = 30
+JOB_STALE_AFTER = 3 * JOB_HEARTBEAT_INTERVAL
+
+STATE_QUEUED = "queued"
+STATE_RUNNING = "running"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id      TEXT PRIMARY KEY,
+    video_url   TEXT NOT NULL,
+    video_id    TEXT,
+    state       TEXT NOT NULL,
+    stage       TEXT,
+    notebook_id TEXT,
+    source_id   TEXT,
+    image_url   TEXT,
+    error       TEXT,
+    timeout     REAL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    stage_times TEXT NOT NULL DEFAULT '{}',
+    owner       TEXT,
+    heartbeat   REAL,
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs(state, created_at);
+CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at);
+"""
+
+
+class JobStore:
+    """
+    Durable infographic jobs in SQLite: state, pipeline stage, notebook and
+    source IDs, per-stage timestamps and the result. WAL mode, like the
+    result store, so several server processes can share it: a job is
+    claimed atomically by one of them (`owner`), which keeps its
+    `heartbeat` fresh while running it.
+    """
+
+    def __init__(self, path: str, owner: Optional[str] = None):
+        self.path = path
+        self.owner = owner or uuid.uuid4().hex[:12]
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        """Adds columns introduced after a database was created."""
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, kind in (("owner", "TEXT"), ("heartbeat", "REAL")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    @staticmethod
+    def _row(row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(row)
+        job["stage_times"] = json.loads(job["stage_times"] or "{}")
+        return job
+
+    def create(self, video_url: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        self._execute(
+            """
+            INSERT INTO jobs (job_id, video_url, video_id, state, stage, timeout, stage_times, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (job_id, video_url, extract_video_id(video_url), STATE_QUEUED, STATE_QUEUED, timeout,
+             json.dumps({STATE_QUEUED: now}), now, now),
+        )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self._row(self._execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone())
+
+    def recent(self, state: Optional[str] = None, limit: int = 20) -> List[Dict[str, Any]]:
+        if state:
+            rows = self._execute("SELECT * FROM jobs WHERE state = ? ORDER BY created_at DESC LIMIT ?",
+                                 (state, limit)).fetchall()
+        else:
+            rows = self._execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+        return [self._row(r) for r in rows]
+
+    def latest_with_notebook(self) -> Optional[Dict[str, Any]]:
+        return self._row(self._execute(
+            "SELECT * FROM jobs WHERE notebook_id IS NOT NULL ORDER BY updated_at DESC LIMIT 1"
+        ).fetchone())
+
+    def counts(self) -> Dict[str, int]:
+        rows = self._execute("SELECT state, COUNT(*) AS n FROM jobs GROUP BY state").fetchall()
+        return {r["state"]: r["n"] for r in rows}
+
+    def pending_ids(self) -> List[str]:
+        rows = self._execute("SELECT job_id FROM jobs WHERE state = ? ORDER BY created_at", (STATE_QUEUED,)).fetchall()
+        return [r["job_id"] for r in rows]
+
+    def requeue_interrupted(self, stale_after: float = JOB_STALE_AFTER) -> List[str]:
+        """
+        Puts jobs left running by a process that stopped heartbeating back in
+        the queue (or fails them after MAX_JOB_ATTEMPTS); returns the requeued IDs.
+        """
+        now = time.time()
+        stale = "state = ? AND (heartbeat IS NULL OR heartbeat < ?)"
+        failed = self._execute(
+            f"UPDATE jobs SET state = ?, error = ?, updated_at = ? WHERE {stale} AND attempts >= ?",
+            (STATE_FAILED, "Interrupted too many times", now, STATE_RUNNING, now - stale_after, MAX_JOB_ATTEMPTS),
+        ).rowcount
+        rows = self._execute(f"SELECT job_id FROM jobs WHERE {stale}", (STATE_RUNNING, now - stale_after)).fetchall()
+        requeued = []
+        for row in rows:
+            # Re-checked per row: its owner may have heartbeated, or another process requeued it, meanwhile
+            if self._execute(
+                f"UPDATE jobs SET state = ?, owner = NULL, updated_at = ? WHERE job_id = ? AND {stale}",
+                (STATE_QUEUED, now, row["job_id"], STATE_RUNNING, now - stale_after),
+            ).rowcount:
+                requeued.append(row["job_id"])
+        if requeued or failed:
+            logger.info("[Jobs] Requeued %s interrupted jobs (%s gave up)", len(requeued), failed)
+        return requeued
+
+    def release(self) -> int:
+        """Puts this process's running jobs back in the queue (on shutdown), for the next process to pick up."""
+        return self._execute(
+            "UPDATE jobs SET state = ?, owner = NULL, updated_at = ? WHERE state = ? AND owner = ?",
+            (STATE_QUEUED, time.time(), STATE_RUNNING, self.owner),
+        ).rowcount
+
+    def claim(self, job_id: str) -> bool:
+        """Marks a queued job as running in this process; False if it isn't queued (any more)."""
+        now = time.time()
+        return self._execute(
+            """
+            UPDATE jobs SET state = ?, stage = ?, owner = ?, heartbeat = ?, attempts = attempts + 1, updated_at = ?,
+                            stage_times = json_set(stage_times, '$.' || ?, ?)
+            WHERE job_id = ? AND state = ?
+            """,
+            (STATE_RUNNING, STATE_RUNNING, self.owner, now, now, STATE_RUNNING, now, job_id, STATE_QUEUED),
+        ).rowcount == 1
+
+    def heartbeat(self) -> int:
+        """Stamps every job this process is running as still alive."""
+        return self._execute(
+            "UPDATE jobs SET heartbeat = ? WHERE state = ? AND owner = ?", (time.time(), STATE_RUNNING, self.owner)
+        ).rowcount
+
+    def record_stage(self, job_id: str, stage: str, notebook_id: Optional[str] = None,
+                     source_id: Optional[str] = None):
+        now = time.time()
+        self._execute(
+            """
+            UPDATE jobs SET stage = ?, updated_at = ?,
+                            notebook_id = COALESCE(?, notebook_id), source_id = COALESCE(?, source_id),
+                            stage_times = json_set(stage_times, '$.' || ?, ?)
+            WHERE job_id = ?
+            """,
+            (stage, now, notebook_id, source_id, stage, now, job_id),
+        )
+
+    def finish(self, job_id: str, image_url: str, notebook_id: Optional[str] = None):
+        now = time.time()
+        self._execute(
+            """
+            UPDATE jobs SET state = ?, stage = ?, image_url = ?, error = NULL, updated_at = ?,
+                            notebook_id = COALESCE(?, notebook_id),
+                            stage_times = json_set(stage_times, '$.' || ?, ?)
+            WHERE job_id = ?
+            """,
+            (STATE_DONE, STATE_DONE, image_url, now, notebook_id, STATE_DONE, now, job_id),
+        )
+
+    def fail(self, job_id: str, error: str):
+        now = time.time()
+        self._execute(
+            """
+            UPDATE jobs SET state = ?, error = ?, updated_at = ?,
+                            stage_times = json_set(stage_times, '$.' || ?, ?)
+            WHERE job_id = ?
+            """,
+            (STATE_FAILED, error[:500], now, STATE_FAILED, now, job_id),
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class JobQueue:
+    """
+    Runs infographic jobs on background workers, each on a client leased
+    from the AccountScheduler. Jobs live in a JobStore, so queued and
+    interrupted jobs are picked up again when the server restarts; a rerun
+    resumes from the notebook recorded in the result store instead of
+    starting over.
+    """
+
+    def __init__(self, store: JobStore, pool, workers: int = DEFAULT_JOB_WORKERS):
+        self.store = store
+        self.pool = pool
+        self.workers = max(1, workers)
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self.store.requeue_interrupted()
+        for job_id in self.store.pending_ids():
+            self._queue.put_nowait(job_id)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._heartbeat()))
+        logger.info("[Jobs] Started %s workers (%s jobs queued)", self.workers, self._queue.qsize())
+
+    def submit(self, video_url: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        job = self.store.create(video_url, timeout)
+        if self._queue is not None:
+            self._queue.put_nowait(job["job_id"])
+        logger.info("[Jobs] Queued job %s for %s", job['job_id'], video_url)
+        return job
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            try:
+                # One trace (and log correlation ID) per job run
+                with span("job", job_id=job_id):
+                    await self._run(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _heartbeat(self):
+        """Keeps this process's running jobs alive, and takes over those of processes that died."""
+        while True:
+            await asyncio.sleep(JOB_HEARTBEAT_INTERVAL)
+            try:
+                self.store.heartbeat()
+                for job_id in self.store.requeue_interrupted():
+                    self._queue.put_nowait(job_id)
+            except Exception as e:
+                logger.warning("[Jobs] Heartbeat failed: %s", e)
+
+    async def _run(self, job_id: str):
+        # Atomic, so a job queued in several processes' memory runs in exactly one of them
+        if not self.store.claim(job_id):
+            return
+        job = self.store.get(job_id)
+
+        def on_stage(stage: str, info: Dict[str, Any]):
+            self.store.record_stage(job_id, stage, info.get("notebook_id"), info.get("source_id"))
+
+        try:
+            async def generate(client) -> tuple:
+                image_url = await client.generate_infographic(job["video_url"], timeout=job["timeout"],
+                                                              on_stage=on_stage)
+                # Coalesced or cached runs don't report stages; the result store knows the notebook
+                return image_url, client.results.get(job["video_id"]) if job["video_id"] else None
+
+            # Routed by video ID, and retried on another account if this one's login or quota fails
+            image_url, entry = await self.pool.run(generate, video_id=job["video_id"])
+            self.store.finish(job_id, image_url, entry["notebook_id"] if entry else None)
+            logger.info("[Jobs] Job %s finished: %s...", job_id, image_url[:50])
+        except asyncio.CancelledError:
+            # Server shutting down: close() puts it back in the queue for the next start
+            raise
+        except Exception as e:
+            logger.error("[Jobs] Job %s failed: %s", job_id, e)
+            self.store.fail(job_id, str(e))
+
+    async def close(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        released = self.store.release()
+        if released:
+            logger.info("[Jobs] Put %s interrupted jobs back in the queue", released)
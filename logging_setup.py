@@ -0,0 +1,156 @@
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import time
+from typing import Any, Optional
+
+from tracing import current_span
+
+# --- CONFIGURATION ---
+LOG_FILE = os.environ.get(
+    "NOTEBOOKLM_LOG_FILE",
+    os.path.join(os.environ.get("NOTEBOOKLM_STATE_DIR", os.path.dirname(os.path.abspath(__file__))), "server.log"),
+)
+LOG_LEVEL = os.environ.get("NOTEBOOKLM_LOG_LEVEL", "INFO").upper()
+LOG_MAX_BYTES = int(os.environ.get("NOTEBOOKLM_LOG_MAX_MB", 10)) * 1024 * 1024   # then rotated
+LOG_BACKUPS = int(os.environ.get("NOTEBOOKLM_LOG_BACKUPS", 3))                   # server.log.1 .. .3
+# Longest payload (RPC response, error body) written to the log; the rest is cut
+LOG_PAYLOAD_CHARS = int(os.environ.get("NOTEBOOKLM_LOG_PAYLOAD_CHARS", 500))
+# The writer thread wakes up this often to write what has been queued, rather than once per record
+LOG_FLUSH_INTERVAL = 0.2
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - [%(trace_id)s] %(message)s"
+
+
+class _Truncated:
+    """Renders a payload cut down to `limit` characters, only when the record is actually written."""
+
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value: Any, limit: int = LOG_PAYLOAD_CHARS):
+        self.value = value
+        self.limit = limit
+
+    def __str__(self) -> str:
+        text = str(self.value)
+        if len(text) <= self.limit:
+            return text
+        return f"{text[:self.limit]}... ({len(text)} chars)"
+
+    __repr__ = __str__
+
+
+def truncated(value: Any, limit: int = LOG_PAYLOAD_CHARS) -> _Truncated:
+    """Log argument for large payloads: logger.error("Bad response: %s", truncated(res))."""
+    return _Truncated(value, limit)
+
+
+class CorrelationFilter(logging.Filter):
+    """Stamps each record with the trace ID of the span it was logged in ("-" outside any), on the caller's thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "trace_id"):
+            s = current_span()
+            record.trace_id = s.trace_id if s is not None else "-"
+        return True
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues records as they are, so the message is %-formatted on the
+    listener thread instead of the event loop. Log arguments must not be
+    mutated after the call (the repo only logs strings, numbers and
+    exceptions).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class _BatchingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    Rotating file handler for the listener thread: checks the size with
+    tell() instead of formatting each record twice, and leaves flushing to
+    the listener, which flushes once the queue has been drained.
+    """
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        return self.stream is not None and 0 < self.maxBytes <= self.stream.tell()
+
+    def flush(self):
+        pass
+
+    def flush_now(self):
+        with self.lock:
+            if self.stream is not None:
+                self.stream.flush()
+
+
+class _Listener(logging.handlers.QueueListener):
+    """
+    Polls the queue every LOG_FLUSH_INTERVAL instead of blocking on it: a
+    blocked reader is woken by every put(), and its GIL handoffs cost the
+    event loop more than the write they move off it.
+    """
+
+    def dequeue(self, block: bool) -> logging.LogRecord:
+        while True:
+            try:
+                return self.queue.get_nowait()
+            except queue.Empty:
+                if not block:
+                    raise
+                time.sleep(LOG_FLUSH_INTERVAL)
+
+    def handle(self, record: logging.LogRecord):
+        super().handle(record)
+        if self.queue.empty():
+            for handler in self.handlers:
+                handler.flush_now()
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging(path: str = LOG_FILE, level: str = LOG_LEVEL, max_bytes: int = LOG_MAX_BYTES,
+                  backups: int = LOG_BACKUPS) -> Optional[logging.handlers.QueueListener]:
+    """
+    Routes the root logger through a queue to a size-rotated file written by
+    a background thread, so logging never blocks the event loop on disk I/O.
+
+    Like logging.basicConfig, does nothing if the root logger already has
+    handlers (e.g. a benchmark configured its own).
+    """
+    global _listener
+    root = logging.getLogger()
+    if root.handlers:
+        return None
+
+    # None of these record fields are in LOG_FORMAT; skipping them (findCaller's stack walk above
+    # all) is the logging HOWTO's recipe for cheaper records
+    logging._srcfile = None
+    logging.logThreads = False
+    logging.logProcesses = False
+    logging.logMultiprocessing = False
+
+    file_handler = _BatchingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding="utf-8")
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    queue_handler = _DeferredQueueHandler(records)
+    queue_handler.addFilter(CorrelationFilter())
+
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+    _listener = _Listener(records, file_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging():
+    """Flushes queued records to disk and stops the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,161 @@
+import bisect
+import re
+import threading
+import logging
+from collections import deque
+from typing import Dict, List, Optional, Sequence
+
+# --- CONFIGURATION ---
+# Bucket upper bounds in seconds; sized for RPCs (sub-second) up to artifact generation (minutes)
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 180, 300, 600)
+RECENT_SAMPLES = 512  # kept per histogram for percentile estimates
+PROMETHEUS_PREFIX = "notebooklm"
+
+logger = logging.getLogger(__name__)
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus style) plus a window of recent samples."""
+
+    def __init__(self, name: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min: Optional[float] = None
+        self.max: Optional[float] = None
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.count += 1
+            self.sum += value
+            self.min = value if self.min is None else min(self.min, value)
+            self.max = value if self.max is None else max(self.max, value)
+            self.recent.append(value)
+
+    def percentile(self, p: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self.recent)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+    def snapshot(self) -> Dict:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 4),
+            "min": self.min,
+            "max": self.max,
+            "p50": self.percentile(0.5),
+            "p90": self.percentile(0.9),
+            "p99": self.percentile(0.99),
+            "buckets": {str(b): c for b, c in zip(list(self.buckets) + ["+Inf"], self._cumulative())},
+        }
+
+    def _cumulative(self) -> List[int]:
+        total, out = 0, []
+        for c in self.counts:
+            total += c
+            out.append(total)
+        return out
+
+
+class Counter:
+    """Monotonic counter."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+
+HISTOGRAMS: Dict[str, Histogram] = {}
+COUNTERS: Dict[str, Counter] = {}
+_registry_lock = threading.Lock()
+
+
+def histogram(name: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    with _registry_lock:
+        if name not in HISTOGRAMS:
+            HISTOGRAMS[name] = Histogram(name, buckets)
+        return HISTOGRAMS[name]
+
+
+def counter(name: str) -> Counter:
+    with _registry_lock:
+        if name not in COUNTERS:
+            COUNTERS[name] = Counter(name)
+        return COUNTERS[name]
+
+
+def record_stage(stage: str, seconds: float):
+    """Records the latency of one pipeline stage (e.g. "add_source", "artifact_ready")."""
+    histogram(f"stage.{stage}").observe(seconds)
+
+
+def snapshot() -> Dict[str, Dict]:
+    with _registry_lock:
+        histograms = list(HISTOGRAMS.items())
+        counters = list(COUNTERS.items())
+    return {
+        "histograms": {name: h.snapshot() for name, h in histograms},
+        "counters": {name: c.value for name, c in counters},
+    }
+
+
+def _metric_name(name: str) -> str:
+    return f"{PROMETHEUS_PREFIX}_" + re.sub(r"[^a-zA-Z0-9_]", "_", name)
+
+
+def prometheus_text() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    with _registry_lock:
+        histograms = sorted(HISTOGRAMS.items())
+        counters = sorted(COUNTERS.items())
+    lines = []
+    for name, h in histograms:
+        metric = _metric_name(name)
+        lines.append(f"# TYPE {metric} histogram")
+        for bound, count in zip(list(h.buckets) + ["+Inf"], h._cumulative()):
+            lines.append(f'{metric}_bucket{{le="{bound}"}} {count}')
+        lines.append(f"{metric}_sum {h.sum}")
+        lines.append(f"{metric}_count {h.count}")
+    for name, c in counters:
+        metric = _metric_name(name) + "_total"
+        lines.append(f"# TYPE {metric} counter")
+        lines.append(f"{metric} {c.value}")
+    return "\n".join(lines) + "\n"
+
+
+def serve_prometheus(port: int, host: str = "127.0.0.1"):
+    """Serves prometheus_text() on http://host:port/metrics from a daemon thread."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="prometheus", daemon=True).start()
+    logger.info("[Metrics] Prometheus endpoint on http://%s:%s/metrics", host, server.server_address[1])
+    return server
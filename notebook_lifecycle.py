@@ -0,0 +1,114 @@
+import asyncio
+import os
+import time
+import logging
+from typing import Optional
+
+from result_store import ResultStore, NOTEBOOK_SPARE, NOTEBOOK_IN_USE, DEFAULT_ACCOUNT, DEFAULT_TTL
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+DEFAULT_SPARE_NOTEBOOKS = int(os.environ.get("NOTEBOOKLM_SPARE_NOTEBOOKS", 2))
+DEFAULT_REAP_INTERVAL = float(os.environ.get("NOTEBOOKLM_REAP_INTERVAL", 10 * 60))       # seconds
+# Finished notebooks are deleted this long after their result became final (0 = never), and never
+# before the result has expired (the result store's TTL), so no cached result points into a deleted notebook
+DEFAULT_REAP_DONE_AFTER = float(os.environ.get("NOTEBOOKLM_REAP_DONE_AFTER", DEFAULT_TTL))
+ORPHAN_AFTER = 60 * 60   # notebooks no result refers to (crashed runs, retried videos)
+REAP_BATCH = 10          # DELETE_NOTEBOOK calls per batchexecute request
+REAP_MAX_PER_SWEEP = 50
+
+
+class NotebookLifecycle:
+    """
+    Owns the notebooks this server creates in one account.
+
+    Keeps `spares` empty notebooks created ahead of time, so a generation
+    starts straight at add-source, and periodically deletes notebooks that
+    are no longer needed (failed videos, orphans, old finished results) in
+    batched, rate-limited DELETE_NOTEBOOK requests so the account doesn't
+    fill up. Every notebook is recorded in the result store's ledger, so
+    spares survive restarts and are shared between server processes.
+    """
+
+    def __init__(self, results: ResultStore, spares: int = DEFAULT_SPARE_NOTEBOOKS,
+                 reap_interval: float = DEFAULT_REAP_INTERVAL, done_after: float = DEFAULT_REAP_DONE_AFTER,
+                 account: str = DEFAULT_ACCOUNT):
+        self.results = results
+        self.account = account
+        self.spares = max(0, spares)
+        self.reap_interval = reap_interval
+        self.done_after = max(done_after, results.ttl) if done_after > 0 else 0
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._last_reap = 0.0
+
+    async def take(self, client) -> str:
+        """Returns an empty notebook for a generation: a spare if one is ready, otherwise a new one."""
+        notebook_id = self.results.take_spare_notebook(self.account)
+        if notebook_id:
+            logger.info("[Notebooks] ⚡ Using spare notebook %s (%s)", notebook_id, self.account)
+        else:
+            notebook_id = await client.create_notebook()
+            self.results.add_notebook(notebook_id, NOTEBOOK_IN_USE, self.account)
+        if self._wake is not None:
+            self._wake.set()
+        return notebook_id
+
+    async def refill(self, client) -> int:
+        created = 0
+        while self.results.count_notebooks(NOTEBOOK_SPARE, self.account) < self.spares:
+            notebook_id = await client.create_notebook()
+            self.results.add_notebook(notebook_id, NOTEBOOK_SPARE, self.account)
+            created += 1
+        if created:
+            logger.info("[Notebooks] Created %s spare notebooks (%s)", created, self.account)
+        return created
+
+    async def reap(self, client) -> int:
+        """Deletes notebooks that are no longer needed, REAP_BATCH per request."""
+        deleted = 0
+        while deleted < REAP_MAX_PER_SWEEP:
+            notebook_ids = self.results.reapable_notebooks(self.done_after, ORPHAN_AFTER, REAP_BATCH, self.account)
+            if not notebook_ids:
+                break
+            done = await client.delete_notebooks(notebook_ids)
+            self.results.mark_notebooks_deleted(done)
+            deleted += len(done)
+            if len(done) < len(notebook_ids):
+                # Some deletes were refused; try those again next sweep
+                break
+        if deleted:
+            logger.info("[Notebooks] 🧹 Deleted %s notebooks (%s)", deleted, self.account)
+        return deleted
+
+    async def _run(self, pool):
+        while True:
+            try:
+                async with pool.lease() as client:
+                    await self.refill(client)
+                    if time.monotonic() - self._last_reap >= self.reap_interval:
+                        self._last_reap = time.monotonic()
+                        await self.reap(client)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("[Notebooks] Maintenance failed (%s): %s", self.account, e)
+            try:
+                # Woken early whenever a spare is taken
+                await asyncio.wait_for(self._wake.wait(), timeout=self.reap_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def start(self, pool):
+        """Starts background refilling and reaping, leasing clients from `pool`."""
+        if self._task is None:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run(pool))
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
@@ -6,14 +6,43 @@ import time
 import os
 import logging
 import base64
-from typing import Optional, Dict, Any, List
-from playwright.async_api import async_playwright, Page, BrowserContext
+import hashlib
+import io
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Tuple, AsyncIterator, Union, Callable
+
+from session_cache import SessionCache
+from transports import BrowserTransport, HttpTransport, TransportError
+from rpc_batching import RpcBatcher
+from batchexecute import Frame, FrameDecoder
+from readiness import PollPolicy, SOURCE_READY_POLICY, ARTIFACT_POLICY
+from metrics import record_stage, histogram, counter
+from tracing import span, traced
+from logging_setup import truncated
+from ratelimit import RpcRateLimiter
+from resilience import CircuitBreaker, RPC_MAX_RETRIES, RPC_RETRY_POLICY, retry_budget
+from singleflight import SingleFlight, FileLock
+from youtube import extract_video_id
+from result_store import ResultStore, STATUS_DONE, STATUS_PENDING, DEFAULT_ACCOUNT
+from image_pipeline import ImageSink
+from notebook_lifecycle import NotebookLifecycle
+
+if TYPE_CHECKING:
+    # Playwright is imported on first use: it's one of the slowest imports of the server
+    from playwright.async_api import Browser, Page, BrowserContext
+    # PIL too (only needed once an image is downloaded)
+    from PIL import Image
 
 logger = logging.getLogger(__name__)
 
 # --- CONFIGURATION ---
-BASE_URL = "https://notebooklm.google.com"
-RPC_ENDPOINT = f"{BASE_URL}/_/LabsTailwindUi/data/batchexecute"
+# Overridable to point the client at a stand-in server (see benchmarks/fake_notebooklm.py)
+BASE_URL = os.environ.get("NOTEBOOKLM_BASE_URL", "https://notebooklm.google.com").rstrip("/")
+RPC_PATH = "/_/LabsTailwindUi/data/batchexecute"
+
+# "http" sends RPCs straight from Python (browser kept as fallback), "browser" uses page.evaluate
+DEFAULT_TRANSPORT = os.environ.get("NOTEBOOKLM_TRANSPORT", "http")
+# Micro-batching window for _execute_rpc in seconds (0 = send every RPC on its own)
+DEFAULT_BATCH_WINDOW = float(os.environ.get("NOTEBOOKLM_BATCH_WINDOW_MS", "0")) / 1000
 
 # RPC IDs
 RPC_CREATE_NOTEBOOK = "CCqFvf"
@@ -21,44 +50,330 @@ RPC_ADD_SOURCE = "izAoDd"
 RPC_GENERATE_INFOGRAPHIC = "R7cb6c"
 RPC_LIST_ARTIFACTS = "gArtLc"
 RPC_DELETE_NOTEBOOK = "f61S6e"
+RPC_GET_NOTEBOOK = "rLM1Ne"
+# Safe to send twice; the others are retried only when the server provably didn't run them (429)
+IDEMPOTENT_RPCS = {RPC_LIST_ARTIFACTS, RPC_GET_NOTEBOOK, RPC_DELETE_NOTEBOOK}
+
+# Source processing states as reported by RPC_GET_NOTEBOOK (reverse-engineered)
+SOURCE_STATUS_PROCESSING = 1
+SOURCE_STATUS_READY = 2
+SOURCE_STATUS_ERROR = 3
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".webp")
+
+# Used when the source status can't be read from the notebook response
+TRANSCRIPT_FALLBACK_WAIT = 10
+POLL_COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+# Pipelines run at once by generate_infographics
+DEFAULT_MAX_CONCURRENCY = 10
+# Videos generate_collection puts into one notebook (NotebookLM's per-notebook source limit)
+MAX_NOTEBOOK_SOURCES = int(os.environ.get("NOTEBOOKLM_MAX_SOURCES", 50))
+
+# Source, notebook and artifact IDs
+UUID_RE = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE)
+
+# Where run state (cache, last run, locks) lives; share it between server instances
+STATE_DIR = os.environ.get("NOTEBOOKLM_STATE_DIR", os.path.dirname(os.path.abspath(__file__)))
+LEGACY_CACHE_FILE = os.path.join(STATE_DIR, "cache.json")
+RESULTS_DB = os.path.join(STATE_DIR, "results.db")
+LOCK_DIR = os.path.join(STATE_DIR, "locks")
+
+# Browser launch settings shared by single clients and the ClientPool
+USER_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "user_data")
+BROWSER_ARGS = [
+    "--disable-blink-features=AutomationControlled",
+    "--ignore-certificate-errors", 
+    "--no-sandbox",
+    "--disable-setuid-sandbox"
+]
+
+# "persistent": Chromium on the user_data profile. "light": a throwaway context seeded from
+# STORAGE_STATE_FILE (exported by setup_auth.py) in a browser other contexts can share;
+# nothing is written to the profile directory
+BROWSER_MODE = os.environ.get("NOTEBOOKLM_BROWSER_MODE", "persistent")
+STORAGE_STATE_FILE = os.environ.get(
+    "NOTEBOOKLM_STORAGE_STATE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "storage_state.json")
+)
+LIGHT_BROWSER_ARGS = BROWSER_ARGS + [
+    "--disable-dev-shm-usage",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--no-first-run",
+    "--mute-audio",
+]
+# Requests aborted while a headless page scrapes the session tokens (they are inlined in the HTML)
+BLOCK_RESOURCES = os.environ.get("NOTEBOOKLM_BLOCK_RESOURCES", "1") != "0"
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+BLOCKED_URL_PATTERN = re.compile(
+    r"google-analytics\.com|googletagmanager\.com|doubleclick\.net|play\.google\.com/log|/gen_204|/jserror"
+)
+
+async def start_playwright():
+    """Starts the Playwright driver, importing Playwright on first use."""
+    from playwright.async_api import async_playwright
+    return await async_playwright().start()
+
+async def launch_persistent_context(playwright, headless: bool = True,
+                                    user_data_dir: Optional[str] = None) -> "BrowserContext":
+    """Launches Chromium on a persistent profile (default: the shared user_data one, keeps the login state)."""
+    return await playwright.chromium.launch_persistent_context(
+        user_data_dir or USER_DATA_DIR,
+        headless=headless,
+        args=BROWSER_ARGS
+    )
+
+async def launch_browser(playwright, headless: bool = True) -> "Browser":
+    """Launches a profile-less Chromium for light-mode contexts."""
+    return await playwright.chromium.launch(headless=headless, args=LIGHT_BROWSER_ARGS)
+
+async def new_light_context(browser: "Browser", storage_state: str = STORAGE_STATE_FILE) -> "BrowserContext":
+    """Opens a non-persistent context logged in with the cookies exported to `storage_state`."""
+    return await browser.new_context(storage_state=storage_state)
+
+def resolve_browser_mode(mode: str, storage_state: str = STORAGE_STATE_FILE) -> str:
+    """Light mode needs an exported storage state; without one, fall back to the persistent profile."""
+    if mode == "light" and not os.path.exists(storage_state):
+        logger.warning("[NotebookLM] No storage state at %s (run setup_auth.py); using the persistent profile",
+                       storage_state)
+        return "persistent"
+    return mode
+
+async def export_storage_state(context: "BrowserContext", path: str = STORAGE_STATE_FILE):
+    """Saves the context's cookies and local storage for light-mode contexts."""
+    state = await context.storage_state()
+    # Atomic and owner-only, like the session cache: the file holds login cookies
+    tmp_path = f"{path}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+async def block_heavy_resources(route):
+    """Route handler: aborts images, media, fonts and analytics, lets everything else through."""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or BLOCKED_URL_PATTERN.search(request.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+# HTTP statuses batchexecute answers with when the `at` token or cookies went stale
+AUTH_FAILURE_STATUSES = (400, 401, 403)
+# gRPC RESOURCE_EXHAUSTED, sent in a wrb.fr status block when the account ran out of quota
+QUOTA_ERROR_CODE = 8
+# Tokens younger than this are trusted even on an auth-looking failure (avoids refresh storms)
+REVALIDATE_GRACE = 60
+# Throttling and server errors worth another attempt (see NotebookLMClient.execute_rpcs)
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+def parse_session_tokens(html: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """Extracts (at, bl, fsid) from the NotebookLM page markup."""
+    at_match = re.search(r'"SNlM0e":"([^"]+)"', html)
+    bl_match = re.search(r'"(boq_labs-tailwind-[^"]+)"', html)
+    fsid_match = re.search(r'"FdrFJe":"([^"]+)"', html)
+    return (at_match.group(1) if at_match else None,
+            bl_match.group(1) if bl_match else None,
+            fsid_match.group(1) if fsid_match else None)
+
+# Called as on_stage(stage, info) as generate_infographic() advances, e.g.
+# ("notebook_created", {"notebook_id": ...}) or ("source_added", {"source_id": ...})
+StageCallback = Callable[[str, Dict[str, Any]], None]
+
+class AccountError(Exception):
+    """A failure of the whole account rather than of one request; `account` names it."""
+
+    def __init__(self, message: str, account: str = DEFAULT_ACCOUNT):
+        super().__init__(message)
+        self.account = account
+
+class AuthError(AccountError):
+    """Raised when NotebookLM rejects the session and re-scraping didn't help."""
+
+class QuotaError(AccountError):
+    """Raised when the account's NotebookLM quota is used up (RESOURCE_EXHAUSTED)."""
+
+class ThrottledError(AccountError):
+    """Raised when NotebookLM keeps answering HTTP 429 after retries: a rate limit, not the quota."""
+
+class CircuitOpenError(AccountError):
+    """Raised without sending anything while the account's circuit breaker is open."""
+
+    def __init__(self, message: str, account: str = DEFAULT_ACCOUNT, retry_after: float = 0.0):
+        super().__init__(message, account)
+        self.retry_after = retry_after
+
+# In-flight generations keyed by video ID (or collection key), shared by every client in the process
+_generations = SingleFlight()
+
+def collection_key(video_ids: List[str]) -> str:
+    """Result store key of a multi-video notebook; the same videos in any order give the same key."""
+    digest = hashlib.blake2b(",".join(sorted(video_ids)).encode("utf-8"), digest_size=8).hexdigest()
+    return f"collection-{digest}"
+
+_default_results: Optional[ResultStore] = None
+
+def default_result_store() -> ResultStore:
+    """The process-wide result store in STATE_DIR (seeded from the old cache.json)."""
+    global _default_results
+    if _default_results is None:
+        _default_results = ResultStore(RESULTS_DB, legacy_cache_file=LEGACY_CACHE_FILE)
+    return _default_results
 
 class NotebookLMClient:
-    def __init__(self, headless: bool = True):
+    def __init__(self, headless: bool = True, session: Optional[SessionCache] = None,
+                 transport: Optional[str] = None, http_transport: Optional[HttpTransport] = None,
+                 base_url: Optional[str] = None, batch_window: float = DEFAULT_BATCH_WINDOW,
+                 rate_limiter: Optional[RpcRateLimiter] = None, results: Optional[ResultStore] = None,
+                 notebooks: Optional[NotebookLifecycle] = None, browser_mode: Optional[str] = None,
+                 storage_state: str = STORAGE_STATE_FILE, user_data_dir: Optional[str] = None,
+                 account: str = DEFAULT_ACCOUNT, breaker: Optional[CircuitBreaker] = None):
         self.headless = headless
+        # Google account this client is logged in as (see accounts.py); its profile and notebooks
+        self.account = account
+        self.user_data_dir = user_data_dir
+        # "persistent" or "light" (see BROWSER_MODE)
+        self.browser_mode = browser_mode or BROWSER_MODE
+        self.storage_state = storage_state
+        self.base_url = base_url or BASE_URL
+        self.playwright = None
         self.browser = None
         self.context = None
         self.page = None
-        self.session_tokens = {"at": None, "bl": None, "fsid": None}
-        self.cookies = []
+        # Tokens/cookies live in a (possibly shared) on-disk cache
+        self.session = session if session is not None else SessionCache()
+        self.transport = transport or DEFAULT_TRANSPORT
+        # Direct HTTP transport; pass a shared one to reuse its connection pool
+        self.http_transport = http_transport
+        self._owns_http_transport = http_transport is None
+        self._results = results
+        # Hands out pre-created notebooks and tracks them for deletion (None = create one per run)
+        self.notebooks = notebooks
+        # Per-account (and per-RPC) request budget; share one limiter between all clients of an account
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RpcRateLimiter()
+        # Fails fast while the account's requests keep failing; shared like the limiter
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        # Merges RPCs issued within `batch_window` seconds into one request (0 disables)
+        self.batcher = RpcBatcher(self.execute_rpcs, batch_window) if batch_window > 0 else None
+        # False when the context/page are leased from a ClientPool
+        self._owns_context = True
+
+    @property
+    def session_tokens(self) -> Dict[str, Any]:
+        return self.session.tokens
+
+    @property
+    def cookies(self) -> List[Dict[str, Any]]:
+        return self.session.cookies
+
+    @property
+    def results(self) -> ResultStore:
+        if self._results is None:
+            self._results = default_result_store()
+        return self._results
+
+    @property
+    def rpc_endpoint(self) -> str:
+        return f"{self.base_url}{RPC_PATH}"
+
+    @classmethod
+    def from_context(cls, context: "BrowserContext", page: "Page", session: SessionCache,
+                     headless: bool = True, **kwargs) -> "NotebookLMClient":
+        """Wraps an already running context/page (e.g. leased from a ClientPool).
 
+        The returned client does not own the browser: stop() leaves it running.
+        """
+        client = cls(headless=headless, session=session, **kwargs)
+        client.context = context
+        client.page = page
+        client._owns_context = False
+        return client
+
+    @traced("start")
     async def start(self):
         """Starts the browser and authenticates."""
-        playwright = await async_playwright().start()
-        # Use a persistent context to save login state
-        base_dir = os.path.dirname(os.path.abspath(__file__))
-        user_data_dir = os.path.join(base_dir, "user_data")
-        self.context = await playwright.chromium.launch_persistent_context(
-            user_data_dir,
-            headless=self.headless,
-            args=[
-                "--disable-blink-features=AutomationControlled",
-                "--ignore-certificate-errors", 
-                "--no-sandbox",
-                "--disable-setuid-sandbox"
-            ]
-        )
+        self.playwright = await start_playwright()
+        if resolve_browser_mode(self.browser_mode, self.storage_state) == "light":
+            self.browser = await launch_browser(self.playwright, self.headless)
+            self.context = await new_light_context(self.browser, self.storage_state)
+        else:
+            # Use a persistent context to save login state
+            self.context = await launch_persistent_context(self.playwright, self.headless, self.user_data_dir)
         self.page = self.context.pages[0] if self.context.pages else await self.context.new_page()
         
-        await self._refresh_tokens()
+        await self.ensure_session()
 
     async def stop(self):
+        if self.http_transport and self._owns_http_transport:
+            await self.http_transport.close()
+            self.http_transport = None
+        if not self._owns_context:
+            return
         if self.context:
             await self.context.close()
+            self.context = None
+        if self.browser:
+            await self.browser.close()
+            self.browser = None
+        if self.playwright:
+            await self.playwright.stop()
+            self.playwright = None
+
+    @traced("ensure_session")
+    async def ensure_session(self):
+        """Makes the page ready for RPCs, preferring cached tokens over a full scrape."""
+        if self.session.load():
+            await self._enter_origin()
+        else:
+            await self.session.refresh(self._scrape_tokens, self.session.generation)
+
+    async def _enter_origin(self):
+        """
+        Puts the page on the NotebookLM origin without loading the SPA.
+
+        RPCs are fetched from inside the page, so it must be same-origin with
+        batchexecute; the document itself is never used, so we serve a stub.
+        """
+        if self.page.url.startswith(self.base_url):
+            return
+
+        async def stub(route):
+            await route.fulfill(status=200, content_type="text/html", body="<!doctype html><title>NotebookLM</title>")
+
+        await self.page.route(f"{self.base_url}/", stub)
+        try:
+            await self.page.goto(f"{self.base_url}/")
+        finally:
+            await self.page.unroute(f"{self.base_url}/", stub)
 
-    async def _refresh_tokens(self) -> bool:
+    @traced("token_refresh")
+    async def _scrape_tokens(self):
         """Navigates to NotebookLM and scrapes tokens."""
         logger.info("[NotebookLM] 🔄 Navigating to scrape tokens...")
-        await self.page.goto(BASE_URL)
+        # Headed runs may need the login page, which should render normally
+        block = BLOCK_RESOURCES and self.headless
+        if block:
+            await self.page.route("**/*", block_heavy_resources)
+        try:
+            tokens = await self._read_tokens()
+        finally:
+            if block:
+                await self.page.unroute("**/*", block_heavy_resources)
+
+        # Get cookies for requests
+        cookies = await self.context.cookies()
+        if self.browser_mode == "light" and self.context.browser is not None:
+            # Light-mode context: keep the exported state in step with rotated cookies
+            try:
+                await export_storage_state(self.context, self.storage_state)
+            except Exception as e:
+                logger.warning("[NotebookLM] Failed to update storage state: %s", e)
+        logger.info("[NotebookLM] ✅ Tokens acquired. bl: %s", tokens['bl'])
+        return tokens, cookies
+
+    async def _read_tokens(self) -> Dict[str, Any]:
+        # Tokens are inlined in the initial HTML; no need to wait for the SPA's subresources
+        await self.page.goto(self.base_url, wait_until="domcontentloaded")
         
         # simple check for login
         if "accounts.google.com" in self.page.url:
@@ -66,51 +381,181 @@ class NotebookLMClient:
             # If we are headless, we can't login easily.
             # Ideally, the user should run once headed to login.
             if self.headless:
-                 raise Exception("Authentication required. Please run with headless=False first to login.")
+                 raise AuthError("Authentication required. Please run with headless=False first to login.", self.account)
             
             # Wait for user to login (wait until we are back on notebooklm)
-            await self.page.wait_for_url("https://notebooklm.google.com/**", timeout=0) # wait indefinitely
+            await self.page.wait_for_url(f"{self.base_url}/**", timeout=0) # wait indefinitely
             logger.info("[NotebookLM] Login detected.")
 
-        content = await self.page.content()
-        
-        at_match = re.search(r'"SNlM0e":"([^"]+)"', content)
-        bl_match = re.search(r'"(boq_labs-tailwind-[^"]+)"', content)
-        fsid_match = re.search(r'"FdrFJe":"([^"]+)"', content)
-
-        if not at_match or not bl_match:
-            # Fallback: maybe we need to wait a bit more for SPA to load?
-            await asyncio.sleep(2)
-            content = await self.page.content()
-            at_match = re.search(r'"SNlM0e":"([^"]+)"', content)
-            bl_match = re.search(r'"(boq_labs-tailwind-[^"]+)"', content)
-            fsid_match = re.search(r'"FdrFJe":"([^"]+)"', content)
-
-        if not at_match or not bl_match:
-             raise Exception("Could not find session tokens. Are you logged in?")
-
-        self.session_tokens = {
-            "at": at_match.group(1),
-            "bl": bl_match.group(1),
-            "fsid": fsid_match.group(1) if fsid_match else ""
+        # Read WIZ_global_data directly instead of serializing the whole DOM
+        at, bl, fsid, user_agent = await self.page.evaluate(
+            "() => { const d = window.WIZ_global_data || {}; return [d.SNlM0e || null, d.cfb2h || null, d.FdrFJe || null, navigator.userAgent]; }"
+        )
+
+        if not at or not bl:
+            # Fallback: scan the markup (also covers the SPA still booting)
+            await self.page.wait_for_load_state("load")
+            at, bl, page_fsid = parse_session_tokens(await self.page.content())
+            fsid = page_fsid or fsid
+
+        if not at or not bl:
+             raise AuthError("Could not find session tokens. Are you logged in?", self.account)
+
+        return {
+            "at": at,
+            "bl": bl,
+            "fsid": fsid or "",
+            # Replayed by the HTTP transport so requests look like the browser that owns the cookies
+            "ua": user_agent
         }
-        
-        # Get cookies for requests
-        self.cookies = await self.context.cookies()
-        logger.info(f"[NotebookLM] ✅ Tokens acquired. bl: {self.session_tokens['bl']}")
-        return True
 
     async def _execute_rpc(self, rpc_id: str, payload: Any) -> Any:
-        # We can use the page to evaluate fetch, which automatically handles cookies and CORS best.
-        # This is more robust than trying to reconstruct the request in python requests/aiohttp
-        # because of the specific Google auth/cookies intricacies.
-        
+        if self.batcher is not None:
+            # Merged with other calls issued within the batch window
+            return await self.batcher.call(rpc_id, payload)
+        results = await self.execute_rpcs([(rpc_id, payload)])
+        return results[0]
+
+    async def execute_rpcs(self, calls: List[Tuple[str, Any]]) -> List[Any]:
+        """
+        Packs independent RPCs into a single batchexecute request.
+
+        `calls` is a list of (rpc_id, payload); the results come back in the same
+        order as decoded wrb.fr Frames (None if that call returned no frame).
+
+        A 429, 5xx or connection error is retried with jittered exponential
+        backoff (RPC_RETRY_POLICY), within the process-wide retry budget; a
+        request carrying non-idempotent RPCs only after a 429. While the
+        account's circuit breaker is open, raises CircuitOpenError at once.
+        """
+        if not calls:
+            return []
+        label = ",".join(rpc_id for rpc_id, _ in calls)
+        rpc_ids = [rpc_id for rpc_id, _ in calls]
+        if not self.breaker.allow():
+            counter("rpc_circuit_rejected").inc()
+            raise CircuitOpenError(
+                f"NotebookLM requests for account {self.account} keep failing; "
+                f"circuit open, retry in {self.breaker.retry_after:.1f}s", self.account, self.breaker.retry_after
+            )
+        idempotent = all(rpc_id in IDEMPOTENT_RPCS for rpc_id in rpc_ids)
+        backoff = RPC_RETRY_POLICY.start()
+        while True:
+            retry_budget.record_request()
+            error = None
+            try:
+                generation = self.session.generation
+                status, frames, response_text, sent_at = await self._send_rpc(calls)
+
+                if status in AUTH_FAILURE_STATUSES and self.session.generation != generation:
+                    # Sent with tokens another caller has refreshed since: resend with the new ones
+                    logger.info("[NotebookLM] RPC %s got HTTP %s with old tokens; resending...", label, status)
+                    status, frames, response_text, sent_at = await self._send_rpc(calls)
+                elif status in AUTH_FAILURE_STATUSES and self.session.age > REVALIDATE_GRACE:
+                    # Cached tokens went stale: re-scrape once (shared with concurrent callers) and retry
+                    logger.warning("[NotebookLM] RPC %s got HTTP %s; revalidating session...", label, status)
+                    self.session.invalidate()
+                    await self.session.refresh(self._scrape_tokens, generation)
+                    status, frames, response_text, sent_at = await self._send_rpc(calls)
+            except TransportError as e:
+                status, error = None, e
+            else:
+                if status not in RETRYABLE_STATUSES:
+                    # NotebookLM answered; whatever the status, the account's backend is up
+                    self.breaker.record_success()
+                    if status == 200:
+                        self.rate_limiter.succeed(rpc_ids)
+                    break
+                if status == 429:
+                    self.rate_limiter.throttle(rpc_ids, sent_at)
+
+            delay = None
+            if (status == 429 or idempotent) and backoff.attempts < RPC_MAX_RETRIES:
+                delay = backoff.next_delay()
+                if delay is not None and not retry_budget.withdraw():
+                    counter("rpc_retry_budget_exhausted").inc()
+                    logger.warning("[NotebookLM] Retry budget exhausted; not retrying RPC %s", label)
+                    delay = None
+            if delay is None:
+                self.breaker.record_failure()
+                if error is not None:
+                    raise error
+                break
+            counter("rpc_retries").inc()
+            logger.warning("[NotebookLM] RPC %s failed (%s); retry %s/%s in %.1fs",
+                           label, error or f"HTTP {status}", backoff.attempts, RPC_MAX_RETRIES, delay)
+            await asyncio.sleep(delay)
+
+        if status in (401, 403):
+            logger.error("[NotebookLM] RPC %s failed: auth rejected (%s)", label, status)
+            raise AuthError(f"RPC Failed: {status}", self.account)
+        if status == 429:
+            logger.error("[NotebookLM] RPC %s failed: account throttled (429)", label)
+            raise ThrottledError(f"RPC Failed: {status}", self.account)
+        if status != 200:
+            logger.error("[NotebookLM] RPC %s failed: RPC Failed: %s", label, status)
+            raise Exception(f"RPC Failed: {status}")
+
+        for frame in frames:
+            if frame.kind == "er":
+                logger.warning("[NotebookLM] RPC %s returned an error frame: %s", label, truncated(frame.error))
+            elif frame.kind == "wrb.fr" and isinstance(frame.error, list) and frame.error[:1] == [QUOTA_ERROR_CODE]:
+                logger.error("[NotebookLM] RPC %s failed: account quota exhausted", frame.rpc_id)
+                raise QuotaError(f"RPC {frame.rpc_id} failed: quota exhausted", self.account)
+        return self._match_frames(calls, [f for f in frames if f.kind == "wrb.fr"])
+
+    def _match_frames(self, calls: List[Tuple[str, Any]], frames: List[Frame]) -> List[Optional[Frame]]:
+        """Matches wrb.fr frames to calls by their envelope index (falling back to RPC ID order)."""
+        if len(calls) == 1:
+            return [next((f for f in frames if f.rpc_id == calls[0][0]), None)]
+
+        tags = {str(i + 1) for i in range(len(calls))}
+        tagged = [isinstance(f.index, str) and f.index in tags for f in frames]
+        by_index = {f.index: f for f, ok in zip(frames, tagged) if ok}
+        # Anything else ("generic", a missing or unknown tag) is matched by RPC ID, in order
+        unmatched = [f for f, ok in zip(frames, tagged) if not ok]
+        results = []
+        for i, (rpc_id, _) in enumerate(calls):
+            frame = by_index.get(str(i + 1))
+            if frame is None:
+                frame = next((f for f in unmatched if f.rpc_id == rpc_id), None)
+                if frame is not None:
+                    unmatched.remove(frame)
+            results.append(frame)
+        return results
+
+    def _transports(self) -> list:
+        """Transports to try, in order: direct HTTP first (if enabled), the page as fallback."""
+        transports = []
+        if self.transport == "http" and HttpTransport.available():
+            if self.http_transport is None:
+                self.http_transport = HttpTransport(self.session, self.base_url)
+                self._owns_http_transport = True
+            transports.append(self.http_transport)
+        if self.page is not None:
+            transports.append(BrowserTransport(self.page))
+        return transports
+
+    async def _send_rpc(self, calls: List[Tuple[str, Any]]):
+        """
+        Sends one batchexecute request carrying `calls`.
+
+        Returns (status, frames, body, sent_at): a 200 body is decoded into
+        frames as it streams in (body is then empty); other statuses return the
+        raw body. sent_at is when the rate limiter let the request through.
+        """
         req_id = random.randint(100000, 200000)
-        inner_payload = json.dumps(payload)
-        envelope = json.dumps([[[rpc_id, inner_payload, None, "generic"]]])
+        if len(calls) == 1:
+            rpc_id, payload = calls[0]
+            entries = [[rpc_id, json.dumps(payload), None, "generic"]]
+        else:
+            # Batched entries are tagged "1".."n"; response frames echo the tag back
+            entries = [[rpc_id, json.dumps(payload), None, str(i + 1)] for i, (rpc_id, payload) in enumerate(calls)]
+        envelope = json.dumps([entries])
+        rpc_ids = ",".join(dict.fromkeys(rpc_id for rpc_id, _ in calls))
         
         params = {
-            "rpcids": rpc_id,
+            "rpcids": rpc_ids,
             "source-path": "/",
             "bl": self.session_tokens["bl"],
             "f.sid": self.session_tokens["fsid"],
@@ -121,54 +566,82 @@ class NotebookLMClient:
         
         # Construct query string manually to ensure order if needed, but dict is usually fine
         query_string = "&".join([f"{k}={v}" for k, v in params.items()])
-        url = f"{RPC_ENDPOINT}?{query_string}"
+        url = f"{self.rpc_endpoint}?{query_string}"
 
         # We need to send form data: f.req and at
-        # We'll use page.evaluate to run fetch in the browser context
-        
-        js_code = """
-        async ([url, envelope, at]) => {
-            const body = new URLSearchParams();
-            body.append("f.req", envelope);
-            body.append("at", at);
-
-            const response = await fetch(url, {
-                method: "POST",
-                headers: {
-                    "Content-Type": "application/x-www-form-urlencoded;charset=UTF-8",
-                    "X-Same-Domain": "1"
-                },
-                body: body,
-            });
-            
-            if (!response.ok) throw new Error("RPC Failed: " + response.status);
-            return await response.text();
-        }
+        form = {"f.req": envelope, "at": self.session_tokens["at"]}
+
+        transports = self._transports()
+        if not transports:
+            raise Exception("No RPC transport available (browser not started?)")
+
+        with span("rate_limit_wait"):
+            sent_at = await self.rate_limiter.acquire([rpc_id for rpc_id, _ in calls])
+
+        for i, transport in enumerate(transports):
+            decoder = FrameDecoder()
+            try:
+                with span("rpc", rpc=rpc_ids, transport=transport.name) as rpc_span:
+                    status, text = await transport.post(url, form, on_chunk=decoder.feed)
+                    if status == 200:
+                        decoder.close()
+                    rpc_span.set(status=status)
+                return status, decoder.frames, text, sent_at
+            except TransportError as e:
+                if i + 1 < len(transports):
+                    logger.warning("[NotebookLM] RPC %s via %s failed (%s); falling back to %s",
+                                   rpc_ids, transport.name, e, transports[i + 1].name)
+                    continue
+                logger.error("[NotebookLM] RPC %s failed: %s", rpc_ids, e)
+                raise
+
+    async def download_image(self, url: str, save_to: Optional[str] = None) -> "Image.Image":
         """
-        
-        try:
-            response_text = await self.page.evaluate(js_code, [url, envelope, self.session_tokens["at"]])
-            return self._parse_rpc_response(response_text)
-        except Exception as e:
-            logger.error(f"[NotebookLM] RPC {rpc_id} failed: {e}")
-            raise
+        Downloads and decodes an image (the infographic artifact).
 
-    def _parse_rpc_response(self, text: str):
-        lines = text.split('\n')
-        for line in lines:
-            trimmed = line.strip()
-            if trimmed.startswith('[['):
-                try:
-                    data = json.loads(trimmed)
-                    if data and data[0] and data[0][0] == 'wrb.fr':
-                        return data
-                except:
-                    pass
-        return None
+        Over the HTTP transport the body streams into an incremental decoder
+        via a spooled temp file, resuming with Range requests if the
+        connection drops; otherwise (or if direct HTTP is refused) the browser
+        download is used. With `save_to`, the original bytes are also written there.
+        """
+        from PIL import Image
+
+        http = next((t for t in self._transports() if t.name == "http"), None)
+        if http is not None:
+            if not self.session.load():
+                # Only the cookies are needed here
+                await self.ensure_session()
+            sink = ImageSink()
+            try:
+                with span("download"):
+                    status = await http.download(url, sink)
+                if status in (200, 206):
+                    logger.info("[NotebookLM] Streamed %s bytes from %s...", sink.bytes_received, url[:50])
+                    if save_to:
+                        await asyncio.to_thread(sink.save, save_to)
+                    with span("decode"):
+                        return await asyncio.to_thread(sink.image)
+                logger.warning("[NotebookLM] Direct download got HTTP %s; using the browser", status)
+            except TransportError as e:
+                logger.warning("[NotebookLM] Direct download failed (%s); using the browser", e)
+            finally:
+                sink.close()
+
+        image_bytes = await self.download_resource(url)
+
+        def decode():
+            if save_to:
+                with open(save_to, "wb") as f:
+                    f.write(image_bytes)
+            image = Image.open(io.BytesIO(image_bytes))
+            image.load()
+            return image
+        return await asyncio.to_thread(decode)
 
+    @traced("browser_download")
     async def download_resource(self, url: str) -> bytes:
         """Downloads a resource (image) using the authenticated browser context."""
-        logger.info(f"[NotebookLM] Downloading resource via Playwright API: {url[:50]}...")
+        logger.info("[NotebookLM] Downloading resource via Playwright API: %s...", url[:50])
         
         # Use Playwright's APIRequest context. 
         # This shares cookies with the browser but runs outside the page sandbox, avoiding CORS.
@@ -179,15 +652,15 @@ class NotebookLMClient:
             # We explicitly pass the referer to look legitimate
             response = await self.context.request.get(
                 url, 
-                headers={"Referer": "https://notebooklm.google.com/"}
+                headers={"Referer": f"{self.base_url}/"}
             )
             
             if not response.ok:
-                logger.error(f"[NotebookLM] Download failed: {response.status} {response.status_text}")
+                logger.error("[NotebookLM] Download failed: %s %s", response.status, response.status_text)
                 # Try to log the body if it fails, might be a redirect or auth page
                 try:
                     text = await response.text()
-                    logger.error(f"Error Body: {text[:200]}")
+                    logger.error("Error Body: %s", truncated(text))
                 except:
                     pass
                 raise Exception(f"Failed to download image: {response.status}")
@@ -195,15 +668,12 @@ class NotebookLMClient:
             return await response.body()
             
         except Exception as e:
-            logger.error(f"[NotebookLM] Browser download failed: {e}")
+            logger.error("[NotebookLM] Browser download failed: %s", e)
             raise
 
     def _find_source_id(self, obj: Any) -> Optional[str]:
-        # UUID regex pattern
-        uuid_pattern = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE)
-        
         if isinstance(obj, str):
-            if uuid_pattern.match(obj):
+            if UUID_RE.match(obj):
                 return obj
         
         if isinstance(obj, list):
@@ -212,10 +682,58 @@ class NotebookLMClient:
                 if found: return found
         return None
 
+    def _find_source_entries(self, obj: Any) -> List[list]:
+        # Source entries look like [[source_id], title, metadata, [..., status], ...]
+        if not isinstance(obj, list):
+            return []
+        if obj and isinstance(obj[0], list) and len(obj[0]) == 1 and isinstance(obj[0][0], str) \
+                and UUID_RE.match(obj[0][0]):
+            return [obj]
+        return [entry for item in obj for entry in self._find_source_entries(item)]
+
+    def _find_source_status(self, obj: Any, source_id: str) -> Optional[int]:
+        # Source entries look like [[source_id], title, metadata, [..., status], ...]
+        if not isinstance(obj, list):
+            return None
+        if obj and obj[0] == [source_id]:
+            status_block = obj[3] if len(obj) > 3 else None
+            if isinstance(status_block, list) and len(status_block) > 1 and isinstance(status_block[1], int):
+                return status_block[1]
+            return None
+        for item in obj:
+            found = self._find_source_status(item, source_id)
+            if found is not None: return found
+        return None
+
+    def _find_artifact_id(self, obj: Any) -> Optional[str]:
+        # Artifact entries look like [artifact_id, title, type, [sources], status, ...]
+        if not isinstance(obj, list):
+            return None
+        if obj and isinstance(obj[0], str) and UUID_RE.match(obj[0]):
+            return obj[0]
+        for item in obj:
+            found = self._find_artifact_id(item)
+            if found: return found
+        return None
+
+    def _find_artifact_image(self, obj: Any, artifact_id: str) -> Optional[str]:
+        """The image URL of one artifact in a LIST_ARTIFACTS response, once it is finished."""
+        if not isinstance(obj, list):
+            return None
+        if obj and obj[0] == artifact_id:
+            return self._find_image_url(obj)
+        for item in obj:
+            found = self._find_artifact_image(item, artifact_id)
+            if found: return found
+        return None
+
     def _find_image_url(self, obj: Any) -> Optional[str]:
         if isinstance(obj, str):
             if 'googleusercontent.com' in obj or obj.startswith('data:image/'):
                 return obj
+            # Images hosted by the server itself (e.g. a local stand-in for NotebookLM)
+            if obj.startswith(f"{self.base_url}/") and obj.split("?")[0].lower().endswith(IMAGE_EXTENSIONS):
+                return obj
         
         if isinstance(obj, list):
             for item in obj:
@@ -223,105 +741,485 @@ class NotebookLMClient:
                 if found: return found
         return None
 
-    async def generate_infographic(self, video_url: str) -> str:
+    @traced("generate")
+    async def generate_infographic(self, video_url: str, timeout: Optional[float] = None,
+                                   on_stage: Optional[StageCallback] = None) -> str:
+        """Runs the whole pipeline for one video and returns the infographic URL.
+
+        `timeout` caps how long to poll for the finished artifact (default: ARTIFACT_POLICY).
+        Concurrent calls for the same video (in this process, or in other server
+        instances sharing STATE_DIR) share one generation instead of each
+        creating a notebook; only the caller that starts it gets `on_stage` updates.
+        """
+        video_id = extract_video_id(video_url) or video_url
+        return await _generations.do(video_id, lambda: self._generate_exclusive(video_url, video_id, timeout, on_stage))
+
+    async def _generate_exclusive(self, video_url: str, video_id: str, timeout: Optional[float],
+                                  on_stage: Optional[StageCallback] = None) -> str:
+        lock_name = re.sub(r'[^A-Za-z0-9_-]', '_', video_id)[:100]
+        async with FileLock(os.path.join(LOCK_DIR, f"video-{lock_name}.lock")):
+            return await self._generate(video_url, video_id, timeout, on_stage)
+
+    async def _generate(self, video_url: str, video_id: str, timeout: Optional[float],
+                        on_stage: Optional[StageCallback] = None) -> str:
+        def advance(name: str, **info):
+            if on_stage is not None:
+                try:
+                    on_stage(name, info)
+                except Exception as e:
+                    logger.warning("[NotebookLM] Stage callback failed for %s: %s", name, e)
+
+        # --- CACHE CHECK ---
+        # Read inside the lock: another instance may have just finished this video
+        entry = self.results.get(video_id)
+        if entry and entry["status"] == STATUS_DONE and entry["image_url"]:
+            logger.info("[NotebookLM] ⚡ Cache Hit! Final infographic for %s (notebook %s)",
+                        video_id, entry['notebook_id'])
+            self.results.record_hit(video_id)
+            return entry["image_url"]
+
         if not self.session_tokens["at"]:
             await self.start()
 
-        # --- CACHE CHECK ---
-        cache_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache.json")
-        cache = {}
-        if os.path.exists(cache_file):
-            try:
-                with open(cache_file, "r") as f:
-                    cache = json.load(f)
-            except Exception as e:
-                logger.warning(f"Failed to load cache: {e}")
+        if (entry and entry["status"] == STATUS_PENDING and entry["notebook_id"]
+                and (entry["account"] or DEFAULT_ACCOUNT) != self.account):
+            # The notebook lives in another account; this one can't see it
+            logger.info("[NotebookLM] Pending notebook for %s belongs to %s; starting over", video_id, entry['account'])
+            entry = None
 
-        if video_url in cache:
-            notebook_id = cache[video_url]
-            logger.info(f"[NotebookLM] ⚡ Cache Hit! Reusing notebook: {notebook_id}")
-            # We skip creation and source addition, just poll this notebook.
-            return await self.poll_for_artifacts(notebook_id)
+        if entry and entry["status"] == STATUS_PENDING and entry["notebook_id"]:
+            notebook_id = entry["notebook_id"]
+            logger.info("[NotebookLM] ⚡ Cache Hit! Reusing notebook: %s", notebook_id)
+            self.results.record_hit(video_id)
+            advance("resumed", notebook_id=notebook_id)
+            # We skip creation and source addition, just poll this notebook
+            # (for this video's own infographic, if it shares a collection notebook)
+            return await self.poll_for_artifacts(notebook_id, timeout=timeout, artifact_id=entry["artifact_id"])
 
-        # 1. Create Notebook
-        logger.info("[NotebookLM] Creating Notebook...")
-        create_payload = ["", None, None, [2], [1, None, None, None, None, None, None, None, None, None, [1]]]
-        create_res = await self._execute_rpc(RPC_CREATE_NOTEBOOK, create_payload)
-        
-        inner_create = json.loads(create_res[0][2])
-        notebook_id = inner_create[2]
-        logger.info(f"[NotebookLM] Notebook Created: {notebook_id}")
+        # 1. Create Notebook (or take a pre-created one)
+        if self.notebooks is not None:
+            notebook_id = await self.notebooks.take(self)
+        else:
+            notebook_id = await self.create_notebook()
+        advance("notebook_created", notebook_id=notebook_id)
         
-        # Save state for recovery & cache
+        # Save state for recovery
         try:
-            # Update Last Run
-            state_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "last_run.json")
+            state_file = os.path.join(STATE_DIR, "last_run.json")
             with open(state_file, "w") as f:
                 json.dump({"last_notebook_id": notebook_id, "timestamp": time.time()}, f)
-            
-            # Update Cache
-            cache[video_url] = notebook_id
-            with open(cache_file, "w") as f:
-                json.dump(cache, f)
-                
         except Exception as e:
-            logger.warning(f"Failed to save state/cache: {e}")
+            logger.warning("Failed to save state: %s", e)
 
         # 2. Add Source
-        logger.info(f"[NotebookLM] Adding Source: {video_url}...")
-        source_payload = [[[None, None, None, None, None, None, None, [video_url], None, None, 1]], notebook_id, [2], [1, None, None, None, None, None, None, None, None, None, [1]]]
-        source_res = await self._execute_rpc(RPC_ADD_SOURCE, source_payload)
+        source_id = await self.add_source(notebook_id, video_url)
+        advance("source_added", source_id=source_id)
+
+        # Only cache notebooks that actually hold the video
+        self.results.put_pending(video_id, video_url, notebook_id, self.account)
+
+        try:
+            # 3. Wait until the transcript is processed
+            await self.wait_for_source(notebook_id, source_id)
+            advance("source_ready")
+
+            # 4. Trigger Generation
+            await self.trigger_infographic(notebook_id, [source_id])
+            advance("generation_triggered")
+        except AccountError:
+            # Not the video's fault: leave it pending, a retry starts over on whichever account takes it
+            raise
+        except Exception as e:
+            # A rejected source won't ever produce an infographic; start over next time
+            self.results.put_failed(video_id, str(e))
+            raise
+        
+        # 5. Poll (a timeout keeps the entry pending, so a retry resumes polling)
+        return await self.poll_for_artifacts(notebook_id, timeout=timeout)
+
+    async def generate_infographics(self, video_urls: List[str], max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                                    timeout: Optional[float] = None) -> AsyncIterator[Tuple[str, Union[str, Exception]]]:
+        """
+        Runs the pipeline for many videos concurrently on this client's session.
+
+        Yields (video_url, image_url) as each video completes, or
+        (video_url, exception) if it failed; one failure doesn't stop the rest.
+        At most `max_concurrency` pipelines run at once, and all of them share
+        the client's rate limiter.
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run(video_url: str):
+            async with semaphore:
+                try:
+                    return video_url, await self.generate_infographic(video_url, timeout=timeout)
+                except Exception as e:
+                    logger.error("[NotebookLM] Generation failed for %s: %s", video_url, e)
+                    return video_url, e
+
+        tasks = [asyncio.ensure_future(run(video_url)) for video_url in dict.fromkeys(video_urls)]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    @traced("generate_collection")
+    async def generate_collection(self, video_urls: List[str], per_video: bool = False,
+                                  timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Puts many videos (e.g. a playlist) into one notebook and generates one
+        infographic over all of them.
+
+        One create-notebook and one add-source RPC replace one of each per
+        video. With `per_video`, every video also gets its own infographic in
+        the same notebook, triggered in the same request as the combined one
+        and polled together with it; videos that already have a result keep
+        it. Returns {"key", "notebook_id", "image_url", "videos": {video_url:
+        image_url or exception}} ("videos" is empty without `per_video`).
+        """
+        videos: Dict[str, str] = {}
+        for video_url in video_urls:
+            videos.setdefault(extract_video_id(video_url) or video_url, video_url)
+        if not videos:
+            raise Exception("No videos given")
+        if len(videos) > MAX_NOTEBOOK_SOURCES:
+            raise Exception(f"A notebook holds at most {MAX_NOTEBOOK_SOURCES} sources; got {len(videos)} videos")
+        key = collection_key(list(videos))
+        return await _generations.do(
+            f"{key}:{int(per_video)}", lambda: self._generate_collection_exclusive(key, videos, per_video, timeout)
+        )
+
+    async def _generate_collection_exclusive(self, key: str, videos: Dict[str, str], per_video: bool,
+                                             timeout: Optional[float]) -> Dict[str, Any]:
+        async with FileLock(os.path.join(LOCK_DIR, f"{key}.lock")):
+            return await self._generate_collection(key, videos, per_video, timeout)
+
+    async def _generate_collection(self, key: str, videos: Dict[str, str], per_video: bool,
+                                   timeout: Optional[float]) -> Dict[str, Any]:
+        # Result keys wanted: the collection, plus each video with per_video
+        wanted = {key: " ".join(videos.values())}
+        if per_video:
+            wanted.update(videos)
+        results: Dict[str, Union[str, Exception]] = {}
+        notebook_of: Dict[str, str] = {}
+        waiting: Dict[str, List[Tuple[str, Optional[str]]]] = {}   # notebook -> [(result key, artifact ID)]
+        missing = []
+        for result_key in wanted:
+            entry = self.results.get(result_key)
+            if entry and entry["status"] == STATUS_DONE and entry["image_url"]:
+                self.results.record_hit(result_key)
+                results[result_key] = entry["image_url"]
+                notebook_of[result_key] = entry["notebook_id"]
+            elif (entry and entry["status"] == STATUS_PENDING and entry["notebook_id"]
+                    and (entry["account"] or DEFAULT_ACCOUNT) == self.account):
+                # Triggered by an earlier run: just poll for it again
+                waiting.setdefault(entry["notebook_id"], []).append((result_key, entry["artifact_id"]))
+                notebook_of[result_key] = entry["notebook_id"]
+            else:
+                missing.append(result_key)
+        if waiting or results:
+            logger.info("[NotebookLM] ⚡ Collection %s: %s cached, %s in progress, %s to generate",
+                        key, len(results), sum(len(w) for w in waiting.values()), len(missing))
+
+        if missing:
+            if not self.session_tokens["at"]:
+                await self.start()
+            if self.notebooks is not None:
+                notebook_id = await self.notebooks.take(self)
+            else:
+                notebook_id = await self.create_notebook()
+            # The combined infographic needs every video; otherwise only those still missing one
+            urls = list(videos.values()) if key in missing else [wanted[k] for k in missing]
+            sources = await self.add_sources(notebook_id, urls)
+            statuses = await self.wait_for_sources(notebook_id, list(sources.values()))
+            accepted = {url: sid for url, sid in sources.items() if statuses.get(sid) != SOURCE_STATUS_ERROR}
+            if not accepted:
+                raise Exception("Failed to process sources. Google rejected every video (No transcript?).")
+
+            triggers = []
+            for result_key in missing:
+                if result_key == key:
+                    triggers.append((result_key, list(accepted.values())))
+                elif wanted[result_key] in accepted:
+                    triggers.append((result_key, [accepted[wanted[result_key]]]))
+                else:
+                    results[result_key] = Exception("Google rejected the video (No transcript?).")
+            artifact_ids = await self.trigger_infographics(notebook_id, [source_ids for _, source_ids in triggers])
+            for (result_key, _), artifact_id in zip(triggers, artifact_ids):
+                if artifact_id is None and len(triggers) > 1:
+                    # Nothing would tell this infographic apart from the others in the notebook
+                    results[result_key] = Exception("NotebookLM returned no artifact ID for the infographic")
+                    continue
+                self.results.put_pending(result_key, wanted[result_key], notebook_id, self.account, artifact_id)
+                waiting.setdefault(notebook_id, []).append((result_key, artifact_id))
+                notebook_of[result_key] = notebook_id
+
+        # One LIST_ARTIFACTS per poll and notebook covers every infographic in it
+        notebooks = list(waiting)
+        polled = await asyncio.gather(*[
+            self.poll_for_artifact_set(notebook_id, [artifact_id for _, artifact_id in waiting[notebook_id]],
+                                       timeout=timeout)
+            for notebook_id in notebooks
+        ])
+        timed_out = Exception(f"Timeout waiting for artifact generation "
+                              f"({ARTIFACT_POLICY.with_timeout(timeout).timeout:.0f}s)")
+        for notebook_id, found in zip(notebooks, polled):
+            for result_key, artifact_id in waiting[notebook_id]:
+                results[result_key] = found.get(artifact_id, timed_out)
+
+        if isinstance(results[key], Exception):
+            raise results[key]
+        return {
+            "key": key,
+            "notebook_id": notebook_of[key],
+            "image_url": results[key],
+            "videos": {videos[video_id]: results[video_id] for video_id in videos if video_id in results},
+        }
+
+    async def create_notebook(self) -> str:
+        logger.info("[NotebookLM] Creating Notebook...")
+        create_payload = ["", None, None, [2], [1, None, None, None, None, None, None, None, None, None, [1]]]
+        with span("create_notebook"):
+            create_res = await self._execute_rpc(RPC_CREATE_NOTEBOOK, create_payload)
+        
+        if not create_res or not create_res.ok:
+            raise Exception(f"Failed to create notebook: {truncated(create_res)}")
+        notebook_id = create_res.data[2]
+        logger.info("[NotebookLM] Notebook Created: %s", notebook_id)
+        return notebook_id
+
+    async def delete_notebooks(self, notebook_ids: List[str]) -> List[str]:
+        """Deletes notebooks in one batched request; returns the IDs that were deleted."""
+        if not notebook_ids:
+            return []
+        logger.info("[NotebookLM] Deleting %s notebooks...", len(notebook_ids))
+        with span("delete_notebooks"):
+            results = await self.execute_rpcs([(RPC_DELETE_NOTEBOOK, [[notebook_id], [2]]) for notebook_id in notebook_ids])
+        return [notebook_id for notebook_id, res in zip(notebook_ids, results) if res is not None and res.ok]
+
+    def _source_payload(self, notebook_id: str, video_urls: List[str]) -> list:
+        entries = [[None, None, None, None, None, None, None, [video_url], None, None, 1] for video_url in video_urls]
+        return [entries, notebook_id, [2], [1, None, None, None, None, None, None, None, None, None, [1]]]
+
+    async def add_source(self, notebook_id: str, video_url: str) -> str:
+        """Adds a YouTube video as a source and returns the source ID."""
+        logger.info("[NotebookLM] Adding Source: %s...", video_url)
+        with span("add_source"):
+            source_res = await self._execute_rpc(RPC_ADD_SOURCE, self._source_payload(notebook_id, [video_url]))
         
-        if not source_res or not source_res[0] or len(source_res[0]) < 3:
-            logger.error(f"[NotebookLM] Invalid Add Source Response: {source_res}")
+        if not source_res:
+            logger.error("[NotebookLM] Invalid Add Source Response: %s", truncated(source_res))
             raise Exception("Failed to add source: Invalid RPC response")
 
-        raw_inner = source_res[0][2]
-        if raw_inner is None:
-             logger.error(f"[NotebookLM] Add Source Inner Payload is None. Full Res: {source_res}")
+        if source_res.data is None:
+             logger.error("[NotebookLM] Add Source Inner Payload is None. Full Res: %s", truncated(source_res.raw))
              raise Exception("Failed to add source: Google returned no data (Video might be rejected)")
 
-        inner_source = json.loads(raw_inner)
-        source_id = self._find_source_id(inner_source)
+        source_id = self._find_source_id(source_res.data)
         
         if not source_id:
             raise Exception("Failed to add source. Google rejected the video (No transcript?).")
         
-        logger.info(f"[NotebookLM] Source Added: {source_id}")
+        logger.info("[NotebookLM] Source Added: %s", source_id)
+        return source_id
+
+    async def add_sources(self, notebook_id: str, video_urls: List[str]) -> Dict[str, str]:
+        """
+        Adds several YouTube videos as sources in one RPC and returns
+        {video_url: source_id} for the videos Google accepted.
+
+        Source entries are matched to videos by the URL or video ID they
+        mention, otherwise by position (they come back in request order).
+        """
+        logger.info("[NotebookLM] Adding %s sources...", len(video_urls))
+        with span("add_source", sources=len(video_urls)):
+            source_res = await self._execute_rpc(RPC_ADD_SOURCE, self._source_payload(notebook_id, video_urls))
+
+        if not source_res or source_res.data is None:
+            logger.error("[NotebookLM] Invalid Add Source Response: %s", truncated(source_res.raw if source_res else None))
+            raise Exception("Failed to add sources: Google returned no data (Videos might be rejected)")
 
-        # 3. Wait 
-        logger.info("[NotebookLM] ⏳ Waiting 10s for transcript processing...")
-        await asyncio.sleep(10)
+        entries = self._find_source_entries(source_res.data)
+        if not entries and len(video_urls) == 1 and self._find_source_id(source_res.data):
+            # Unknown response shape: a single source is still unambiguous
+            return {video_urls[0]: self._find_source_id(source_res.data)}
 
-        # 4. Trigger Generation
+        sources: Dict[str, str] = {}
+        unmatched = []
+        for entry in entries:
+            mentioned = json.dumps(entry)
+            video_url = next((url for url in video_urls
+                              if url not in sources and (extract_video_id(url) or url) in mentioned), None)
+            if video_url is None:
+                unmatched.append(entry[0][0])
+            else:
+                sources[video_url] = entry[0][0]
+        remaining = [url for url in video_urls if url not in sources]
+        if unmatched and len(unmatched) == len(remaining):
+            sources.update(zip(remaining, unmatched))
+        elif unmatched:
+            logger.warning("[NotebookLM] Ignoring %s source entries that match no video", len(unmatched))
+
+        if not sources:
+            raise Exception("Failed to add sources. Google rejected every video (No transcript?).")
+        logger.info("[NotebookLM] Sources Added: %s/%s", len(sources), len(video_urls))
+        return {url: sources[url] for url in video_urls if url in sources}
+
+    async def get_source_statuses(self, notebook_id: str, source_ids: List[str]) -> Dict[str, Optional[int]]:
+        """Processing status (SOURCE_STATUS_*, None if unknown) of several sources of a notebook, from one RPC."""
+        response = await self._execute_rpc(RPC_GET_NOTEBOOK, [notebook_id, None, [2], None, 0])
+        if not response or response.data is None:
+            return dict.fromkeys(source_ids)
+        return {source_id: self._find_source_status(response.data, source_id) for source_id in source_ids}
+
+    async def wait_for_source(self, notebook_id: str, source_id: str,
+                              policy: PollPolicy = SOURCE_READY_POLICY) -> bool:
+        """
+        Polls the notebook until the source's transcript is processed.
+
+        Returns True once it is ready, False if the status could not be
+        determined or the budget ran out (generation is attempted anyway).
+        Raises if NotebookLM reports the source as failed.
+        """
+        status = (await self.wait_for_sources(notebook_id, [source_id], policy))[source_id]
+        if status == SOURCE_STATUS_ERROR:
+            raise Exception("Failed to process source. Google rejected the video (No transcript?).")
+        return status == SOURCE_STATUS_READY
+
+    @traced("transcript_wait")
+    async def wait_for_sources(self, notebook_id: str, source_ids: List[str],
+                               policy: PollPolicy = SOURCE_READY_POLICY) -> Dict[str, Optional[int]]:
+        """
+        Polls the notebook until every source is processed or rejected.
+
+        Returns the last status seen per source; anything but
+        SOURCE_STATUS_READY or SOURCE_STATUS_ERROR means it could not be
+        determined or the budget ran out (generation is attempted anyway).
+        """
+        logger.info("[NotebookLM] ⏳ Waiting for transcript processing...")
+        backoff = policy.start()
+        status_seen = False
+        while True:
+            try:
+                statuses = await self.get_source_statuses(notebook_id, source_ids)
+            except ThrottledError as e:
+                # The rate limiter has slowed down; poll again after the usual interval
+                logger.warning("[NotebookLM] Source status check throttled: %s", e)
+                statuses = dict.fromkeys(source_ids)
+            except AccountError:
+                # Login, quota or open circuit: waiting longer won't help
+                raise
+            except Exception as e:
+                # Transient: poll again after the usual interval
+                logger.warning("[NotebookLM] Source status check failed: %s", e)
+                statuses = dict.fromkeys(source_ids)
+            else:
+                if all(status in (SOURCE_STATUS_READY, SOURCE_STATUS_ERROR) for status in statuses.values()):
+                    if SOURCE_STATUS_READY in statuses.values():
+                        record_stage("source_ready", backoff.elapsed)
+                        logger.info("[NotebookLM] Transcript ready after %.1fs", backoff.elapsed)
+                    return statuses
+                if any(status is not None for status in statuses.values()):
+                    status_seen = True
+                elif not status_seen:
+                    # Answered, but in a shape we can't read: fall back to the old fixed wait
+                    logger.warning("[NotebookLM] Could not read source status; waiting %ss instead.",
+                                   TRANSCRIPT_FALLBACK_WAIT)
+                    await asyncio.sleep(TRANSCRIPT_FALLBACK_WAIT)
+                    return statuses
+
+            delay = backoff.next_delay()
+            if delay is None:
+                logger.warning("[NotebookLM] Source still processing after %.0fs; triggering anyway.", backoff.elapsed)
+                return statuses
+            await asyncio.sleep(delay)
+
+    def _trigger_payload(self, notebook_id: str, source_ids: List[str]) -> list:
+        sources = [[[source_id]] for source_id in source_ids]
+        return [[2], notebook_id, [None, None, 7, sources, None, None, None, None, None, None, None, None, None, None, [[None, None, None, 1, 2]]]]
+
+    async def trigger_infographic(self, notebook_id: str, source_ids: List[str]) -> Optional[str]:
+        """Starts an infographic over `source_ids`; returns its artifact ID if the response carries one."""
         logger.info("[NotebookLM] 🚀 Triggering Generation...")
-        trigger_payload = [[2], notebook_id, [None, None, 7, [[[source_id]]], None, None, None, None, None, None, None, None, None, None, [[None, None, None, 1, 2]]]]
-        await self._execute_rpc(RPC_GENERATE_INFOGRAPHIC, trigger_payload)
-        
-        # 5. Poll
-        return await self.poll_for_artifacts(notebook_id)
+        with span("trigger"):
+            res = await self._execute_rpc(RPC_GENERATE_INFOGRAPHIC, self._trigger_payload(notebook_id, source_ids))
+        return self._find_artifact_id(res.data) if res is not None else None
+
+    async def trigger_infographics(self, notebook_id: str, source_groups: List[List[str]]) -> List[Optional[str]]:
+        """Starts one infographic per group of sources in a single batched request; returns their artifact IDs."""
+        if len(source_groups) == 1:
+            return [await self.trigger_infographic(notebook_id, source_groups[0])]
+        logger.info("[NotebookLM] 🚀 Triggering %s Generations...", len(source_groups))
+        with span("trigger", infographics=len(source_groups)):
+            results = await self.execute_rpcs([
+                (RPC_GENERATE_INFOGRAPHIC, self._trigger_payload(notebook_id, source_ids)) for source_ids in source_groups
+            ])
+        return [self._find_artifact_id(res.data) if res is not None else None for res in results]
+
+    async def poll_for_artifacts(self, notebook_id: str, timeout: Optional[float] = None,
+                                 policy: PollPolicy = ARTIFACT_POLICY, artifact_id: Optional[str] = None) -> str:
+        """
+        Polls LIST_ARTIFACTS until the infographic shows up (the one with
+        `artifact_id`, if the notebook holds several).
+
+        The interval grows with jitter (see PollPolicy) and the whole wait is
+        bounded by `timeout` seconds (default: the policy's budget).
+        """
+        found = await self.poll_for_artifact_set(notebook_id, [artifact_id], timeout, policy)
+        if artifact_id not in found:
+            raise Exception(f"Timeout waiting for artifact generation ({policy.with_timeout(timeout).timeout:.0f}s)")
+        return found[artifact_id]
 
-    async def poll_for_artifacts(self, notebook_id: str) -> str:
+    @traced("poll")
+    async def poll_for_artifact_set(self, notebook_id: str, artifact_ids: List[Optional[str]],
+                                    timeout: Optional[float] = None,
+                                    policy: PollPolicy = ARTIFACT_POLICY) -> Dict[Optional[str], str]:
+        """
+        Polls one notebook for several infographics at once (None = the first
+        one found) and returns {artifact_id: image_url} for those finished
+        within the budget.
+        """
         logger.info("[NotebookLM] Polling for artifacts...")
-        for i in range(30):
+        backoff = policy.with_timeout(timeout).start()
+        found: Dict[Optional[str], str] = {}
+        while True:
             try:
                 payload = [[2], notebook_id, 'NOT artifact.status = "ARTIFACT_STATUS_SUGGESTED"']
                 response = await self._execute_rpc(RPC_LIST_ARTIFACTS, payload)
                 
-                if response and response[0] and isinstance(response[0][2], str):
-                    inner_data = json.loads(response[0][2])
-                    image_url = self._find_image_url(inner_data)
-                    
-                    if image_url:
-                        logger.info(f"[NotebookLM] 📸 Image Found: {image_url}")
-                        return image_url
+                if response and response.data is not None:
+                    for artifact_id in artifact_ids:
+                        if artifact_id in found:
+                            continue
+                        if artifact_id is None:
+                            image_url = self._find_image_url(response.data)
+                        else:
+                            image_url = self._find_artifact_image(response.data, artifact_id)
+                        if image_url:
+                            self.results.put_done(notebook_id, image_url, artifact_id)
+                            record_stage("artifact_ready", backoff.elapsed)
+                            histogram("artifact_polls", POLL_COUNT_BUCKETS).observe(backoff.attempts + 1)
+                            logger.info("[NotebookLM] 📸 Image Found: %s", image_url)
+                            found[artifact_id] = image_url
+                    if len(found) == len(set(artifact_ids)):
+                        return found
+            except ThrottledError as e:
+                # The rate limiter has slowed down; the next poll is the next attempt
+                logger.warning("[NotebookLM] Poll throttled: %s", e)
+            except AccountError:
+                raise
             except Exception as e:
-                logger.warning(f"[NotebookLM] Poll error: {e}")
-            
-            await asyncio.sleep(10)
-            logger.info(f"[NotebookLM] Poll attempt {i+1}/30...")
+                # Already retried by execute_rpcs; the next poll is the next attempt
+                logger.warning("[NotebookLM] Poll error: %s", e)
             
-        raise Exception("Timeout waiting for artifact generation")
+            delay = backoff.next_delay()
+            if delay is None:
+                return found
+            await asyncio.sleep(delay)
+            logger.info("[NotebookLM] Poll attempt %s (%.0fs/%.0fs)...",
+                        backoff.attempts, backoff.elapsed, backoff.policy.timeout)
 
 # Example Usage
 if __name__ == "__main__":
@@ -0,0 +1,150 @@
+import asyncio
+import os
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+# --- CONFIGURATION ---
+# batchexecute requests per second (and burst) allowed per Google account
+DEFAULT_RPC_RATE = float(os.environ.get("NOTEBOOKLM_RPC_RATE", 5))
+DEFAULT_RPC_BURST = int(os.environ.get("NOTEBOOKLM_RPC_BURST", 10))
+# Budgets of single RPC IDs on top of the account's, as "rpcid=rate/burst,..."; unlisted IDs
+# get the account's rate and burst
+RPC_LIMITS = os.environ.get("NOTEBOOKLM_RPC_LIMITS", "")
+# On a 429 a bucket's rate is multiplied by THROTTLE_FACTOR (1 = don't adapt); while requests
+# succeed it gets back RECOVERY_STEP of the configured rate, at most once per ADAPT_INTERVAL
+# seconds. Never below MIN_RATE_FRACTION of the configured rate.
+THROTTLE_FACTOR = float(os.environ.get("NOTEBOOKLM_RPC_THROTTLE_FACTOR", 0.5))
+RECOVERY_STEP = 0.1
+MIN_RATE_FRACTION = 0.05
+ADAPT_INTERVAL = 1.0
+
+
+class TokenBucket:
+    """
+    Async token-bucket rate limiter.
+
+    Tokens refill continuously at `rate` per second up to `burst`; acquire()
+    waits until a token is available. Waiters are served in FIFO order.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RPC_RATE, burst: int = DEFAULT_RPC_BURST):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self, tokens: float = 1.0):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+
+class AdaptiveTokenBucket(TokenBucket):
+    """
+    TokenBucket that slows down when the server throttles: throttle() cuts
+    the rate by THROTTLE_FACTOR and drains the bucket, succeed() raises it
+    back towards the configured rate step by step (AIMD, as in TCP).
+
+    Like TCP, it cuts once per round of requests: a 429 for a request sent
+    before the last cut went out at the old rate and is already accounted for.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RPC_RATE, burst: int = DEFAULT_RPC_BURST):
+        super().__init__(rate, burst)
+        self.max_rate = rate
+        self.throttled = 0
+        self._cut_at = float("-inf")
+        self._adapted_at = float("-inf")
+
+    def throttle(self, sent_at: Optional[float] = None):
+        self.throttled += 1
+        if self.max_rate <= 0 or THROTTLE_FACTOR >= 1:
+            return
+        self._refill()
+        # Whatever burst was left is what got us throttled
+        self.tokens = min(self.tokens, 0.0)
+        if sent_at is None or sent_at >= self._cut_at:
+            self.rate = max(self.max_rate * MIN_RATE_FRACTION, self.rate * THROTTLE_FACTOR)
+            self._cut_at = self._adapted_at = self.updated_at
+
+    def succeed(self):
+        now = time.monotonic()
+        if self.rate < self.max_rate and now - self._adapted_at >= ADAPT_INTERVAL:
+            self._refill()
+            self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_STEP)
+            self._adapted_at = now
+
+
+def parse_rpc_limits(spec: str) -> Dict[str, Tuple[float, int]]:
+    """Parses NOTEBOOKLM_RPC_LIMITS ("R7cb6c=1/3,gArtLc=2/4") into {rpc_id: (rate, burst)}."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        rpc_id, _, budget = item.partition("=")
+        rate, _, burst = budget.partition("/")
+        limits[rpc_id.strip()] = (float(rate), int(burst or max(1, float(rate))))
+    return limits
+
+
+class RpcRateLimiter:
+    """
+    Request budget of one Google account: an adaptive bucket for the
+    account, plus one per RPC ID.
+
+    A request waits for the bucket of every RPC ID it carries, then for the
+    account's. A 429 slows all of those down; successful requests bring
+    them back towards their configured rates. Share one limiter between all
+    clients of an account.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RPC_RATE, burst: int = DEFAULT_RPC_BURST,
+                 limits: Optional[Dict[str, Tuple[float, int]]] = None):
+        self.account = AdaptiveTokenBucket(rate, burst)
+        self.limits = parse_rpc_limits(RPC_LIMITS) if limits is None else limits
+        self.rpcs: Dict[str, AdaptiveTokenBucket] = {}
+
+    def _bucket(self, rpc_id: str) -> AdaptiveTokenBucket:
+        if rpc_id not in self.rpcs:
+            rate, burst = self.limits.get(rpc_id, (self.account.max_rate, self.account.burst))
+            self.rpcs[rpc_id] = AdaptiveTokenBucket(rate, burst)
+        return self.rpcs[rpc_id]
+
+    async def acquire(self, rpc_ids: Iterable[str] = ()) -> float:
+        """Waits until the request may be sent; returns when that was, for throttle()."""
+        # Sorted, so two requests never wait for each other's buckets in opposite order
+        for rpc_id in sorted(set(rpc_ids)):
+            await self._bucket(rpc_id).acquire()
+        await self.account.acquire()
+        return time.monotonic()
+
+    def throttle(self, rpc_ids: Iterable[str] = (), sent_at: Optional[float] = None):
+        """A request let through at `sent_at` got a 429."""
+        for rpc_id in set(rpc_ids):
+            self._bucket(rpc_id).throttle(sent_at)
+        self.account.throttle(sent_at)
+
+    def succeed(self, rpc_ids: Iterable[str] = ()):
+        for rpc_id in set(rpc_ids):
+            self._bucket(rpc_id).succeed()
+        self.account.succeed()
+
+    def status(self) -> Dict[str, object]:
+        """Current rates (requests/s) and 429 counts, for get_health."""
+        return {
+            "rate": round(self.account.rate, 2),
+            "max_rate": self.account.max_rate,
+            "throttled": self.account.throttled,
+            "rpcs": {rpc_id: {"rate": round(b.rate, 2), "throttled": b.throttled}
+                     for rpc_id, b in sorted(self.rpcs.items()) if b.throttled or b.rate < b.max_rate},
+        }
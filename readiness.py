@@ -0,0 +1,70 @@
+import os
+import random
+import time
+from typing import Optional
+
+
+class PollPolicy:
+    """
+    How to poll for something to become ready: an exponentially growing
+    interval with jitter, bounded by an overall deadline (`timeout`).
+    """
+
+    def __init__(self, initial_interval: float, max_interval: float, multiplier: float = 1.5,
+                 jitter: float = 0.2, timeout: float = 300):
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.timeout = timeout
+
+    def with_timeout(self, timeout: Optional[float]) -> "PollPolicy":
+        if timeout is None:
+            return self
+        return PollPolicy(self.initial_interval, self.max_interval, self.multiplier, self.jitter, timeout)
+
+    def start(self) -> "Backoff":
+        return Backoff(self)
+
+
+class Backoff:
+    """One run of a PollPolicy: hands out sleep durations until the deadline is spent."""
+
+    def __init__(self, policy: PollPolicy):
+        self.policy = policy
+        self.started_at = time.monotonic()
+        self.deadline = self.started_at + policy.timeout
+        self.interval = policy.initial_interval
+        self.attempts = 0
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def remaining(self) -> float:
+        return max(0.0, self.deadline - time.monotonic())
+
+    def next_delay(self) -> Optional[float]:
+        """Returns how long to sleep before the next attempt, or None once the budget is spent."""
+        self.attempts += 1
+        remaining = self.remaining
+        if remaining <= 0:
+            return None
+        jitter = self.policy.jitter
+        delay = self.interval * random.uniform(1 - jitter, 1 + jitter)
+        self.interval = min(self.interval * self.policy.multiplier, self.policy.max_interval)
+        return min(delay, remaining)
+
+
+# --- DEFAULT POLICIES ---
+# Transcript processing usually finishes within seconds; check often.
+SOURCE_READY_POLICY = PollPolicy(
+    initial_interval=1.0, max_interval=5.0, multiplier=1.5,
+    timeout=float(os.environ.get("NOTEBOOKLM_SOURCE_TIMEOUT", 120)),
+)
+# Infographic generation takes a minute or more; back off towards 15s between polls.
+ARTIFACT_POLICY = PollPolicy(
+    initial_interval=3.0, max_interval=15.0, multiplier=1.4,
+    timeout=float(os.environ.get("NOTEBOOKLM_ARTIFACT_TIMEOUT", 300)),
+)
@@ -0,0 +1,136 @@
+import os
+import time
+from typing import Any, Dict, Optional
+
+from readiness import PollPolicy
+
+# --- CONFIGURATION ---
+# Retries of a failed batchexecute request (429, 5xx, connection error); 0 disables them
+RPC_MAX_RETRIES = int(os.environ.get("NOTEBOOKLM_RPC_RETRIES", 3))
+# Jittered exponential backoff between retries, all retries of one request within `timeout`
+RPC_RETRY_POLICY = PollPolicy(
+    initial_interval=0.5, max_interval=8.0, multiplier=2.0, jitter=0.5,
+    timeout=float(os.environ.get("NOTEBOOKLM_RPC_RETRY_TIMEOUT", 30)),
+)
+# Process-wide, retries may add at most this fraction of the requests sent (plus a trickle
+# of RETRY_BUDGET_MIN_PER_S), so an outage doesn't multiply the load on NotebookLM
+RETRY_BUDGET_RATIO = float(os.environ.get("NOTEBOOKLM_RETRY_BUDGET_RATIO", 0.2))
+RETRY_BUDGET_MIN_PER_S = 0.5
+RETRY_BUDGET_MAX = 20
+# An account's circuit opens after this many requests in a row failed (after retries; 0 disables
+# it), and stays open this many seconds before letting one probe request through
+BREAKER_FAILURES = int(os.environ.get("NOTEBOOKLM_BREAKER_FAILURES", 5))
+BREAKER_COOLDOWN = float(os.environ.get("NOTEBOOKLM_BREAKER_COOLDOWN", 30))
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+
+class RetryBudget:
+    """
+    Caps retries across all accounts and clients: every request deposits
+    `ratio` of a retry, every retry withdraws a whole one. While requests
+    fail, retries stop once the balance is spent, instead of each caller
+    retrying on its own.
+    """
+
+    def __init__(self, ratio: float = RETRY_BUDGET_RATIO, min_per_s: float = RETRY_BUDGET_MIN_PER_S,
+                 max_balance: float = RETRY_BUDGET_MAX):
+        self.ratio = ratio
+        self.min_per_s = min_per_s
+        self.max_balance = max_balance
+        self.balance = float(max_balance)
+        self.updated_at = time.monotonic()
+        self.retries = 0
+        self.denied = 0
+
+    def _refill(self, amount: float = 0.0):
+        now = time.monotonic()
+        self.balance = min(self.max_balance, self.balance + amount + (now - self.updated_at) * self.min_per_s)
+        self.updated_at = now
+
+    def record_request(self):
+        self._refill(self.ratio)
+
+    def withdraw(self) -> bool:
+        """Takes one retry from the budget; False if there is none left."""
+        self._refill()
+        if self.balance < 1:
+            self.denied += 1
+            return False
+        self.balance -= 1
+        self.retries += 1
+        return True
+
+    def status(self) -> Dict[str, Any]:
+        self._refill()
+        return {"balance": round(self.balance, 1), "retries": self.retries, "denied": self.denied}
+
+
+class CircuitBreaker:
+    """
+    Fails an account's requests fast while they keep failing.
+
+    Closed: requests go through. After `failures` consecutive failed
+    requests it opens and allow() refuses everything for `cooldown`
+    seconds. Then it is half-open: one probe request goes through, and its
+    outcome closes the circuit or opens it again.
+    """
+
+    def __init__(self, failures: int = BREAKER_FAILURES, cooldown: float = BREAKER_COOLDOWN):
+        self.failures = failures
+        self.cooldown = cooldown
+        self.state = BREAKER_CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.times_opened = 0
+        self._probe_at: Optional[float] = None
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until the next probe may go through (0 unless open)."""
+        if self.state != BREAKER_OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def allow(self) -> bool:
+        if self.state == BREAKER_CLOSED:
+            return True
+        now = time.monotonic()
+        if self.state == BREAKER_OPEN and now - self.opened_at >= self.cooldown:
+            self.state = BREAKER_HALF_OPEN
+            self._probe_at = None
+        # One probe at a time; a probe that never reported back (cancelled) is replaced after a cooldown
+        if self.state == BREAKER_HALF_OPEN and (self._probe_at is None or now - self._probe_at >= self.cooldown):
+            self._probe_at = now
+            return True
+        return False
+
+    def record_success(self):
+        self.state = BREAKER_CLOSED
+        self.consecutive_failures = 0
+        self._probe_at = None
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.failures <= 0:
+            return
+        if self.state == BREAKER_HALF_OPEN or self.consecutive_failures >= self.failures:
+            if self.state != BREAKER_OPEN:
+                self.times_opened += 1
+            self.state = BREAKER_OPEN
+            self.opened_at = time.monotonic()
+            self._probe_at = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "retry_after_s": round(self.retry_after, 1) if self.state == BREAKER_OPEN else None,
+            "times_opened": self.times_opened,
+        }
+
+
+# Shared by every client in the process
+retry_budget = RetryBudget()
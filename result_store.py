@@ -0,0 +1,287 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+from typing import Optional, Dict, Any, List
+
+from youtube import extract_video_id
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+# Results are served for this long (seconds). Finished notebooks are only reaped once their result
+# expired, so a longer TTL saves regenerations but keeps more notebooks in the account.
+DEFAULT_TTL = float(os.environ.get("NOTEBOOKLM_RESULT_TTL", 7 * 24 * 60 * 60))
+DEFAULT_MAX_ENTRIES = int(os.environ.get("NOTEBOOKLM_RESULT_MAX_ENTRIES", 10000))
+EVICT_EVERY = 100   # writes between eviction sweeps
+
+STATUS_PENDING = "pending"   # notebook holds the video; infographic not seen yet
+STATUS_DONE = "done"         # image_url is final
+STATUS_FAILED = "failed"     # the video was rejected; the next request starts over
+
+# Account of rows written before multi-account support (and of single-account setups)
+DEFAULT_ACCOUNT = "default"
+
+# Notebooks this server created, tracked so unused ones can be reused and finished ones deleted
+NOTEBOOK_SPARE = "spare"       # created ahead of time, still empty
+NOTEBOOK_IN_USE = "in_use"     # handed to a generation
+NOTEBOOK_DELETED = "deleted"   # removed from the account by the reaper
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    video_id    TEXT PRIMARY KEY,
+    video_url   TEXT,
+    notebook_id TEXT,
+    image_url   TEXT,
+    status      TEXT NOT NULL,
+    error       TEXT,
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL,
+    last_hit_at REAL NOT NULL,
+    hits        INTEGER NOT NULL DEFAULT 0,
+    account     TEXT,
+    artifact_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_results_notebook ON results(notebook_id);
+CREATE INDEX IF NOT EXISTS idx_results_last_hit ON results(last_hit_at);
+CREATE TABLE IF NOT EXISTS notebooks (
+    notebook_id TEXT PRIMARY KEY,
+    state       TEXT NOT NULL,
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL,
+    account     TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_notebooks_state ON notebooks(state, created_at);
+"""
+
+
+class ResultStore:
+    """
+    Generation results keyed by canonical YouTube video ID, in SQLite.
+
+    Stores the notebook ID, the final artifact URL, status, timestamps and hit
+    counts, so a hit with a final URL needs no RPC at all. WAL mode and a busy
+    timeout keep it safe for concurrent writers, including several server
+    processes sharing one state directory. Entries expire after `ttl` seconds
+    and the least recently used ones are evicted beyond `max_entries`.
+    """
+
+    def __init__(self, path: str, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 legacy_cache_file: Optional[str] = None):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes = 0
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        is_new = not os.path.exists(path)
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._migrate()
+
+        if is_new and legacy_cache_file:
+            self._import_legacy_cache(legacy_cache_file)
+        self.evict()
+
+    def _execute(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        with self._lock:
+            return self._conn.execute(sql, params)
+
+    def _migrate(self):
+        """Adds columns introduced after a database was created."""
+        for table, added in (("results", ("account", "artifact_id")), ("notebooks", ("account",))):
+            columns = {row["name"] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            for column in added:
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} TEXT")
+
+    def _import_legacy_cache(self, cache_file: str):
+        """Seeds the store from the old URL -> notebook ID cache.json."""
+        if not os.path.exists(cache_file):
+            return
+        try:
+            with open(cache_file, "r") as f:
+                legacy = json.load(f)
+        except Exception as e:
+            logger.warning("[Results] Failed to read legacy cache: %s", e)
+            return
+        imported = 0
+        for video_url, notebook_id in legacy.items():
+            video_id = extract_video_id(video_url)
+            if video_id and notebook_id:
+                self.put_pending(video_id, video_url, notebook_id)
+                imported += 1
+        logger.info("[Results] Imported %s entries from %s", imported, os.path.basename(cache_file))
+
+    def get(self, video_id: str) -> Optional[Dict[str, Any]]:
+        row = self._execute(
+            "SELECT * FROM results WHERE video_id = ? AND updated_at > ?",
+            (video_id, time.time() - self.ttl),
+        ).fetchone()
+        return dict(row) if row else None
+
+    def get_by_notebook(self, notebook_id: str) -> Optional[Dict[str, Any]]:
+        row = self._execute(
+            "SELECT * FROM results WHERE notebook_id = ? AND updated_at > ? ORDER BY updated_at DESC LIMIT 1",
+            (notebook_id, time.time() - self.ttl),
+        ).fetchone()
+        return dict(row) if row else None
+
+    def notebook_account(self, notebook_id: str) -> Optional[str]:
+        """The account a notebook was created in, if this server created or used it."""
+        row = self._execute(
+            """
+            SELECT COALESCE(account, ?) AS account FROM notebooks WHERE notebook_id = ?
+            UNION ALL
+            SELECT COALESCE(account, ?) FROM results WHERE notebook_id = ?
+            LIMIT 1
+            """,
+            (DEFAULT_ACCOUNT, notebook_id, DEFAULT_ACCOUNT, notebook_id),
+        ).fetchone()
+        return row["account"] if row else None
+
+    def record_hit(self, video_id: str):
+        self._execute(
+            "UPDATE results SET hits = hits + 1, last_hit_at = ? WHERE video_id = ?",
+            (time.time(), video_id),
+        )
+
+    def put_pending(self, video_id: str, video_url: str, notebook_id: str, account: str = DEFAULT_ACCOUNT,
+                    artifact_id: Optional[str] = None):
+        """
+        Records that `notebook_id` holds the video. `artifact_id` names the
+        infographic to wait for when the notebook holds several (see
+        NotebookLMClient.generate_collection).
+        """
+        now = time.time()
+        self._execute(
+            """
+            INSERT INTO results (video_id, video_url, notebook_id, image_url, status, error,
+                                 created_at, updated_at, last_hit_at, hits, account, artifact_id)
+            VALUES (?, ?, ?, NULL, ?, NULL, ?, ?, ?, 0, ?, ?)
+            ON CONFLICT(video_id) DO UPDATE SET
+                video_url = excluded.video_url, notebook_id = excluded.notebook_id,
+                image_url = NULL, status = excluded.status, error = NULL,
+                updated_at = excluded.updated_at, account = excluded.account, artifact_id = excluded.artifact_id
+            """,
+            (video_id, video_url, notebook_id, STATUS_PENDING, now, now, now, account, artifact_id),
+        )
+        self._after_write()
+
+    def put_done(self, notebook_id: str, image_url: str, artifact_id: Optional[str] = None):
+        """Marks every entry waiting for this notebook's infographic (or for `artifact_id` in it) as finished."""
+        self._execute(
+            """
+            UPDATE results SET image_url = ?, status = ?, error = NULL, updated_at = ?
+            WHERE notebook_id = ? AND artifact_id IS ?
+            """,
+            (image_url, STATUS_DONE, time.time(), notebook_id, artifact_id),
+        )
+        self._after_write()
+
+    def put_failed(self, video_id: str, error: str):
+        self._execute(
+            "UPDATE results SET status = ?, error = ?, updated_at = ? WHERE video_id = ?",
+            (STATUS_FAILED, error[:500], time.time(), video_id),
+        )
+        self._after_write()
+
+    # --- notebook ledger ---
+    def add_notebook(self, notebook_id: str, state: str, account: str = DEFAULT_ACCOUNT):
+        now = time.time()
+        self._execute(
+            """
+            INSERT OR REPLACE INTO notebooks (notebook_id, state, created_at, updated_at, account)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (notebook_id, state, now, now, account),
+        )
+
+    def take_spare_notebook(self, account: str = DEFAULT_ACCOUNT) -> Optional[str]:
+        """Atomically claims the account's oldest spare notebook (safe across server processes)."""
+        row = self._execute(
+            """
+            UPDATE notebooks SET state = ?, updated_at = ?
+            WHERE notebook_id = (SELECT notebook_id FROM notebooks
+                                 WHERE state = ? AND COALESCE(account, ?) = ? ORDER BY created_at LIMIT 1)
+            RETURNING notebook_id
+            """,
+            (NOTEBOOK_IN_USE, time.time(), NOTEBOOK_SPARE, DEFAULT_ACCOUNT, account),
+        ).fetchone()
+        return row["notebook_id"] if row else None
+
+    def count_notebooks(self, state: str, account: Optional[str] = None) -> int:
+        """Notebooks in `state`, for one account or (None) all of them."""
+        if account is None:
+            return self._execute("SELECT COUNT(*) FROM notebooks WHERE state = ?", (state,)).fetchone()[0]
+        return self._execute(
+            "SELECT COUNT(*) FROM notebooks WHERE state = ? AND COALESCE(account, ?) = ?",
+            (state, DEFAULT_ACCOUNT, account),
+        ).fetchone()[0]
+
+    def reapable_notebooks(self, done_after: float, orphan_after: float, limit: int,
+                           account: str = DEFAULT_ACCOUNT) -> List[str]:
+        """
+        The account's notebooks that are safe to delete: their video failed
+        (and nothing else in them finished), their result has been final for
+        `done_after` seconds (0 = keep finished notebooks), or no result
+        references them any more for `orphan_after` seconds.
+        """
+        now = time.time()
+        rows = self._execute(
+            """
+            SELECT n.notebook_id FROM notebooks n
+            WHERE n.state = ? AND COALESCE(n.account, ?) = ?
+              AND NOT EXISTS (SELECT 1 FROM results p WHERE p.notebook_id = n.notebook_id AND p.status = ?)
+              AND (
+                  (EXISTS (SELECT 1 FROM results r WHERE r.notebook_id = n.notebook_id AND r.status = ?)
+                   AND NOT EXISTS (SELECT 1 FROM results d WHERE d.notebook_id = n.notebook_id AND d.status = ?))
+                  OR (? > 0 AND EXISTS (SELECT 1 FROM results r WHERE r.notebook_id = n.notebook_id
+                                        AND r.status = ? AND r.updated_at < ?))
+                  OR (NOT EXISTS (SELECT 1 FROM results r WHERE r.notebook_id = n.notebook_id)
+                      AND n.updated_at < ?)
+              )
+            ORDER BY n.updated_at LIMIT ?
+            """,
+            (NOTEBOOK_IN_USE, DEFAULT_ACCOUNT, account, STATUS_PENDING, STATUS_FAILED, STATUS_DONE,
+             done_after, STATUS_DONE, now - done_after, now - orphan_after, limit),
+        ).fetchall()
+        return [r["notebook_id"] for r in rows]
+
+    def mark_notebooks_deleted(self, notebook_ids: List[str]):
+        """Records the notebooks as deleted and drops their (failed or expired) results, whose artifacts are gone."""
+        now = time.time()
+        for notebook_id in notebook_ids:
+            self._execute("UPDATE notebooks SET state = ?, updated_at = ? WHERE notebook_id = ?",
+                          (NOTEBOOK_DELETED, now, notebook_id))
+            self._execute("DELETE FROM results WHERE notebook_id = ?", (notebook_id,))
+
+    def _after_write(self):
+        self._writes += 1
+        if self._writes % EVICT_EVERY == 0:
+            self.evict()
+
+    def evict(self) -> int:
+        """Drops expired entries, then the least recently used beyond max_entries."""
+        expired = self._execute("DELETE FROM results WHERE updated_at <= ?", (time.time() - self.ttl,)).rowcount
+        overflow = self._execute(
+            """
+            DELETE FROM results WHERE video_id IN (
+                SELECT video_id FROM results ORDER BY last_hit_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,),
+        ).rowcount
+        if expired or overflow:
+            logger.info("[Results] Evicted %s expired and %s least recently used entries", expired, overflow)
+        return expired + overflow
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,70 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+DEFAULT_MAX_BATCH = 20   # batchexecute entries per request
+
+Call = Tuple[str, Any]
+
+
+class RpcBatcher:
+    """
+    Micro-batcher for batchexecute RPCs.
+
+    Calls issued within `window` seconds of the first pending call are merged
+    and sent through `execute` (NotebookLMClient.execute_rpcs) as one request.
+    A batch is flushed early once it reaches `max_batch` entries.
+    """
+
+    def __init__(self, execute: Callable[[List[Call]], Awaitable[List[Any]]],
+                 window: float, max_batch: int = DEFAULT_MAX_BATCH):
+        self.execute = execute
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: List[Tuple[Call, asyncio.Future]] = []
+        self._flush_handle = None
+        # The event loop only keeps weak references to tasks: hold the in-flight sends until they finish
+        self._sending: Set[asyncio.Task] = set()
+
+    async def call(self, rpc_id: str, payload: Any) -> Any:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append(((rpc_id, payload), future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._send(batch))
+            self._sending.add(task)
+            task.add_done_callback(self._sending.discard)
+
+    async def _send(self, batch: List[Tuple[Call, asyncio.Future]]):
+        if len(batch) > 1:
+            logger.info("[NotebookLM] Sending %s batched RPCs in one request", len(batch))
+        try:
+            results = await self.execute([call for call, _ in batch])
+        except BaseException as e:
+            # Cancellation too: the callers await these futures, not this task, and would hang
+            for _, future in batch:
+                if future.done():
+                    continue
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,319 @@
+import asyncio
+import hashlib
+import os
+import time
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from accounts import Account
+from client_pool import ClientPool, SharedBrowser, DEFAULT_POOL_SIZE
+from notebook_lifecycle import NotebookLifecycle
+from notebooklm_client import (
+    NotebookLMClient, AccountError, QuotaError, ThrottledError, CircuitOpenError, BROWSER_MODE, DEFAULT_MAX_CONCURRENCY,
+)
+from result_store import ResultStore, STATUS_DONE, STATUS_PENDING, DEFAULT_ACCOUNT
+from session_cache import SessionCache
+from youtube import extract_video_id
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+# How long an account stays out of rotation after NotebookLM rejected its login or its quota ran out
+AUTH_COOLDOWN = float(os.environ.get("NOTEBOOKLM_AUTH_COOLDOWN", 30 * 60))
+QUOTA_COOLDOWN = float(os.environ.get("NOTEBOOKLM_QUOTA_COOLDOWN", 60 * 60))
+# ...or kept answering HTTP 429 after retries: a rate limit its adaptive limiter is already backing off from
+THROTTLE_COOLDOWN = float(os.environ.get("NOTEBOOKLM_THROTTLE_COOLDOWN", 10))
+
+
+class _AccountSlot:
+    """One account's pool plus the load and health the scheduler routes by."""
+
+    def __init__(self, pool: ClientPool, notebooks: Optional[NotebookLifecycle] = None):
+        self.name = pool.account
+        self.pool = pool
+        self.notebooks = notebooks
+        self.in_flight = 0
+        self.completed = 0
+        self.ejected_until = 0.0
+        self.last_error: Optional[str] = None
+
+    @property
+    def healthy(self) -> bool:
+        return time.time() >= self.ejected_until
+
+    @property
+    def load(self) -> float:
+        return self.in_flight / self.pool.size
+
+
+def _rendezvous(video_id: Optional[str], name: str) -> int:
+    """Highest-random-weight score, so idle accounts split videos evenly but stably."""
+    return int.from_bytes(hashlib.blake2b(f"{video_id}:{name}".encode(), digest_size=8).digest(), "big")
+
+
+class AccountScheduler:
+    """
+    Spreads work over several Google accounts, one ClientPool each.
+
+    Every lease goes to the least-loaded healthy account (requests in flight
+    per pooled page). A video whose result or pending notebook already lives
+    in one account goes back to that account, since other accounts can't see
+    its notebook. An account that fails authentication or runs out of quota
+    is taken out of rotation for a cooldown; run() then retries the work on
+    another account. With a single account this behaves like its pool.
+    """
+
+    def __init__(self, pools: List[ClientPool], results: ResultStore,
+                 notebooks: Optional[Dict[str, NotebookLifecycle]] = None):
+        if not pools:
+            raise ValueError("AccountScheduler needs at least one pool")
+        notebooks = notebooks or {}
+        self.results = results
+        self._slots: Dict[str, _AccountSlot] = {
+            pool.account: _AccountSlot(pool, notebooks.get(pool.account)) for pool in pools
+        }
+        self._shared_browser: Optional[SharedBrowser] = None
+
+    @classmethod
+    def from_accounts(cls, accounts: List[Account], results: ResultStore, size: int = DEFAULT_POOL_SIZE,
+                      headless: bool = True, browser_mode: str = BROWSER_MODE,
+                      **lifecycle_options) -> "AccountScheduler":
+        """One pool (and notebook lifecycle) per account; light-mode contexts share one browser."""
+        shared_browser = SharedBrowser(headless) if browser_mode == "light" else None
+        pools, notebooks = [], {}
+        for account in accounts:
+            notebooks[account.name] = NotebookLifecycle(results, account=account.name, **lifecycle_options)
+            pools.append(ClientPool(
+                size=size, headless=headless, session=SessionCache(path=account.session_file),
+                notebooks=notebooks[account.name], browser_mode=browser_mode,
+                storage_state=account.storage_state, shared_browser=shared_browser,
+                user_data_dir=account.user_data_dir, account=account.name,
+            ))
+        scheduler = cls(pools, results, notebooks)
+        scheduler._shared_browser = shared_browser
+        return scheduler
+
+    @property
+    def accounts(self) -> List[str]:
+        return list(self._slots)
+
+    @property
+    def ready(self) -> bool:
+        return any(slot.pool.ready and slot.healthy for slot in self._slots.values())
+
+    @property
+    def size(self) -> int:
+        return sum(slot.pool.size for slot in self._slots.values())
+
+    async def start(self):
+        """Starts every account's pool; fails only if none of them could start."""
+        slots = list(self._slots.values())
+        outcomes = await asyncio.gather(*(slot.pool.start() for slot in slots), return_exceptions=True)
+        errors = []
+        for slot, outcome in zip(slots, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error("[Scheduler] Account %s failed to start: %s", slot.name, outcome)
+                slot.last_error = str(outcome)[:300]
+                if isinstance(outcome, AccountError):
+                    self.eject(slot.name, outcome)
+                errors.append(outcome)
+        if len(errors) == len(slots):
+            raise errors[0]
+
+    def start_maintenance(self):
+        """Starts each account's spare-notebook and reaper loop on its own pool."""
+        for slot in self._slots.values():
+            if slot.notebooks is not None:
+                slot.notebooks.start(slot.pool)
+
+    def eject(self, account: str, error: Exception):
+        """Takes an account out of rotation for the cooldown matching `error`."""
+        slot = self._slots.get(account)
+        if slot is None:
+            return
+        if isinstance(error, CircuitOpenError):
+            # Back as soon as its breaker lets a probe through
+            cooldown = error.retry_after
+        elif isinstance(error, ThrottledError):
+            cooldown = THROTTLE_COOLDOWN
+        else:
+            cooldown = QUOTA_COOLDOWN if isinstance(error, QuotaError) else AUTH_COOLDOWN
+        slot.ejected_until = time.time() + cooldown
+        slot.last_error = str(error)[:300]
+        logger.warning("[Scheduler] ⛔ Account %s out of rotation for %.0fs: %s", account, cooldown, error)
+
+    def _affinity(self, video_id: Optional[str]) -> Optional[str]:
+        """The account already holding this video's result or pending notebook."""
+        if not video_id:
+            return None
+        entry = self.results.get(video_id)
+        if entry and entry["status"] in (STATUS_DONE, STATUS_PENDING):
+            return entry["account"] or DEFAULT_ACCOUNT
+        return None
+
+    def pick(self, video_id: Optional[str] = None, account: Optional[str] = None) -> str:
+        """Chooses the account for one unit of work (see the class docstring)."""
+        if account is not None:
+            if account not in self._slots:
+                raise Exception(f"Unknown account {account!r}; configured: {', '.join(self._slots)}")
+            return account
+
+        preferred = self._affinity(video_id)
+        if preferred in self._slots and self._slots[preferred].healthy:
+            return preferred
+
+        candidates = [slot for slot in self._slots.values() if slot.healthy]
+        if not candidates:
+            # Everything is cooling down: use the account due back first rather than refuse outright
+            slot = min(self._slots.values(), key=lambda s: s.ejected_until)
+            logger.warning("[Scheduler] All accounts are out of rotation; trying %s anyway", slot.name)
+            return slot.name
+        return min(candidates, key=lambda s: (s.load, -_rendezvous(video_id, s.name))).name
+
+    def account_for_notebook(self, notebook_id: str) -> Optional[str]:
+        """The configured account a notebook belongs to (None if unknown here)."""
+        account = self.results.notebook_account(notebook_id)
+        return account if account in self._slots else None
+
+    @asynccontextmanager
+    async def lease(self, video_id: Optional[str] = None, account: Optional[str] = None,
+                    weight: int = 1) -> AsyncIterator[NotebookLMClient]:
+        """
+        Leases a client from the chosen account's pool for the duration of one
+        request (or of `weight` requests run concurrently on it, for load).
+        """
+        slot = self._slots[self.pick(video_id, account)]
+        slot.in_flight += weight
+        try:
+            async with slot.pool.lease() as client:
+                yield client
+            slot.completed += weight
+        except AccountError as e:
+            self._eject_for(e, slot.name)
+            raise
+        finally:
+            slot.in_flight -= weight
+
+    def _eject_for(self, error: AccountError, leased: str):
+        # Coalesced runs can surface another account's failure; eject the one it came from
+        self.eject(error.account if error.account in self._slots else leased, error)
+
+    async def run(self, fn: Callable[[NotebookLMClient], Awaitable[Any]], video_id: Optional[str] = None,
+                  account: Optional[str] = None) -> Any:
+        """
+        Runs `fn(client)` on a leased client. If the account fails as a whole
+        (auth or quota), retries once per remaining healthy account, unless the
+        work was pinned to `account`.
+        """
+        tried = set()
+        while True:
+            chosen = self.pick(video_id, account)
+            tried.add(chosen)
+            try:
+                async with self.lease(account=chosen) as client:
+                    return await fn(client)
+            except AccountError as e:
+                remaining = [s for s in self._slots.values() if s.healthy and s.name not in tried]
+                if account is not None or not remaining:
+                    raise
+                logger.warning("[Scheduler] Retrying %s on another account after: %s", video_id or 'request', e)
+
+    def _assign(self, video_urls: List[str]) -> Dict[str, List[str]]:
+        """Splits a batch over the accounts as pick() would, counting the batch's own load as it goes."""
+        planned = {name: 0 for name in self._slots}
+        assignment: Dict[str, List[str]] = {}
+        for video_url in video_urls:
+            video_id = extract_video_id(video_url)
+            name = self._affinity(video_id)
+            if name not in self._slots or not self._slots[name].healthy:
+                candidates = [s for s in self._slots.values() if s.healthy] or [
+                    min(self._slots.values(), key=lambda s: s.ejected_until)]
+                name = min(candidates, key=lambda s: ((s.in_flight + planned[s.name]) / s.pool.size,
+                                                      -_rendezvous(video_id, s.name))).name
+            planned[name] += 1
+            assignment.setdefault(name, []).append(video_url)
+        return assignment
+
+    async def generate_infographics(self, video_urls: List[str], max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                                    timeout: Optional[float] = None) -> AsyncIterator[Tuple[str, Union[str, Exception]]]:
+        """
+        Like NotebookLMClient.generate_infographics, with the batch split over
+        the accounts: each runs its share on one leased client, with its share
+        of `max_concurrency`. Videos lost to an account failing are retried on
+        another account.
+        """
+        video_urls = list(dict.fromkeys(video_urls))
+        done: asyncio.Queue = asyncio.Queue()
+        tasks: List[asyncio.Task] = []
+
+        async def retry(video_url: str, error: Exception):
+            done.put_nowait((video_url, await self._retry(video_url, timeout, error)))
+
+        async def run_share(account: str, share: List[str]):
+            concurrency = max(1, round(max_concurrency * len(share) / len(video_urls)))
+            try:
+                async with self.lease(account=account, weight=len(share)) as client:
+                    async for video_url, result in client.generate_infographics(share, concurrency, timeout):
+                        share.remove(video_url)
+                        if isinstance(result, AccountError):
+                            self._eject_for(result, account)
+                            tasks.append(asyncio.create_task(retry(video_url, result)))
+                        else:
+                            done.put_nowait((video_url, result))
+            except Exception as e:
+                # The lease itself failed (e.g. the account's browser won't start)
+                for video_url in share:
+                    if isinstance(e, AccountError):
+                        tasks.append(asyncio.create_task(retry(video_url, e)))
+                    else:
+                        done.put_nowait((video_url, e))
+
+        tasks.extend(asyncio.create_task(run_share(account, share))
+                     for account, share in self._assign(video_urls).items())
+        try:
+            for _ in video_urls:
+                yield await done.get()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _retry(self, video_url: str, timeout: Optional[float], error: Exception) -> Union[str, Exception]:
+        """Runs one video of a batch again, on whichever account is healthy (`error` if none is)."""
+        if not any(slot.healthy for slot in self._slots.values()):
+            return error
+        try:
+            return await self.run(lambda client: client.generate_infographic(video_url, timeout=timeout),
+                                  video_id=extract_video_id(video_url))
+        except Exception as e:
+            return e
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Per-account health for get_health."""
+        now = time.time()
+        status = {}
+        for slot in self._slots.values():
+            session = slot.pool.session
+            status[slot.name] = {
+                "healthy": slot.healthy,
+                "ready": slot.pool.ready,
+                "size": slot.pool.size,
+                "in_flight": slot.in_flight,
+                "completed": slot.completed,
+                "ejected_for_s": round(slot.ejected_until - now, 1) if not slot.healthy else None,
+                "last_error": slot.last_error,
+                "session": {"valid": session.is_valid,
+                            "age_s": round(session.age, 1) if session.fetched_at else None},
+                "circuit": slot.pool.breaker.status(),
+                "rate_limit": slot.pool.rate_limiter.status(),
+            }
+        return status
+
+    async def close(self):
+        for slot in self._slots.values():
+            if slot.notebooks is not None:
+                await slot.notebooks.close()
+        for slot in self._slots.values():
+            await slot.pool.close()
+        if self._shared_browser is not None:
+            await self._shared_browser.close()
@@ -1,49 +1,235 @@
 import logging
 import os
-from mcp.server.fastmcp import FastMCP
-from mcp.types import ImageContent, TextContent, EmbeddedResource
-from notebooklm_client import NotebookLMClient
+from mcp.server.fastmcp import FastMCP, Context
+from mcp.server.fastmcp.resources import FileResource
+from mcp.types import ImageContent, TextContent, ResourceLink, InitializedNotification
+from notebooklm_client import NotebookLMClient, STATE_DIR, default_result_store, collection_key
+from client_pool import DEFAULT_POOL_SIZE
+from accounts import configured_accounts
+from scheduler import AccountScheduler
+from resilience import retry_budget, BREAKER_CLOSED
+from result_store import NOTEBOOK_SPARE
+from youtube import extract_video_id
+from image_cache import ImageCache
+import metrics
+from tracing import span, traced
+from logging_setup import setup_logging
+from job_queue import JobStore, JobQueue, DEFAULT_JOB_WORKERS
+from artifacts import ArtifactStore, FULL, PREVIEW, EXTENSIONS, mime_type
+import image_pipeline
+from image_pipeline import RenderSpec, render_async
+from contextlib import asynccontextmanager
 import asyncio
-import requests
 import base64
-from PIL import Image
-import io
-
-# Setup logging to file
-log_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.log")
-logging.basicConfig(
-    filename=log_file,
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+import importlib
+import time
+from pathlib import Path
+
+# Log to server.log (rotated) from a background thread; lines carry the request's trace ID
+setup_logging()
 logger = logging.getLogger(__name__)
 
+# Process-wide browser/client pools (one per Google account), shared by all tool calls.
+# NOTE: The first run must be done manually (or via setup_auth.py [--profile NAME])
+# to establish each account's session with valid login cookies.
+POOL_SIZE = int(os.environ.get("NOTEBOOKLM_POOL_SIZE", DEFAULT_POOL_SIZE))
+# Each account also keeps spare notebooks ready and reaps finished ones in the background
+pool = AccountScheduler.from_accounts(configured_accounts(), default_result_store(), size=POOL_SIZE, headless=True)
+
+# Inline rendition: at most 1024px wide, JPEG quality lowered as needed to fit the byte budget
+INLINE_SPEC = RenderSpec()
+image_cache = ImageCache(os.path.join(STATE_DIR, "image_cache"))
+
+# How tools return the image: "inline" (base64 in the result), "file" (file:// links to the
+# full-resolution and preview renditions in ARTIFACT_DIR) or "resource" (infographic:// MCP
+# resources the client reads on demand). Overridable per call with the `output` argument.
+OUTPUT_MODES = ("inline", "file", "resource")
+OUTPUT_MODE = os.environ.get("NOTEBOOKLM_OUTPUT_MODE", "inline")
+ARTIFACT_DIR = os.environ.get("NOTEBOOKLM_ARTIFACT_DIR", os.path.join(STATE_DIR, "artifacts"))
+artifacts = ArtifactStore(ARTIFACT_DIR)
+
+# Durable background jobs (submit_infographic_job); unfinished ones resume after a restart
+JOB_WORKERS = int(os.environ.get("NOTEBOOKLM_JOB_WORKERS", DEFAULT_JOB_WORKERS))
+# Optional Prometheus text endpoint (http://127.0.0.1:<port>/metrics); unset = off
+METRICS_PORT = os.environ.get("NOTEBOOKLM_METRICS_PORT")
+
+jobs = JobQueue(JobStore(os.path.join(STATE_DIR, "jobs.db")), pool, workers=JOB_WORKERS)
+
+# Modules the first tool call needs but startup doesn't; imported by the warm-up instead
+WARM_UP_IMPORTS = ("playwright.async_api", "PIL.Image", "PIL.ImageFile")
+# The warm-up starts once the client has finished the MCP handshake, or after this many seconds
+HANDSHAKE_WAIT = float(os.environ.get("NOTEBOOKLM_HANDSHAKE_WAIT", 2))
+
+STARTED_AT = time.time()
+# Background warm-up progress, reported by get_health: pending -> importing -> launching -> ready | failed
+warm_up_state = {"state": "pending", "started_at": None, "finished_at": None, "error": None}
+handshake_done = asyncio.Event()
+
+async def _on_initialized(notification: InitializedNotification):
+    handshake_done.set()
+
+async def warm_up():
+    """Imports the heavy modules, launches the browser and acquires session tokens, off the handshake path."""
+    try:
+        # Anything started earlier would compete with the handshake for the GIL and the import lock
+        await asyncio.wait_for(handshake_done.wait(), timeout=HANDSHAKE_WAIT)
+    except asyncio.TimeoutError:
+        pass
+    warm_up_state.update(state="importing", started_at=time.time())
+    try:
+        with span("warm_up"):
+            # Renditions exported by earlier runs stay readable as resources
+            for key, rendition, path in await asyncio.to_thread(lambda: list(artifacts.entries())):
+                _register_resource(key, rendition, path)
+            # In a thread, so requests arriving meanwhile don't wait on module imports
+            await asyncio.to_thread(lambda: [importlib.import_module(name) for name in WARM_UP_IMPORTS])
+            warm_up_state["state"] = "launching"
+            await pool.start()
+        warm_up_state.update(state="ready", finished_at=time.time())
+        logger.info("Warm-up finished in %.2fs", warm_up_state['finished_at'] - warm_up_state['started_at'])
+    except Exception as e:
+        # Not fatal: the first tool call retries the launch and reports the error
+        warm_up_state.update(state="failed", finished_at=time.time(), error=str(e)[:300])
+        logger.error("Client pool warm-up failed: %s", e)
+    # Spare notebooks and reaping lease from the pools, so they start once they have been tried
+    pool.start_maintenance()
+
+@asynccontextmanager
+async def lifespan(server: FastMCP):
+    """Starts the job workers, and warms the client pool in the background once the MCP handshake is done."""
+    warm_task = asyncio.create_task(warm_up())
+    if METRICS_PORT:
+        metrics.serve_prometheus(int(METRICS_PORT))
+    await jobs.start()
+    try:
+        yield
+    finally:
+        warm_task.cancel()
+        await asyncio.gather(warm_task, return_exceptions=True)
+        await jobs.close()
+        await pool.close()
+        image_pipeline.shutdown()
+
 # Initialize FastMCP server
-mcp = FastMCP("NotebookLM")
+mcp = FastMCP("NotebookLM", lifespan=lifespan)
+# FastMCP has no public hook for the end of the handshake
+mcp._mcp_server.notification_handlers[InitializedNotification] = _on_initialized
+
+@traced("inline_image")
+async def _inline_image(image_url: str, client: NotebookLMClient = None, account: str = None) -> ImageContent:
+    """
+    Returns the inline rendition of an infographic, from the image cache when possible.
+    A browser client is only leased on a cache miss (unless the caller already holds one).
+    """
+    key = ImageCache.key(image_url, **INLINE_SPEC.params())
+    data = image_cache.get(key)
+    if data is not None:
+        logger.info("Image cache hit for %s...", image_url[:50])
+    else:
+        # Streamed into the decoder with the session cookies (browser download as fallback)
+        logger.info("Downloading image from %s...", image_url[:50])
+        if client is not None:
+            image = await client.download_image(image_url)
+        else:
+            async with pool.lease(account=account) as leased:
+                image = await leased.download_image(image_url)
+        logger.info("Image decoded: %s %s", image.mode, image.size)
+        rendition = await render_async(image, INLINE_SPEC)
+        data = rendition.data
+        image_cache.put(key, data)
+
+    with span("b64encode"):
+        base64_data = base64.b64encode(data).decode("utf-8")
+    logger.info("Base64 encoded length: %s", len(base64_data))
+    return ImageContent(type="image", data=base64_data, mimeType=INLINE_SPEC.mime_type)
+
+_registered_resources = set()
+
+def _register_resource(key: str, rendition: str, path: str) -> str:
+    uri = f"infographic://{key}/{rendition}"
+    if uri not in _registered_resources:
+        mcp.add_resource(FileResource(
+            uri=uri, name=f"infographic-{key}-{rendition}", path=Path(path),
+            mime_type=mime_type(path), is_binary=True,
+        ))
+        _registered_resources.add(uri)
+    return uri
+
+@traced("export_renditions")
+async def _export_renditions(image_url: str, client: NotebookLMClient = None, account: str = None) -> dict:
+    """
+    Writes the full-resolution and preview renditions of an infographic to
+    ARTIFACT_DIR (once per artifact URL) and returns {rendition: path}.
+    """
+    key = artifacts.key(image_url)
+    with artifacts.writing(key):
+        found = artifacts.renditions(key)
+        if len(found) < 2:
+            logger.info("Exporting renditions of %s...", image_url[:50])
+            staging = artifacts.staging_path(key)
+            try:
+                if client is not None:
+                    image = await client.download_image(image_url, save_to=staging)
+                else:
+                    async with pool.lease(account=account) as leased:
+                        image = await leased.download_image(image_url, save_to=staging)
+                found[FULL] = artifacts.adopt(key, FULL, EXTENSIONS.get(image.format, "png"), staging)
+            finally:
+                if os.path.exists(staging):
+                    os.remove(staging)
+            rendition = await render_async(image, INLINE_SPEC)
+            found[PREVIEW] = artifacts.write(key, PREVIEW, EXTENSIONS[INLINE_SPEC.format], rendition.data)
+            image_cache.put(ImageCache.key(image_url, **INLINE_SPEC.params()), rendition.data)
+            # Keeps ARTIFACT_DIR under its cap; links already handed out for evicted artifacts stop resolving
+            await asyncio.to_thread(artifacts.evict)
+        else:
+            artifacts.touch(key)
+
+    for rendition, path in found.items():
+        _register_resource(key, rendition, path)
+    return found
+
+async def _image_output(image_url: str, mode: str, client: NotebookLMClient = None, account: str = None) -> list:
+    """Content blocks carrying the infographic in the requested output mode (downloaded as `account`)."""
+    if mode not in OUTPUT_MODES:
+        raise ValueError(f"Unknown output mode {mode!r}; expected one of {', '.join(OUTPUT_MODES)}")
+    if mode == "inline":
+        return [await _inline_image(image_url, client, account)]
+
+    key = artifacts.key(image_url)
+    links = []
+    for rendition, path in (await _export_renditions(image_url, client, account)).items():
+        uri = Path(path).as_uri() if mode == "file" else _register_resource(key, rendition, path)
+        links.append(ResourceLink(
+            type="resource_link", uri=uri, name=os.path.basename(path),
+            description="Full-resolution infographic" if rendition == FULL else "Downscaled preview",
+            mimeType=mime_type(path), size=os.path.getsize(path),
+        ))
+    return links
 
 @mcp.tool()
-async def generate_infographic(video_url: str) -> list:
+@traced("tool.generate_infographic")
+async def generate_infographic(video_url: str, timeout_seconds: int = None, output: str = None) -> list:
     """
     Generates an infographic/summary for a YouTube video using Google NotebookLM.
     
     Args:
         video_url: The URL of the YouTube video to process.
+        timeout_seconds: (Optional) How long to wait for the infographic to be generated
+                         (default 300s).
+        output: (Optional) "inline" (base64 image), "file" (file:// links to the
+                full-resolution and preview images) or "resource" (MCP resource links).
         
     Returns:
         The URL of the generated infographic image.
     """
-    logger.info(f"Received request for video: {video_url}")
+    logger.info("Received request for video: %s", video_url)
+    
+    async def generate(client: NotebookLMClient) -> list:
+        data_uri = await client.generate_infographic(video_url, timeout=timeout_seconds)
     
-    # We use headless=True by default. 
-    # NOTE: The first run must be done manually (or via a separate setup script) 
-    # to establish the user_data session with valid login cookies.
-    client = NotebookLMClient(headless=True)
-    try:
-        await client.start()
-        data_uri = await client.generate_infographic(video_url)
-        
         content_list = []
-        
+    
         # 1. Add the URL as text (so it's clickable/copyable)
         content_list.append(TextContent(
             type="text", 
@@ -52,48 +238,10 @@ async def generate_infographic(video_url: str) -> list:
 
         if isinstance(data_uri, str) and data_uri.startswith("http"):
             try:
-                # Download using the browser (Playwright) to assume authenticated state
-                logger.info(f"Downloading image using Browser Context from {data_uri[:50]}...")
-                image_bytes = await client.download_resource(data_uri)
-                
-                logger.info(f"Image bytes received: {len(image_bytes)}")
-                
-                logger.info("Importing PIL...")
-                from PIL import Image
-                import io
-                
-                logger.info("Opening image with PIL...")
-                image = Image.open(io.BytesIO(image_bytes))
-                logger.info(f"Image Opened. Mode: {image.mode}, Size: {image.size}, Format: {image.format}")
-                
-                # Resize image if it's too large (MCP payload limits)
-                max_width = 1024
-                if image.width > max_width:
-                    ratio = max_width / image.width
-                    new_height = int(image.height * ratio)
-                    logger.info(f"Resizing image from {image.size} to ({max_width}, {new_height})...")
-                    image = image.resize((max_width, new_height), Image.Resampling.LANCZOS)
-
-                logger.info("Saving to JPEG buffer (compressed)...")
-                # Convert to RGB for JPEG (JPEG doesn't support Alpha)
-                if image.mode != 'RGB':
-                    image = image.convert('RGB')
-                    
-                buffered = io.BytesIO()
-                image.save(buffered, format="JPEG", quality=85)
-                
-                logger.info("Encoding to Base64...")
-                base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
-                logger.info(f"Base64 encoded length: {len(base64_data)}")
-                
-                content_list.append(ImageContent(
-                    type="image", 
-                    data=base64_data, 
-                    mimeType="image/jpeg"
-                ))
+                content_list.extend(await _image_output(data_uri, output or OUTPUT_MODE, client))
                 logger.info("Image Content appended successfully.")
             except Exception as e:
-                logger.error(f"Failed to download/convert image: {e}")
+                logger.error("Failed to download/convert image: %s", e)
                 content_list.append(TextContent(type="text", text=f"\n\n*Failed to render image inline: {e}*"))
 
         # 3. Handle Data URI
@@ -107,49 +255,170 @@ async def generate_infographic(video_url: str) -> list:
                     mimeType=mime_type
                 ))
             except Exception as parse_error:
-                logger.error(f"Failed to parse data URI: {parse_error}")
+                logger.error("Failed to parse data URI: %s", parse_error)
 
         return content_list
-        
+
+    try:
+        # Runs on the account that already holds this video (or the least busy one)
+        return await pool.run(generate, video_id=extract_video_id(video_url))
     except Exception as e:
-        logger.error(f"Error during generation: {e}")
+        logger.error("Error during generation: %s", e)
+        return f"Error: {str(e)}"
+
+@mcp.tool()
+@traced("tool.generate_infographics")
+async def generate_infographics(video_urls: list[str], max_concurrency: int = 10,
+                                timeout_seconds: int = None, ctx: Context = None) -> list:
+    """
+    Generates infographics for many YouTube videos concurrently (e.g. a playlist).
+    
+    Progress is streamed as each video completes; the result lists every video's
+    infographic URL (or error). Use fetch_infographic to view an individual image.
+    
+    Args:
+        video_urls: The URLs of the YouTube videos to process.
+        max_concurrency: (Optional) How many videos to process at once (default 10).
+        timeout_seconds: (Optional) How long to wait for each infographic (default 300s).
+    """
+    logger.info("Received batch request for %s videos (concurrency %s)", len(video_urls), max_concurrency)
+    # Duplicate URLs are generated (and reported) once
+    total = len(dict.fromkeys(video_urls))
+    results = {}
+    try:
+        # Split over the configured accounts, each running its share on one leased client
+        async for video_url, result in pool.generate_infographics(
+            video_urls, max_concurrency=max_concurrency, timeout=timeout_seconds
+        ):
+            results[video_url] = result
+            if ctx is not None:
+                status = f"Error: {result}" if isinstance(result, Exception) else result
+                await ctx.info(f"{video_url}: {status}")
+                await ctx.report_progress(len(results), total, f"Finished {video_url}")
+    except Exception as e:
+        logger.error("Error during batch generation: %s", e)
+        results.setdefault("(batch)", e)
+
+    lines = []
+    for video_url, result in results.items():
+        if isinstance(result, Exception):
+            lines.append(f"- {video_url}: ❌ Error: {result}")
+        else:
+            lines.append(f"- {video_url}: {result}")
+    ok = sum(1 for r in results.values() if not isinstance(r, Exception))
+    return [TextContent(
+        type="text",
+        text=f"Generated {ok}/{total} infographics.\n\n" + "\n".join(lines)
+    )]
+
+@mcp.tool()
+@traced("tool.generate_collection_infographic")
+async def generate_collection_infographic(video_urls: list[str], per_video: bool = False,
+                                          timeout_seconds: int = None, output: str = None) -> list:
+    """
+    Generates one infographic summarizing many YouTube videos together (e.g. a playlist
+    or a channel's recent uploads), from a single NotebookLM notebook holding all of them.
+    
+    Args:
+        video_urls: The URLs of the YouTube videos to combine (at most 50).
+        per_video: (Optional) Also generate an infographic for each video, in the same
+                   notebook and at the same time as the combined one.
+        timeout_seconds: (Optional) How long to wait for the infographics (default 300s).
+        output: (Optional) "inline" (base64 image), "file" (file:// links to the
+                full-resolution and preview images) or "resource" (MCP resource links).
+    """
+    logger.info("Received collection request for %s videos (per video: %s)", len(video_urls), per_video)
+
+    async def generate(client: NotebookLMClient) -> list:
+        result = await client.generate_collection(video_urls, per_video=per_video, timeout=timeout_seconds)
+        lines = [f"Combined infographic for {len(video_urls)} videos generated successfully!\n\n"
+                 f"**URL**: {result['image_url']}\n**Notebook**: {result['notebook_id']}"]
+        if result["videos"]:
+            lines.append("\nPer-video infographics:")
+            for video_url, image_url in result["videos"].items():
+                status = f"❌ Error: {image_url}" if isinstance(image_url, Exception) else image_url
+                lines.append(f"- {video_url}: {status}")
+        content_list = [TextContent(type="text", text="\n".join(lines))]
+        if result["image_url"].startswith("http"):
+            try:
+                content_list.extend(await _image_output(result["image_url"], output or OUTPUT_MODE, client))
+            except Exception as e:
+                logger.error("Failed to download/convert image: %s", e)
+                content_list.append(TextContent(type="text", text=f"\n\n*Failed to render image inline: {e}*"))
+        return content_list
+
+    try:
+        # The whole collection runs on one account (its notebook can't be shared)
+        video_ids = list(dict.fromkeys(extract_video_id(url) or url for url in video_urls))
+        return await pool.run(generate, video_id=collection_key(video_ids))
+    except Exception as e:
+        logger.error("Error during collection generation: %s", e)
         return f"Error: {str(e)}"
-    finally:
-        await client.stop()
 
 import json
-import time
 
 @mcp.tool()
-async def fetch_infographic(notebook_id: str = None) -> list:
+@traced("tool.fetch_infographic")
+async def fetch_infographic(notebook_id: str = None, timeout_seconds: int = None, output: str = None,
+                            job_id: str = None) -> list:
     """
-    Fetches an existing infographic from a NotebookLM notebook.
+    Fetches an existing infographic from a NotebookLM notebook or a submitted job.
     
     Args:
-        notebook_id: (Optional) The UUID of the notebook. If not provided, 
-                     it attempts to fetch the most recently created notebook.
+        notebook_id: (Optional) The UUID of the notebook. If neither it nor job_id is
+                     provided, it attempts to fetch the most recently created notebook.
+        job_id: (Optional) A job ID returned by submit_infographic_job.
+        timeout_seconds: (Optional) How long to keep polling if it is still generating
+                         (default 300s).
+        output: (Optional) "inline" (base64 image), "file" (file:// links to the
+                full-resolution and preview images) or "resource" (MCP resource links).
     """
+    data_uri = None
+    if job_id:
+        job = jobs.store.get(job_id)
+        if job is None:
+            return [TextContent(type="text", text=f"Error: Unknown job ID {job_id}.")]
+        data_uri = job["image_url"]
+        notebook_id = notebook_id or job["notebook_id"]
+        if not data_uri and not notebook_id:
+            return [TextContent(type="text", text=f"Job {job_id} has no notebook yet (state: {job['state']}, stage: {job['stage']}). Try again later.")]
+
     # Auto-resolve notebook_id if not provided
-    if not notebook_id:
+    if not notebook_id and not data_uri:
+        latest = jobs.store.latest_with_notebook()
         try:
-            state_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "last_run.json")
+            state_file = os.path.join(STATE_DIR, "last_run.json")
             if os.path.exists(state_file):
                 with open(state_file, "r") as f:
                     data = json.load(f)
-                    notebook_id = data.get("last_notebook_id")
-                    logger.info(f"Auto-resolved last notebook ID: {notebook_id}")
+                    if not latest or data.get("timestamp", 0) > latest["updated_at"]:
+                        notebook_id = data.get("last_notebook_id")
         except Exception as e:
-            logger.warning(f"Failed to load last run state: {e}")
+            logger.warning("Failed to load last run state: %s", e)
+        if not notebook_id and latest:
+            notebook_id = latest["notebook_id"]
+        if notebook_id:
+            logger.info("Auto-resolved last notebook ID: %s", notebook_id)
 
-    if not notebook_id:
+    if not notebook_id and not data_uri:
         return [TextContent(type="text", text="Error: No notebook ID provided and no recent run found. Please provide a specific notebook ID.")]
 
-    logger.info(f"Received request to fetch notebook: {notebook_id}")
-    client = NotebookLMClient(headless=True)
+    logger.info("Received request to fetch notebook: %s", notebook_id or job_id)
     try:
-        await client.start()
-        data_uri = await client.poll_for_artifacts(notebook_id)
-        
+        # A finished job or result needs neither a browser lease nor an RPC
+        if data_uri:
+            logger.info("Job %s already has its infographic", job_id)
+        else:
+            cached = default_result_store().get_by_notebook(notebook_id)
+            if cached and cached["image_url"]:
+                logger.info("Result store hit for notebook %s", notebook_id)
+                data_uri = cached["image_url"]
+            else:
+                # Only the account that created the notebook can poll it
+                account = pool.account_for_notebook(notebook_id)
+                async with pool.lease(account=account) as client:
+                    data_uri = await client.poll_for_artifacts(notebook_id, timeout=timeout_seconds)
+
         content_list = []
         content_list.append(TextContent(
             type="text", 
@@ -158,53 +427,111 @@ async def fetch_infographic(notebook_id: str = None) -> list:
 
         if isinstance(data_uri, str) and data_uri.startswith("http"):
             try:
-                # Download using the browser (Playwright) to assume authenticated state
-                logger.info(f"Downloading image using Browser Context from {data_uri[:50]}...")
-                image_bytes = await client.download_resource(data_uri)
-
-                logger.info(f"Image bytes received: {len(image_bytes)}")
-                
-                logger.info("Opening image with PIL...")
-                image = Image.open(io.BytesIO(image_bytes))
-                logger.info(f"Image Opened. Mode: {image.mode}, Size: {image.size}, Format: {image.format}")
-                
-                # Resize image if it's too large (MCP payload limits)
-                max_width = 1024
-                if image.width > max_width:
-                    ratio = max_width / image.width
-                    new_height = int(image.height * ratio)
-                    logger.info(f"Resizing image from {image.size} to ({max_width}, {new_height})...")
-                    image = image.resize((max_width, new_height), Image.Resampling.LANCZOS)
-
-                logger.info("Saving to JPEG buffer (compressed)...")
-                # Convert to RGB for JPEG (JPEG doesn't support Alpha)
-                if image.mode != 'RGB':
-                    image = image.convert('RGB')
-                    
-                buffered = io.BytesIO()
-                image.save(buffered, format="JPEG", quality=85)
-                
-                logger.info("Encoding to Base64...")
-                base64_data = base64.b64encode(buffered.getvalue()).decode("utf-8")
-                logger.info(f"Base64 encoded length: {len(base64_data)}")
-                
-                content_list.append(ImageContent(
-                    type="image", 
-                    data=base64_data, 
-                    mimeType="image/jpeg"
-                ))
+                account = pool.account_for_notebook(notebook_id) if notebook_id else None
+                content_list.extend(await _image_output(data_uri, output or OUTPUT_MODE, account=account))
                 logger.info("Image Content appended successfully.")
             except Exception as e:
-                logger.error(f"Failed to download/convert image: {e}")
+                logger.error("Failed to download/convert image: %s", e)
                 content_list.append(TextContent(type="text", text=f"\n\n*Failed to render image inline: {e}*"))
-        
+
         return content_list
-        
+
     except Exception as e:
-        logger.error(f"Error fetching artifact: {e}")
+        logger.error("Error fetching artifact: %s", e)
         return [TextContent(type="text", text=f"Error: {str(e)}")]
-    finally:
-        await client.stop()
+
+def _job_summary(job: dict) -> dict:
+    keys = ("job_id", "video_url", "state", "stage", "notebook_id", "source_id", "image_url",
+            "error", "attempts", "created_at", "updated_at", "stage_times")
+    return {k: job.get(k) for k in keys}
+
+@mcp.tool()
+@traced("tool.submit_infographic_job")
+async def submit_infographic_job(video_url: str, timeout_seconds: int = None) -> list:
+    """
+    Queues infographic generation for a YouTube video and returns a job ID immediately.
+    
+    The job runs in the background (and survives server restarts). Check it with
+    get_job, and fetch the image with fetch_infographic(job_id=...) once it is done.
+    
+    Args:
+        video_url: The URL of the YouTube video to process.
+        timeout_seconds: (Optional) How long the job waits for the infographic (default 300s).
+    """
+    job = jobs.submit(video_url, timeout=timeout_seconds)
+    return [TextContent(type="text", text=f"Job submitted: {job['job_id']}\n\n{json.dumps(_job_summary(job), indent=2)}")]
+
+@mcp.tool()
+async def get_job(job_id: str) -> list:
+    """
+    Returns the state of an infographic job: queued, running (with its current stage),
+    done (with the infographic URL) or failed (with the error).
+    
+    Args:
+        job_id: The job ID returned by submit_infographic_job.
+    """
+    job = jobs.store.get(job_id)
+    if job is None:
+        return [TextContent(type="text", text=f"Error: Unknown job ID {job_id}.")]
+    return [TextContent(type="text", text=json.dumps(_job_summary(job), indent=2))]
+
+@mcp.tool()
+async def list_jobs(state: str = None, limit: int = 20) -> list:
+    """
+    Lists recent infographic jobs, newest first.
+    
+    Args:
+        state: (Optional) Only jobs in this state: queued, running, done or failed.
+        limit: (Optional) Maximum number of jobs to list (default 20).
+    """
+    recent = jobs.store.recent(state=state, limit=limit)
+    if not recent:
+        return [TextContent(type="text", text="No jobs found.")]
+    lines = []
+    for job in recent:
+        detail = job["image_url"] or job["error"] or job["stage"]
+        lines.append(f"- {job['job_id']} [{job['state']}] {job['video_url']}: {detail}")
+    return [TextContent(type="text", text="\n".join(lines))]
+
+@mcp.tool()
+async def get_metrics(format: str = "json") -> list:
+    """
+    Returns the server's performance metrics: latency histograms per pipeline stage
+    (browser launch, token refresh, each RPC, transcript wait, polling, download,
+    resize, encode, ...) with p50/p90/p99, and call/error counters.
+    
+    Args:
+        format: (Optional) "json" (default) or "prometheus" (text exposition format).
+    """
+    if format == "prometheus":
+        return [TextContent(type="text", text=metrics.prometheus_text())]
+    return [TextContent(type="text", text=json.dumps(metrics.snapshot(), indent=2))]
+
+@mcp.tool()
+async def get_health() -> list:
+    """
+    Reports whether the server is ready to generate: progress of the background
+    warm-up (browser launch and session tokens), each account's pool, session,
+    rotation, circuit breaker and adaptive rate-limit state, the retry budget,
+    queued jobs and spare notebooks.
+    """
+    warm = dict(warm_up_state)
+    if warm["started_at"]:
+        warm["duration_s"] = round((warm["finished_at"] or time.time()) - warm["started_at"], 3)
+    accounts = pool.status()
+    tripped = any(a["circuit"]["state"] != BREAKER_CLOSED for a in accounts.values())
+    health = {
+        "status": ("degraded" if tripped else "ready") if pool.ready else (
+            "degraded" if warm["state"] == "failed" else "starting"),
+        "uptime_s": round(time.time() - STARTED_AT, 1),
+        "warm_up": warm,
+        "pool": {"ready": pool.ready, "size": pool.size},
+        "accounts": accounts,
+        "retry_budget": retry_budget.status(),
+        "jobs": jobs.store.counts(),
+        "spare_notebooks": default_result_store().count_notebooks(NOTEBOOK_SPARE),
+    }
+    return [TextContent(type="text", text=json.dumps(health, indent=2))]
 
 if __name__ == "__main__":
     mcp.run()
@@ -0,0 +1,104 @@
+import asyncio
+import json
+import os
+import time
+import logging
+from typing import Optional, Dict, Any, List, Callable, Awaitable, Tuple
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+SESSION_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "session_cache.json")
+DEFAULT_TTL = 6 * 60 * 60   # seconds before cached tokens are considered stale
+
+Tokens = Dict[str, Any]
+Cookies = List[Dict[str, Any]]
+
+
+class SessionCache:
+    """
+    Session tokens (`at`, `bl`, `fsid`) and cookies, persisted to disk with a TTL.
+
+    Clients use cached tokens straight away and only re-scrape when an RPC comes
+    back with an auth failure. One instance is meant to be shared by every client
+    of an account, so concurrent requests that hit an expired token wait on a
+    single refresh instead of each navigating the page.
+    """
+
+    def __init__(self, path: Optional[str] = SESSION_CACHE_FILE, ttl: float = DEFAULT_TTL):
+        self.path = path
+        self.ttl = ttl
+        self.tokens: Tokens = {"at": None, "bl": None, "fsid": None}
+        self.cookies: Cookies = []
+        self.fetched_at = 0.0
+        # Bumped on every refresh, so callers can tell whether someone else already refreshed
+        self.generation = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def is_valid(self) -> bool:
+        return bool(self.tokens.get("at") and self.tokens.get("bl")) and self.age < self.ttl
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    def load(self) -> bool:
+        """Loads tokens from disk. Returns True if fresh tokens are now available."""
+        if self.is_valid:
+            return True
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning("[Session] Failed to load session cache: %s", e)
+            return False
+
+        fetched_at = data.get("fetched_at", 0)
+        if time.time() - fetched_at >= self.ttl:
+            logger.info("[Session] Cached tokens expired.")
+            return False
+
+        self.tokens = data.get("tokens") or self.tokens
+        self.cookies = data.get("cookies") or []
+        self.fetched_at = fetched_at
+        self.generation += 1
+        if self.is_valid:
+            logger.info("[Session] ⚡ Using cached tokens (%ss old). bl: %s", int(self.age), self.tokens['bl'])
+        return self.is_valid
+
+    def store(self, tokens: Tokens, cookies: Cookies):
+        self.tokens = dict(tokens)
+        self.cookies = list(cookies)
+        self.fetched_at = time.time()
+        self.generation += 1
+        if not self.path:
+            return
+        try:
+            # Write atomically and owner-only: the file holds live session cookies
+            tmp_path = f"{self.path}.tmp"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump({"tokens": self.tokens, "cookies": self.cookies, "fetched_at": self.fetched_at}, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning("[Session] Failed to save session cache: %s", e)
+
+    def invalidate(self):
+        self.fetched_at = 0.0
+
+    async def refresh(self, scrape: Callable[[], Awaitable[Tuple[Tokens, Cookies]]],
+                      seen_generation: Optional[int] = None):
+        """
+        Re-scrapes tokens, coalescing concurrent callers into a single scrape.
+
+        `seen_generation` is the generation the caller's failed request used; if
+        the tokens were refreshed since then, this returns without scraping.
+        """
+        async with self._lock:
+            if seen_generation is not None and self.generation != seen_generation and self.is_valid:
+                return
+            tokens, cookies = await scrape()
+            self.store(tokens, cookies)
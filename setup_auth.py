@@ -1,16 +1,36 @@
+import argparse
 import asyncio
-from notebooklm_client import NotebookLMClient
+import os
+from accounts import Account
+from notebooklm_client import NotebookLMClient, export_storage_state
+from result_store import DEFAULT_ACCOUNT
+from session_cache import SessionCache
 
 async def main():
-    print("Starting browser for authentication...")
+    parser = argparse.ArgumentParser(description="Log a Google account in to NotebookLM for the MCP server.")
+    parser.add_argument("--profile", default=DEFAULT_ACCOUNT,
+                        help="account profile to set up; every profile becomes one more account the server "
+                             f"spreads work over (default: {DEFAULT_ACCOUNT})")
+    args = parser.parse_args()
+    account = Account(args.profile)
+    os.makedirs(os.path.dirname(account.session_file), exist_ok=True)
+
+    print(f"Starting browser for authentication (profile: {account.name})...")
     print("Please log in to your Google account in the browser window that opens.")
     print("Once you are logged in and see the NotebookLM dashboard, close the browser.")
     
-    # headless=False to allow user interaction
-    client = NotebookLMClient(headless=False)
+    # headless=False to allow user interaction.
+    # ttl=0 ignores any cached tokens so we always go through the login check,
+    # then the fresh tokens are written to the session cache for the server.
+    client = NotebookLMClient(headless=False, session=SessionCache(path=account.session_file, ttl=0),
+                              browser_mode="persistent", user_data_dir=account.user_data_dir,
+                              storage_state=account.storage_state, account=account.name)
     try:
         await client.start()
         print("✅ Authentication successful! Tokens acquired.")
+        # Lets the server run light-mode contexts (NOTEBOOKLM_BROWSER_MODE=light) without the profile
+        await export_storage_state(client.context, account.storage_state)
+        print(f"Saved login state to {account.storage_state}")
         print("You can now close the browser (if it's not already closed) and run the MCP server.")
         
         # Keep it open for a bit to let them see
@@ -0,0 +1,90 @@
+import asyncio
+import os
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+LOCK_POLL_INTERVAL = 0.25
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key onto one in-flight task.
+
+    The first caller for a key starts the work; callers arriving while it runs
+    await the same result (or exception). The key is released once the task
+    finishes, so later calls start fresh work. A cancelled caller doesn't
+    cancel the shared task.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    def in_flight(self, key: str) -> bool:
+        return key in self._inflight
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            logger.info("[SingleFlight] Joining in-flight work for %s", key)
+        return await asyncio.shield(task)
+
+
+class FileLock:
+    """
+    Cross-process exclusive lock on a file (flock), for server instances sharing
+    a state directory. Acquisition polls so it never blocks the event loop.
+    """
+
+    def __init__(self, path: str, poll_interval: float = LOCK_POLL_INTERVAL):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._fd: Optional[int] = None
+
+    async def acquire(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is None:
+            self._fd = fd
+            return
+        waited = False
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self._fd = fd
+                return
+            except BlockingIOError:
+                if not waited:
+                    logger.info("[SingleFlight] Waiting for lock held by another process: %s",
+                                os.path.basename(self.path))
+                    waited = True
+                await asyncio.sleep(self.poll_interval)
+            except BaseException:
+                os.close(fd)
+                raise
+
+    def release(self):
+        if self._fd is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        os.close(self._fd)
+        self._fd = None
+
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release()
@@ -0,0 +1,149 @@
+import atexit
+import contextvars
+import functools
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+import logging
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from metrics import counter, record_stage
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+# JSON-lines span log ("" disables it). Not requests.jsonl: that name is taken by the work backlog.
+TRACE_FILE = os.environ.get(
+    "NOTEBOOKLM_TRACE_FILE",
+    os.path.join(os.environ.get("NOTEBOOKLM_STATE_DIR", os.path.dirname(os.path.abspath(__file__))), "traces.jsonl"),
+)
+TRACE_MAX_BYTES = int(os.environ.get("NOTEBOOKLM_TRACE_MAX_MB", 50)) * 1024 * 1024   # then rotated to .1
+
+
+class Span:
+    """One timed operation; spans opened inside it (same task or child tasks) become its children."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "attrs", "started_at", "error")
+
+    def __init__(self, name: str, parent: Optional["Span"], attrs: Dict[str, Any]):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex[:16]
+        self.span_id = uuid.uuid4().hex[:8]
+        self.parent_id = parent.span_id if parent else None
+        self.attrs = attrs
+        self.started_at = time.time()
+        self.error: Optional[str] = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+_current: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("notebooklm_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+class _TraceWriter:
+    """Appends span records from a background thread so tracing never blocks the event loop."""
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._queue: "queue.SimpleQueue[Optional[str]]" = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def write(self, record: Dict[str, Any]):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.close)
+        self._queue.put(json.dumps(record, default=str))
+
+    def _run(self):
+        while True:
+            line = self._queue.get()
+            if line is None:
+                return
+            lines = [line]
+            # Drain whatever else is queued into the same write
+            try:
+                while True:
+                    more = self._queue.get_nowait()
+                    if more is None:
+                        self._append(lines)
+                        return
+                    lines.append(more)
+            except queue.Empty:
+                pass
+            self._append(lines)
+
+    def _append(self, lines):
+        try:
+            if os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes:
+                os.replace(self.path, f"{self.path}.1")
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        except OSError as e:
+            logger.warning("[Tracing] Failed to write traces: %s", e)
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=2)
+            self._thread = None
+
+
+_writer = _TraceWriter(TRACE_FILE, TRACE_MAX_BYTES) if TRACE_FILE else None
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """
+    Times a block as a span: records its latency in the "stage.<name>"
+    histogram, counts calls and errors, and appends it to TRACE_FILE.
+    """
+    s = Span(name, _current.get(), attrs)
+    token = _current.set(s)
+    t0 = time.perf_counter()
+    try:
+        yield s
+    except BaseException as e:
+        s.error = f"{type(e).__name__}: {e}"[:300]
+        raise
+    finally:
+        duration = time.perf_counter() - t0
+        _current.reset(token)
+        record_stage(name, duration)
+        counter(f"spans.{name}").inc()
+        if s.error:
+            counter(f"span_errors.{name}").inc()
+        if _writer is not None:
+            record = {
+                "ts": round(s.started_at, 6), "trace_id": s.trace_id, "span_id": s.span_id,
+                "parent_id": s.parent_id, "name": name, "duration_ms": round(duration * 1000, 3),
+            }
+            if s.attrs:
+                record["attrs"] = s.attrs
+            if s.error:
+                record["error"] = s.error
+            _writer.write(record)
+
+
+def traced(name: str):
+    """Decorator: runs an async function inside span(name)."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with span(name):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorate
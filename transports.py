@@ -0,0 +1,218 @@
+import asyncio
+import logging
+import random
+from typing import Optional, Dict, Tuple, Callable
+
+from session_cache import SessionCache
+
+logger = logging.getLogger(__name__)
+
+# --- CONFIGURATION ---
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+HTTP_TIMEOUT = 60
+HTTP_MAX_CONNECTIONS = 20
+HTTP_KEEPALIVE_EXPIRY = 120
+# Streaming downloads: read size, and how often a dropped transfer is resumed with a Range request
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_RETRIES = 3
+
+FORM_CONTENT_TYPE = "application/x-www-form-urlencoded;charset=UTF-8"
+
+
+class TransportError(Exception):
+    """The request never got an HTTP answer (connection/protocol failure)."""
+
+
+# Receives the body of a successful (200) response piece by piece as it arrives
+ChunkCallback = Callable[[str], None]
+
+
+class RpcTransport:
+    """
+    Sends a batchexecute POST and returns (status, body text).
+
+    With `on_chunk`, a 200 body is handed to the callback as it arrives
+    instead (the returned text is then empty).
+    """
+
+    name = "base"
+
+    async def post(self, url: str, form: Dict[str, str],
+                   on_chunk: Optional[ChunkCallback] = None) -> Tuple[int, str]:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class BrowserTransport(RpcTransport):
+    """
+    Runs `fetch` inside the NotebookLM page via page.evaluate.
+
+    The browser handles cookies and CORS for us, but every request and the
+    whole response body cross the CDP pipe.
+    """
+
+    name = "browser"
+
+    JS_FETCH = """
+    async ([url, form]) => {
+        const response = await fetch(url, {
+            method: "POST",
+            headers: {
+                "Content-Type": "application/x-www-form-urlencoded;charset=UTF-8",
+                "X-Same-Domain": "1"
+            },
+            body: new URLSearchParams(form),
+        });
+
+        return [response.status, await response.text()];
+    }
+    """
+
+    def __init__(self, page):
+        self.page = page
+
+    async def post(self, url: str, form: Dict[str, str],
+                   on_chunk: Optional[ChunkCallback] = None) -> Tuple[int, str]:
+        try:
+            status, text = await self.page.evaluate(self.JS_FETCH, [url, form])
+        except Exception as e:
+            raise TransportError(f"Browser fetch failed: {e}") from e
+        if on_chunk is not None and status == 200:
+            # The page hands the body over in one piece
+            on_chunk(text)
+            return status, ""
+        return status, text
+
+
+class HttpTransport(RpcTransport):
+    """
+    Sends batchexecute requests straight from Python over a pooled keep-alive
+    HTTP/2 connection, using the cookies the browser captured.
+
+    One instance is meant to be shared process-wide so connections are reused
+    across requests. The cookie jar is rebuilt whenever the session refreshes.
+    """
+
+    name = "http"
+
+    def __init__(self, session: SessionCache, base_url: str, http2: bool = True,
+                 max_connections: int = HTTP_MAX_CONNECTIONS, timeout: float = HTTP_TIMEOUT):
+        self.session = session
+        self.base_url = base_url
+        self.http2 = http2
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._client = None
+        self._cookie_generation = None
+
+    @staticmethod
+    def available() -> bool:
+        try:
+            import httpx  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def _build_client(self):
+        import httpx
+
+        http2 = self.http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("[Transport] 'h2' not installed; falling back to HTTP/1.1 keep-alive.")
+                http2 = False
+
+        limits = httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_connections,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        )
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=limits,
+            timeout=self.timeout,
+            headers={
+                "User-Agent": self.session.tokens.get("ua") or DEFAULT_USER_AGENT,
+                "Origin": self.base_url,
+                "Referer": f"{self.base_url}/",
+                "X-Same-Domain": "1",
+            },
+        )
+
+    def _sync_cookies(self):
+        if self._cookie_generation == self.session.generation:
+            return
+        self._client.cookies.clear()
+        for cookie in self.session.cookies:
+            self._client.cookies.set(
+                cookie["name"], cookie["value"],
+                domain=cookie.get("domain", ""), path=cookie.get("path", "/")
+            )
+        self._cookie_generation = self.session.generation
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = self._build_client()
+        self._sync_cookies()
+        return self._client
+
+    async def post(self, url: str, form: Dict[str, str],
+                   on_chunk: Optional[ChunkCallback] = None) -> Tuple[int, str]:
+        import httpx
+
+        try:
+            async with self.client.stream("POST", url, data=form,
+                                          headers={"Content-Type": FORM_CONTENT_TYPE}) as response:
+                if on_chunk is None or response.status_code != 200:
+                    await response.aread()
+                    return response.status_code, response.text
+                async for chunk in response.aiter_text():
+                    on_chunk(chunk)
+                return response.status_code, ""
+        except httpx.HTTPError as e:
+            raise TransportError(f"HTTP transport failed: {e!r}") from e
+
+    async def download(self, url: str, sink, retries: int = DOWNLOAD_RETRIES) -> int:
+        """
+        Streams a GET into `sink` (`await sink.write(chunk)`, `sink.reset()`,
+        `sink.bytes_received`) and returns the final HTTP status.
+
+        A transfer that breaks off is resumed from `sink.bytes_received` with a
+        Range request; if the server answers the range with a full 200, the
+        sink is reset and the body starts over. Non-2xx answers are returned
+        as-is without retrying.
+        """
+        import httpx
+
+        attempt = 0
+        while True:
+            offset = sink.bytes_received
+            headers = {"Range": f"bytes={offset}-"} if offset else {}
+            try:
+                async with self.client.stream("GET", url, headers=headers, follow_redirects=True) as response:
+                    if response.status_code == 200 and offset:
+                        logger.info("[Transport] Server ignored the Range request; restarting download")
+                        sink.reset()
+                    elif response.status_code not in (200, 206):
+                        return response.status_code
+                    async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        await sink.write(chunk)
+                    return response.status_code
+            except httpx.HTTPError as e:
+                attempt += 1
+                if attempt > retries:
+                    raise TransportError(f"Download failed after {retries} retries: {e!r}") from e
+                delay = 0.5 * 2 ** (attempt - 1) * random.uniform(0.8, 1.2)
+                logger.warning("[Transport] Download interrupted at %s bytes (%r); resuming in %.1fs",
+                               sink.bytes_received, e, delay)
+                await asyncio.sleep(delay)
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
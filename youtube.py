@@ -0,0 +1,43 @@
+import re
+from typing import Optional
+from urllib.parse import urlparse, parse_qs
+
+# YouTube video IDs are 11 chars of [A-Za-z0-9_-]
+VIDEO_ID_RE = re.compile(r'^[A-Za-z0-9_-]{11}$')
+YOUTUBE_HOSTS = ("youtube.com", "youtube-nocookie.com")
+# Path prefixes that are followed by the video ID (youtube.com/shorts/<id>, ...)
+ID_PATH_PREFIXES = ("shorts", "embed", "live", "v", "e")
+
+
+def extract_video_id(url: str) -> Optional[str]:
+    """
+    Returns the 11-char video ID for any common YouTube URL form
+    (watch?v=, youtu.be/, shorts/, embed/, live/, m./music. hosts) or a bare ID.
+    """
+    url = (url or "").strip()
+    if VIDEO_ID_RE.match(url):
+        return url
+    if "://" not in url:
+        url = f"https://{url}"
+
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    parts = [p for p in parsed.path.split("/") if p]
+
+    candidate = None
+    if host == "youtu.be" or host.endswith(".youtu.be"):
+        candidate = parts[0] if parts else None
+    elif any(host == h or host.endswith(f".{h}") for h in YOUTUBE_HOSTS):
+        query = parse_qs(parsed.query)
+        if "v" in query:
+            candidate = query["v"][0]
+        elif len(parts) >= 2 and parts[0] in ID_PATH_PREFIXES:
+            candidate = parts[1]
+
+    if candidate and VIDEO_ID_RE.match(candidate):
+        return candidate
+    return None
+
+
+def canonical_video_url(video_id: str) -> str:
+    return f"https://www.youtube.com/watch?v={video_id}"